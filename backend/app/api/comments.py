@@ -0,0 +1,62 @@
+# /app/api/comments.py
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Dict, Optional
+
+from ..api import dependencies
+from ..core.config import settings
+from ..db import models, schemas
+from ..db.database import get_async_db
+from ..services import comment_service
+from ..services.document_service import document_service
+
+router = APIRouter(prefix=f"{settings.API_V1_STR}/comments")
+
+
+@router.get("/", response_model=schemas.CommentPage)
+async def read_comments(
+    document_path: str = Query(..., min_length=1, max_length=512),
+    limit: int = Query(50, ge=1, le=200),
+    cursor: Optional[str] = Query(None, description="'next_cursor' de la página anterior"),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: models.User = Depends(dependencies.get_current_active_user),
+):
+    """
+    Lista los comentarios de un documento, del más antiguo al más reciente.
+    Paginación por cursor (created_at, id): pedir la siguiente página con 'cursor=next_cursor'.
+    """
+    try:
+        comments, next_cursor = await comment_service.get_comments(
+            db, document_path=document_path, limit=limit, cursor=cursor
+        )
+    except ValueError:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Cursor inválido.")
+    return {"items": comments, "next_cursor": next_cursor}
+
+
+@router.post("/", response_model=schemas.Comment, status_code=status.HTTP_201_CREATED)
+async def create_comment(
+    comment_in: schemas.CommentCreate,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: models.User = Depends(dependencies.get_current_active_user),
+):
+    """
+    Añade un comentario a un documento existente.
+    """
+    if document_service.document_file(comment_in.document_path) is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Documento no encontrado")
+    return await comment_service.create_comment(db, comment_in=comment_in, owner_id=current_user.id)
+
+
+@router.post("/counts", response_model=Dict[str, int])
+async def read_comment_counts(
+    payload: schemas.CommentCountsRequest,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: models.User = Depends(dependencies.get_current_active_user),
+):
+    """
+    Devuelve el número de comentarios por documento con una única consulta GROUP BY,
+    para combinarlo con el árbol de documentos. Los documentos sin comentarios no aparecen.
+    """
+    return await comment_service.count_comments(db, paths=payload.paths)
@@ -1,31 +1,39 @@
 # /app/api/dependencies.py
 
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Query, status
 from fastapi.security import OAuth2PasswordBearer
-from jose import jwt
 from pydantic import ValidationError
-from sqlalchemy.orm import Session
+from typing import Optional
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from ..core import security
 from ..core.config import settings
 from ..db import models, schemas
-from ..db.database import get_db
+from ..db.database import AsyncSessionLocal, get_async_db
 from ..services import user_service  # Asumimos que este servicio existe
+from ..services.auth_cache import auth_cache
+from ..services.lock_service import LockHeldError, document_locks
+from ..services.stream_tickets import stream_tickets
 
 # This is the URL where the frontend will send the username and password to get a token.
 reusable_oauth2 = OAuth2PasswordBearer(
     tokenUrl=f"{settings.API_V1_STR}/login/access-token"
 )
 
+# Same scheme, but without rejecting requests that lack the header (see get_current_stream_user).
+optional_oauth2 = OAuth2PasswordBearer(
+    tokenUrl=f"{settings.API_V1_STR}/login/access-token", auto_error=False
+)
+
 
-def get_current_user(
-    db: Session = Depends(get_db), token: str = Depends(reusable_oauth2)
+async def get_current_user(
+    db: AsyncSession = Depends(get_async_db), token: str = Depends(reusable_oauth2)
 ) -> models.User:
     """
     FastAPI dependency to get the current user from a JWT token.
 
     Retrieves the token from the request, decodes it, and fetches the
-    corresponding user from the database.
+    corresponding user from the database. Verified tokens and resolved
+    users are cached in memory (see services/auth_cache.py).
 
     Raises:
         HTTPException(401): If the token is invalid or credentials cannot be validated.
@@ -34,27 +42,34 @@ def get_current_user(
     Returns:
         models.User: The authenticated user object.
     """
+    # Camino rápido: token ya verificado y usuario resuelto recientemente, sin tocar la BD.
+    claims = auth_cache.verify_token(token)
     try:
-        payload = security.decode_token(token)
-        if payload is None:
+        if claims is None:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="No se pudo validar las credenciales",
             )
-        token_data = schemas.TokenData(username=payload)
-    except (jwt.JWTError, ValidationError):
+        token_data = schemas.TokenData(username=claims[0])
+    except ValidationError:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="No se pudo validar las credenciales",
         )
+    token_id = claims[1]
+
+    user = auth_cache.get_user(token_data.username, token_id)
+    if user is not None:
+        return user
 
-    user = user_service.get_user_by_username(db, username=token_data.username)
+    user = await user_service.get_user_by_username(db, username=token_data.username)
     if not user:
         raise HTTPException(status_code=404, detail="Usuario no encontrado.")
+    auth_cache.put_user(user, token_id)
     return user
 
 
-def get_current_active_user(
+async def get_current_active_user(
     current_user: models.User = Depends(get_current_user),
 ) -> models.User:
     """
@@ -72,7 +87,7 @@ def get_current_active_user(
     return current_user
 
 
-def get_current_admin_user(
+async def get_current_admin_user(
     current_user: models.User = Depends(get_current_active_user),
 ) -> models.User:
     """
@@ -91,3 +106,62 @@ def get_current_admin_user(
             detail="El usuario no tiene suficientes privilegios.",
         )
     return current_user
+
+
+async def ensure_document_unlocked(
+    file_path: str, current_user: models.User = Depends(get_current_active_user)
+) -> None:
+    """
+    FastAPI dependency for endpoints that save a document (`file_path` path parameter).
+    Rejects the save if another user holds the document's edit lock.
+
+    Raises:
+        HTTPException(423): If the document is locked by another user.
+    """
+    try:
+        document_locks.ensure_writable(file_path, current_user)
+    except ValueError:
+        return  # Ruta inválida: la valida y rechaza el propio endpoint.
+    except LockHeldError as e:
+        raise HTTPException(
+            status_code=status.HTTP_423_LOCKED,
+            detail=f"El documento está bloqueado por {e.lease.locked_by.username}.",
+        )
+
+
+async def get_current_stream_user(
+    header_token: Optional[str] = Depends(optional_oauth2),
+    ticket: Optional[str] = Query(None, description="Ticket de un solo uso de POST /events/ticket, para EventSource (no envía cabeceras)"),
+) -> models.User:
+    """
+    FastAPI dependency for long-lived streaming endpoints. Accepts the token
+    from the Authorization header or a single-use ticket in the `ticket`
+    query parameter (see services/stream_tickets.py), and uses its own short
+    database session so an open stream never pins a pooled connection.
+
+    Raises:
+        HTTPException(401): If no valid token or ticket is provided.
+        HTTPException(400): If the user is marked as inactive.
+
+    Returns:
+        models.User: The active, authenticated user object.
+    """
+    credentials_exception = HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="No se pudo validar las credenciales",
+        headers={"WWW-Authenticate": "Bearer"},
+    )
+    if header_token:
+        async with AsyncSessionLocal() as db:
+            user = await get_current_user(db=db, token=header_token)
+    elif ticket:
+        username = stream_tickets.redeem(ticket)
+        if username is None:
+            raise credentials_exception
+        async with AsyncSessionLocal() as db:
+            user = await user_service.get_user_by_username(db, username=username)
+        if user is None:
+            raise credentials_exception
+    else:
+        raise credentials_exception
+    return await get_current_active_user(current_user=user)
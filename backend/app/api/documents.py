@@ -1,35 +1,49 @@
 # /app/api/documents.py
 
-from fastapi import APIRouter, Depends, HTTPException, Body, status
-from fastapi.responses import FileResponse
-from typing import List, Dict, Any
-import tempfile
+from fastapi import APIRouter, Depends, HTTPException, Body, Header, Query, Request, Response, status
+from fastapi.responses import FileResponse, StreamingResponse
+from starlette.concurrency import run_in_threadpool
+from typing import Iterator, List, Dict, Any, Optional
+from urllib.parse import quote
+import hashlib
+import mimetypes
 import os
 import subprocess
-import yaml
 from pathlib import Path
 
 # Importaciones de nuestra aplicación
 from ..api import dependencies
-from ..db import models
+from ..db import models, schemas
 from ..core.config import settings
-from ..services import document_service # Usaremos el servicio para la lógica de Git
+from ..core.http_cache import DOCUMENT_CACHE_CONTROL, etag_matches, if_range_matches, make_etag, parse_byte_range
+from ..core.responses import json_response
+from ..services.document_service import document_service # Usaremos el servicio para la lógica de Git
+from ..services.history_service import RevisionNotFoundError
+from ..services.import_service import ArchiveTooLargeError, InvalidArchiveError, import_service
+from ..services.lock_service import LockHeldError
+from ..services.patching import InvalidPatchError, PatchConflictError
+from ..services.pdf_service import RenderQueueFullError, pdf_service
+from ..services.publish_service import publish_service
+from ..services.repo_lock import LockBusyError, RepositoryBusyError
+from ..services.search_service import search_index
 
 # Creamos un nuevo router. Todos los endpoints definidos aquí
 # serán añadidos a la aplicación principal.
-router = APIRouter()
+router = APIRouter(prefix=f"{settings.API_V1_STR}/documents")
 
 
 @router.get("/tree", response_model=List[Dict[str, Any]])
 def list_document_tree(
+    request: Request,
     current_user: models.User = Depends(dependencies.get_current_active_user),
 ):
     """
     Endpoint para listar la estructura jerárquica de todos los documentos.
     Devuelve una estructura de árbol para que el frontend la renderice.
+    El JSON se serializa una vez por versión del árbol y se envía comprimido (gzip/br) con ETag.
     """
     try:
-        return document_service.list_documents()
+        return json_response(request, document_service.list_documents_json(), headers={"Cache-Control": DOCUMENT_CACHE_CONTROL})
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -37,22 +51,155 @@ def list_document_tree(
         )
 
 
+@router.get("/list", response_model=schemas.DirectoryListing, response_model_exclude_unset=True)
+def list_directory(
+    path: str = Query("", description="Directorio a listar, relativo a la raíz de documentos ('' para la raíz)"),
+    depth: int = Query(1, ge=1, le=3, description="Niveles a incluir: 1 solo lista el directorio"),
+    limit: int = Query(200, ge=1, le=1000, description="Máximo de entradas por directorio"),
+    cursor: Optional[str] = Query(None, description="'next_cursor' de la página anterior"),
+    current_user: models.User = Depends(dependencies.get_current_active_user),
+):
+    """
+    Listado de un directorio por niveles, para expandir carpetas bajo demanda.
+    Cada carpeta indica su número de entradas ('child_count'); el tamaño de la respuesta
+    depende de 'depth' y 'limit', no del número total de documentos.
+    """
+    try:
+        listing = document_service.list_directory(path, depth=depth, limit=limit, cursor=cursor)
+    except ValueError:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Cursor inválido.")
+    if listing is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Directorio no encontrado")
+    items, next_cursor = listing
+    return {"path": path.strip("/"), "items": items, "next_cursor": next_cursor}
+
+
+@router.get("/search", response_model=schemas.SearchResponse)
+def search_documents(
+    q: str = Query(..., min_length=1, max_length=256, description="Texto a buscar; use comillas para frases exactas"),
+    limit: int = Query(20, ge=1, le=100),
+    offset: int = Query(0, ge=0),
+    current_user: models.User = Depends(dependencies.get_current_active_user),
+):
+    """
+    Endpoint de búsqueda de texto completo sobre todos los documentos.
+    Los resultados se ordenan por relevancia (BM25) e incluyen un extracto resaltado.
+    """
+    result = search_index.search(q, limit=limit, offset=offset)
+    return {"query": q, **result}
+
+
 @router.get("/content/{file_path:path}", response_model=Dict[str, str])
 def read_document_content(
     file_path: str,
+    response: Response,
+    if_none_match: Optional[str] = Header(None),
     current_user: models.User = Depends(dependencies.get_current_active_user),
 ):
     """
     Endpoint para obtener el contenido de un archivo Markdown específico.
+    Devuelve un ETag fuerte (hash del blob de Git) y responde 304 si el cliente ya tiene esa versión.
     """
-    content = document_service.get_document_content(file_path)
-    if content is None:
+    known_sha = document_service.peek_document_sha(file_path)
+    if known_sha and etag_matches(if_none_match, make_etag(known_sha)):
+        return _not_modified(known_sha)
+
+    document = document_service.read_document(file_path)
+    if document is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Documento no encontrado")
-    
+    content, blob_sha = document
+    if etag_matches(if_none_match, make_etag(blob_sha)):
+        return _not_modified(blob_sha)
+
+    response.headers["ETag"] = make_etag(blob_sha)
+    response.headers["Cache-Control"] = DOCUMENT_CACHE_CONTROL
     return {"path": file_path, "content": content}
 
 
-@router.post("/content/{file_path:path}")
+def _not_modified(blob_sha: str) -> Response:
+    return Response(
+        status_code=status.HTTP_304_NOT_MODIFIED,
+        headers={"ETag": make_etag(blob_sha), "Cache-Control": DOCUMENT_CACHE_CONTROL},
+    )
+
+
+@router.api_route("/raw/{file_path:path}", methods=["GET", "HEAD"])
+def download_document_raw(
+    file_path: str,
+    request: Request,
+    revision: Optional[str] = Query(None, description="Revisión (SHA de commit); por defecto, la versión actual"),
+    range_header: Optional[str] = Header(None, alias="Range"),
+    if_range: Optional[str] = Header(None),
+    if_none_match: Optional[str] = Header(None),
+    current_user: models.User = Depends(dependencies.get_current_active_user),
+):
+    """
+    Descarga del contenido sin procesar de un documento, enviado en streaming por bloques desde el disco
+    (o desde el almacén de objetos de Git si se indica 'revision'), con Content-Length y soporte de
+    Range/If-Range (206). Pensado para documentos grandes; el editor sigue usando el endpoint JSON /content.
+    """
+    if revision is None:
+        document = document_service.open_document(file_path)
+        if document is None:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Documento no encontrado")
+        full_path, stat_result, blob_sha = document
+        if etag_matches(if_none_match, make_etag(blob_sha)):
+            return _not_modified(blob_sha)
+        # FileResponse atiende Range/If-Range (contra este ETag) y HEAD, y entrega el archivo
+        # sin copiarlo en memoria (pathsend) cuando el servidor lo admite.
+        return FileResponse(
+            path=full_path,
+            stat_result=stat_result,
+            headers={"ETag": make_etag(blob_sha), "Cache-Control": DOCUMENT_CACHE_CONTROL},
+        )
+
+    try:
+        _, blob_sha, size = document_service.get_blob_at(file_path, revision)
+    except ValueError:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Ruta inválida.")
+    except RevisionNotFoundError:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Revisión o documento no encontrado")
+    etag = make_etag(blob_sha)
+    if etag_matches(if_none_match, etag):
+        return _not_modified(blob_sha)
+
+    headers = {"ETag": etag, "Cache-Control": DOCUMENT_CACHE_CONTROL, "Accept-Ranges": "bytes"}
+    start, end, status_code = 0, size - 1, status.HTTP_200_OK
+    if if_range_matches(if_range, etag):
+        try:
+            byte_range = parse_byte_range(range_header, size)
+        except ValueError:
+            raise HTTPException(
+                status_code=status.HTTP_416_RANGE_NOT_SATISFIABLE,
+                detail="Rango no satisfacible.",
+                headers={"Content-Range": f"bytes */{size}"},
+            )
+        if byte_range is not None:
+            (start, end), status_code = byte_range, status.HTTP_206_PARTIAL_CONTENT
+            headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+    headers["Content-Length"] = str(end - start + 1)
+
+    media_type = mimetypes.guess_type(file_path)[0] or "application/octet-stream"
+    if request.method == "HEAD":
+        return Response(status_code=status_code, headers=headers, media_type=media_type)
+    return StreamingResponse(
+        document_service.stream_blob(blob_sha, start, end - start + 1),
+        status_code=status_code,
+        headers=headers,
+        media_type=media_type,
+    )
+
+
+def _repository_busy() -> HTTPException:
+    # El bloqueo de escritura del repositorio sigue tomado por otro worker: nada se escribió.
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="El repositorio está ocupado con otros guardados. Inténtelo de nuevo en unos segundos.",
+        headers={"Retry-After": "5"},
+    )
+
+
+@router.post("/content/{file_path:path}", dependencies=[Depends(dependencies.ensure_document_unlocked)])
 def save_document_content(
     file_path: str,
     payload: dict = Body(...),
@@ -63,92 +210,296 @@ def save_document_content(
     Utiliza el document_service para encapsular la lógica.
     """
     content = payload.get("content", "")
-    success = document_service.save_document_content(
-        relative_path=file_path, content=content, author_name=current_user.username
-    )
+    try:
+        success = document_service.save_document_content(
+            relative_path=file_path,
+            content=content,
+            author_name=current_user.username,
+            author_email=current_user.email,
+        )
+    except RepositoryBusyError:
+        raise _repository_busy()
     if not success:
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Error al guardar el documento.")
     
     return {"message": "Documento guardado y versionado con éxito."}
 
 
-# /app/api/documents.py (Fragmento del endpoint /publish)
+@router.patch(
+    "/content/{file_path:path}",
+    response_model=schemas.DocumentPatchResult,
+    dependencies=[Depends(dependencies.ensure_document_unlocked)],
+)
+def patch_document_content(
+    file_path: str,
+    payload: schemas.DocumentPatch,
+    response: Response,
+    current_user: models.User = Depends(dependencies.get_current_active_user),
+):
+    """
+    Endpoint de guardado incremental: aplica un parche por rangos de líneas sobre la
+    revisión base indicada y crea un commit. Responde 409 si el documento cambió desde esa revisión.
+    """
+    try:
+        revision = document_service.patch_document(
+            relative_path=file_path,
+            base_revision=payload.base,
+            operations=payload.operations,
+            author_name=current_user.username,
+            author_email=current_user.email,
+        )
+    except PatchConflictError as e:
+        if e.current_sha is None:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Documento no encontrado")
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="El documento cambió desde la revisión base. Recargue el contenido y vuelva a aplicar los cambios.",
+            headers={"ETag": make_etag(e.current_sha)},
+        )
+    except InvalidPatchError as e:
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=str(e))
+    except ValueError:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Ruta inválida.")
+    except RepositoryBusyError:
+        raise _repository_busy()
+    except Exception as e:
+        print(f"Error patching document {file_path}: {e}")
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Error al guardar el documento.")
+
+    response.headers["ETag"] = make_etag(revision)
+    return {"message": "Documento guardado y versionado con éxito.", "revision": revision}
+
+
+@router.post("/import", response_model=schemas.DocumentImportResult)
+async def import_documents(
+    request: Request,
+    path: str = Query("", description="Directorio de destino, relativo a la raíz de documentos ('' para la raíz)"),
+    strip_components: int = Query(0, ge=0, le=16, description="Componentes iniciales que se eliminan de cada ruta, como en 'tar --strip-components'"),
+    current_user: models.User = Depends(dependencies.get_current_admin_user),
+):
+    """
+    Importación masiva: el cuerpo de la petición es un archivo zip o tar (también .tar.gz, .tar.bz2
+    o .tar.xz) que se recibe en streaming a disco, se valida completo y se versiona en un único commit.
+    Si alguna entrada no es válida no se escribe nada. Solo accesible para administradores.
+    """
+    content_length = request.headers.get("content-length")
+    if content_length and content_length.isdigit() and int(content_length) > settings.IMPORT_MAX_UPLOAD_BYTES:
+        raise HTTPException(status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, detail="El archivo supera el tamaño máximo permitido.")
+
+    with import_service.spool_file() as spool:
+        received = 0
+        async for chunk in request.stream():
+            received += len(chunk)
+            if received > settings.IMPORT_MAX_UPLOAD_BYTES:
+                raise HTTPException(status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, detail="El archivo supera el tamaño máximo permitido.")
+            await run_in_threadpool(spool.write, chunk)
+        await run_in_threadpool(spool.flush)
+        if not received:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="El cuerpo de la petición está vacío.")
+
+        try:
+            return await run_in_threadpool(
+                import_service.import_archive, Path(spool.name), current_user, path, strip_components
+            )
+        except InvalidArchiveError as e:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"El archivo no se puede importar: {'; '.join(e.problems)}",
+            )
+        except ArchiveTooLargeError as e:
+            raise HTTPException(status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, detail=f"El archivo supera los límites de importación: {e}")
+        except LockHeldError as e:
+            raise HTTPException(
+                status_code=status.HTTP_423_LOCKED,
+                detail=f"El documento '{e.lease.document_path}' está bloqueado por {e.lease.locked_by.username}.",
+            )
+        except ValueError:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Ruta inválida.")
+        except RepositoryBusyError:
+            raise _repository_busy()
+        except Exception as e:
+            print(f"Error importing archive into '{path}': {e}")
+            raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Error al importar el archivo.")
+
+
+@router.get("/history/{file_path:path}", response_model=schemas.DocumentHistoryPage)
+def read_document_history(
+    file_path: str,
+    limit: int = Query(50, ge=1, le=200),
+    cursor: Optional[str] = Query(None, description="'next_cursor' de la página anterior"),
+    current_user: models.User = Depends(dependencies.get_current_active_user),
+):
+    """
+    Historial de versiones de un documento (commits que lo modificaron), de la más reciente a la más antigua.
+    Se sirve desde un índice ruta -> commits, sin recorrer todo el historial de Git.
+    """
+    try:
+        revisions, next_cursor = document_service.get_history(file_path, limit=limit, cursor=cursor)
+    except ValueError:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Ruta o cursor inválido.")
+    return {"path": file_path, "items": revisions, "next_cursor": next_cursor}
+
+
+@router.get("/revisions/{revision}/content/{file_path:path}", response_model=schemas.DocumentRevisionContent)
+def read_document_revision(
+    revision: str,
+    file_path: str,
+    response: Response,
+    if_none_match: Optional[str] = Header(None),
+    current_user: models.User = Depends(dependencies.get_current_active_user),
+):
+    """
+    Contenido de un documento en una revisión concreta (SHA de commit).
+    """
+    try:
+        content, commit_sha, blob_sha = document_service.get_content_at(file_path, revision)
+    except ValueError:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Ruta inválida.")
+    except RevisionNotFoundError:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Revisión o documento no encontrado")
+    if etag_matches(if_none_match, make_etag(blob_sha)):
+        return _not_modified(blob_sha)
+    response.headers["ETag"] = make_etag(blob_sha)
+    response.headers["Cache-Control"] = DOCUMENT_CACHE_CONTROL
+    return {"path": file_path, "revision": commit_sha, "blob": blob_sha, "content": content}
+
+
+@router.get("/diff/{file_path:path}")
+def diff_document_revisions(
+    file_path: str,
+    from_revision: str = Query(..., alias="from", description="Revisión antigua (SHA de commit)"),
+    to_revision: str = Query("HEAD", alias="to", description="Revisión nueva (por defecto, la actual)"),
+    current_user: models.User = Depends(dependencies.get_current_active_user),
+):
+    """
+    Diff unificado de un documento entre dos revisiones, enviado en streaming (text/x-diff).
+    """
+    try:
+        chunks = document_service.diff_revisions(file_path, from_revision, to_revision)
+    except ValueError:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Ruta inválida.")
+    except RevisionNotFoundError:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Revisión no encontrada")
+    return StreamingResponse(chunks, media_type="text/x-diff; charset=utf-8")
+
+
+def _attachment(filename: str) -> str:
+    # Cabecera Content-Disposition de descarga; nombres no ASCII según RFC 6266 (filename*), igual que FileResponse.
+    if quote(filename) == filename:
+        return f'attachment; filename="{filename}"'
+    return f"attachment; filename*=utf-8''{quote(filename)}"
+
+
+_EXPORT_MEDIA_TYPES = {"zip": "application/zip", "tar.gz": "application/gzip"}
+
+
+@router.get("/export")
+def export_documents(
+    path: str = Query("", description="Directorio a exportar, relativo a la raíz de documentos ('' para todo)"),
+    revision: str = Query("HEAD", description="Revisión a exportar (SHA de commit); por defecto, la actual"),
+    archive_format: str = Query("zip", alias="format", pattern="^(zip|tar\\.gz)$", description="'zip' o 'tar.gz'"),
+    if_none_match: Optional[str] = Header(None),
+    current_user: models.User = Depends(dependencies.get_current_active_user),
+):
+    """
+    Exporta un directorio (o todo el corpus) en zip o tar.gz, tal como estaba en una revisión.
+    El archivo se genera con 'git archive' directamente desde el repositorio y se envía en streaming,
+    sin ficheros temporales y con memoria acotada. Para una misma revisión el contenido no cambia,
+    así que se identifica con un ETag.
+    """
+    try:
+        commit_sha, repo_path, chunks = document_service.export_archive(path, revision, archive_format)
+    except ValueError:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Ruta inválida.")
+    except RevisionNotFoundError:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Revisión o directorio no encontrado")
+
+    etag_key = hashlib.sha1(f"{commit_sha}:{repo_path}:{archive_format}".encode("utf-8")).hexdigest()
+    if etag_matches(if_none_match, make_etag(etag_key)):
+        chunks.close()
+        return _not_modified(etag_key)
+    filename = f"{repo_path.rsplit('/', 1)[-1] if repo_path else 'docs'}-{commit_sha[:12]}.{archive_format}"
+    return StreamingResponse(
+        chunks,
+        media_type=_EXPORT_MEDIA_TYPES[archive_format],
+        headers={
+            "Content-Disposition": _attachment(filename),
+            "ETag": make_etag(etag_key),
+            "Cache-Control": DOCUMENT_CACHE_CONTROL,
+        },
+    )
+
 
-@router.post("/publish")
+@router.post("/publish", response_model=schemas.PublishJob, status_code=status.HTTP_202_ACCEPTED)
 def publish_site(
     current_user: models.User = Depends(dependencies.get_current_admin_user),
 ):
     """
-    Ejecuta 'mkdocs build' para generar el sitio estático.
+    Encola la generación del sitio estático con 'mkdocs build'.
+    Las peticiones repetidas mientras hay un trabajo en cola se agrupan en ese mismo trabajo.
     """
     try:
-        # 1. Obtenemos la estructura de navegación desde el servicio
-        nav_structure = document_service.generate_mkdocs_nav()
-        
-        # 2. Creamos el diccionario de configuración
-        mkdocs_config = {
-            'site_name': 'Documentación de Proyectos DATAZUCAR',
-            'theme': {
-                'name': 'material',
-                'features': ['navigation.tabs', 'navigation.sections', 'navigation.expand']
-            },
-            'nav': nav_structure
-        }
-        
-        # 3. Escribimos el archivo de configuración
-        docs_path = Path(settings.DOCS_DIRECTORY)
-        with open(docs_path / "mkdocs.yml", "w", encoding="utf-8") as f:
-            yaml.dump(mkdocs_config, f, allow_unicode=True, default_flow_style=False)
-
-        # 4. Ejecutamos el comando de build
-        subprocess.run(
-            ["mkdocs", "build", "-f", "mkdocs.yml", "-d", "/docs_build/site", "--clean"],
-            cwd=docs_path.as_posix(),
-            check=True
+        return publish_service.submit(requested_by=current_user.username)
+    except LockBusyError:
+        # Otro worker tiene tomada la tabla de trabajos de publicación.
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="El servicio de publicación está ocupado. Inténtelo de nuevo en unos segundos.",
+            headers={"Retry-After": "5"},
         )
-        
-        return {"message": "Sitio publicado con éxito."}
-    except Exception as e:
-        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"Error al publicar el sitio: {str(e)}")
+
+
+@router.get("/publish/{job_id}", response_model=schemas.PublishJob)
+def get_publish_status(
+    job_id: str,
+    current_user: models.User = Depends(dependencies.get_current_admin_user),
+):
+    """
+    Devuelve el estado de un trabajo de publicación.
+    """
+    job = publish_service.get_job(job_id)
+    if job is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Trabajo de publicación no encontrado")
+    return job
 
 
 @router.get("/pdf/{file_path:path}")
-def generate_pdf_from_document(
+async def generate_pdf_from_document(
     file_path: str,
     current_user: models.User = Depends(dependencies.get_current_active_user),
 ):
     """
     Genera un PDF a partir de un archivo Markdown usando Pandoc.
+    Los PDF se cachean por el hash del blob de Git, así que un documento sin cambios no se vuelve a renderizar.
     """
-    source_path = Path(settings.DOCS_DIRECTORY) / file_path
-    if not source_path.exists() or not source_path.is_file():
+    source_path = document_service.document_file(file_path)
+    if source_path is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Archivo Markdown no encontrado")
 
-    with tempfile.NamedTemporaryFile(suffix=".pdf", delete=False) as tmp_pdf:
-        output_pdf_path = tmp_pdf.name
-    
     try:
-        # Comando Pandoc para generar el PDF
-        pandoc_command = [
-            "pandoc", str(source_path),
-            "--pdf-engine=xelatex",
-            "-o", output_pdf_path,
-            "-V", "documentclass=article",
-            "-V", "mainfont=Calibri",
-            "-V", "fontsize=11pt",
-            "-V", "geometry:margin=2.5cm",
-            "-V", r"header-includes=\usepackage{fancyhdr}\pagestyle{fancy}\fancyhf{}\rhead{" + source_path.parent.name.replace('_', ' ') + r"}\cfoot{\thepage}"
-        ]
-
-        subprocess.run(pandoc_command, check=True, capture_output=True, text=True)
-
-        return FileResponse(
-            path=output_pdf_path,
-            media_type='application/pdf',
-            filename=f"{source_path.stem}.pdf"
+        pdf = await pdf_service.render(source_path, header_title=source_path.parent.name.replace('_', ' '))
+    except RenderQueueFullError:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Demasiadas generaciones de PDF en curso. Inténtelo de nuevo en unos segundos.",
+            headers={"Retry-After": "5"},
         )
+    except subprocess.TimeoutExpired:
+        raise HTTPException(status_code=status.HTTP_504_GATEWAY_TIMEOUT, detail="La generación del PDF excedió el tiempo límite.")
     except subprocess.CalledProcessError as e:
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"Error al generar el PDF: {e.stderr}")
-    finally:
-        if os.path.exists(output_pdf_path):
-            os.remove(output_pdf_path)
\ No newline at end of file
+
+    def chunks() -> Iterator[bytes]:
+        with pdf:
+            while chunk := pdf.read(64 * 1024):
+                yield chunk
+
+    # Se envía el archivo ya abierto: sigue siendo legible aunque otra generación lo expulse de la caché.
+    return StreamingResponse(
+        chunks(),
+        media_type='application/pdf',
+        headers={
+            "Content-Length": str(os.fstat(pdf.fileno()).st_size),
+            "Content-Disposition": _attachment(f"{source_path.stem}.pdf"),
+        },
+    )
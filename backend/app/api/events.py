@@ -0,0 +1,65 @@
+# /app/api/events.py
+
+import json
+from typing import AsyncIterator, Optional
+
+from fastapi import APIRouter, Depends, Header
+from fastapi.responses import StreamingResponse
+
+from ..api import dependencies
+from ..core.config import settings
+from ..db import models, schemas
+from ..services.event_bus import event_bus
+from ..services.stream_tickets import stream_tickets
+
+router = APIRouter(prefix=f"{settings.API_V1_STR}/events")
+
+
+def _format_event(event: dict) -> str:
+    return f"id: {event['id']}\nevent: {event['type']}\ndata: {json.dumps(event, default=str)}\n\n"
+
+
+@router.post("/ticket", response_model=schemas.StreamTicket)
+async def create_stream_ticket(
+    current_user: models.User = Depends(dependencies.get_current_active_user),
+):
+    """
+    Entrega un ticket de un solo uso, válido unos segundos, para abrir el flujo de eventos.
+    EventSource no puede enviar la cabecera Authorization, así que la URL lleva el ticket (?ticket=)
+    en lugar del token de acceso: lo que quede en los registros de acceso ya no sirve.
+    """
+    return {"ticket": stream_tickets.issue(current_user.username), "expires_in": stream_tickets.ttl}
+
+
+@router.get("/")
+async def stream_events(
+    last_event_id: Optional[str] = Header(None),
+    current_user: models.User = Depends(dependencies.get_current_stream_user),
+):
+    """
+    Flujo de eventos (Server-Sent Events) con los cambios de documentos, bloqueos y publicaciones:
+    document.created | document.saved | document.deleted | lock.acquired | lock.released |
+    publish.queued | publish.running | publish.succeeded | publish.failed.
+    Si el cliente se queda atrás recibe 'resync' y debe volver a cargar el árbol y el documento abierto.
+    Al reconectar, el navegador envía Last-Event-ID y se reenvían los eventos perdidos aún en memoria;
+    si ese id lo emitió otro worker (o este antes de reiniciarse), se envía 'resync'.
+    """
+    subscription = event_bus.subscribe(last_event_id=last_event_id)
+
+    async def stream() -> AsyncIterator[str]:
+        try:
+            # Indica al navegador cuánto esperar antes de reconectar.
+            yield "retry: 3000\n\n"
+            while True:
+                event = await subscription.get(timeout=settings.EVENT_KEEPALIVE_SECONDS)
+                # Sin eventos: un comentario mantiene viva la conexión a través de proxies.
+                yield _format_event(event) if event is not None else ": keep-alive\n\n"
+        finally:
+            event_bus.unsubscribe(subscription)
+
+    return StreamingResponse(
+        stream(),
+        media_type="text/event-stream",
+        # X-Accel-Buffering: el proxy nginx no debe acumular el flujo en su búfer.
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -0,0 +1,47 @@
+# /app/api/health.py
+
+import asyncio
+
+from fastapi import APIRouter
+from fastapi.responses import JSONResponse
+from sqlalchemy import text
+
+from ..core.config import settings
+from ..core.startup import startup_state
+from ..db.database import async_engine
+
+router = APIRouter()
+
+
+async def _ping_database() -> None:
+    async with async_engine.connect() as connection:
+        await connection.execute(text("SELECT 1"))
+
+
+@router.get("/health/live", include_in_schema=False)
+def liveness():
+    """
+    Sonda de vida: el proceso responde. No comprueba dependencias, para que
+    una caída de la base de datos no provoque reinicios en cadena.
+    """
+    return {"status": "alive"}
+
+
+@router.get("/health/ready", include_in_schema=False)
+async def readiness():
+    """
+    Sonda de disponibilidad: 200 cuando el arranque terminó, la precarga de cachés
+    acabó y la base de datos responde; 503 en otro caso (también durante el apagado).
+    Incluye la duración de cada fase del arranque.
+    """
+    state = startup_state.snapshot()
+    ready = startup_state.ready
+    if ready:
+        try:
+            await asyncio.wait_for(_ping_database(), timeout=settings.READINESS_DB_TIMEOUT)
+            state["database"] = "ok"
+        except Exception as e:
+            ready = False
+            state["database"] = f"unavailable: {e.__class__.__name__}"
+    state["status"] = "ready" if ready else "not_ready"
+    return JSONResponse(state, status_code=200 if ready else 503)
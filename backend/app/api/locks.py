@@ -0,0 +1,82 @@
+# /app/api/locks.py
+
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List
+
+from ..api import dependencies
+from ..core.config import settings
+from ..db import models, schemas
+from ..db.database import get_async_db
+from ..services.lock_service import LockHeldError, LockNotHeldError, document_locks
+
+router = APIRouter(prefix=f"{settings.API_V1_STR}/locks")
+
+
+@router.post("/status", response_model=List[schemas.DocumentLock])
+async def read_lock_status(
+    payload: schemas.DocumentLockStatusRequest,
+    current_user: models.User = Depends(dependencies.get_current_active_user),
+):
+    """
+    Devuelve los bloqueos activos de una lista de documentos en una sola petición
+    (p. ej. para mostrar los candados en el árbol). Los documentos libres no aparecen.
+    """
+    return document_locks.status(payload.paths)
+
+
+@router.put("/{file_path:path}", response_model=schemas.DocumentLock)
+async def acquire_lock(
+    file_path: str,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: models.User = Depends(dependencies.get_current_active_user),
+):
+    """
+    Adquiere el bloqueo de edición de un documento (o lo prolonga si ya es del usuario).
+    El bloqueo caduca si no se renueva antes de 'expires_at'.
+    """
+    try:
+        return await document_locks.acquire(db, file_path, current_user)
+    except ValueError:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Ruta inválida.")
+    except LockHeldError as e:
+        holder = f" por {e.lease.locked_by.username}" if e.lease else ""
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"El documento ya está bloqueado{holder}.",
+        )
+
+
+@router.post("/{file_path:path}/heartbeat", response_model=schemas.DocumentLock)
+async def renew_lock(
+    file_path: str,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: models.User = Depends(dependencies.get_current_active_user),
+):
+    """
+    Renueva (heartbeat) un bloqueo que el usuario mantiene. Responde 409 si el
+    bloqueo ya caducó o pertenece a otro usuario; el cliente debe volver a adquirirlo.
+    """
+    try:
+        return await document_locks.renew(db, file_path, current_user)
+    except ValueError:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Ruta inválida.")
+    except LockNotHeldError:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="El usuario no tiene el bloqueo de este documento.")
+
+
+@router.delete("/{file_path:path}", status_code=status.HTTP_204_NO_CONTENT)
+async def release_lock(
+    file_path: str,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: models.User = Depends(dependencies.get_current_active_user),
+):
+    """
+    Libera el bloqueo de un documento. Los administradores pueden liberar bloqueos ajenos.
+    """
+    try:
+        await document_locks.release(db, file_path, current_user)
+    except ValueError:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Ruta inválida.")
+    except LockNotHeldError:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="El usuario no tiene el bloqueo de este documento.")
@@ -2,38 +2,56 @@
 
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordRequestForm
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from datetime import timedelta
+import time
 
 from ..core import security
 from ..core.config import settings
+from ..core.metrics import LOGIN_LATENCY
 from ..db import schemas
-from ..db.database import get_db
+from ..db.database import get_async_db
 from ..services import user_service # Asumimos que este servicio existe
+from ..services.password_hashing import HashingSaturatedError
 
-router = APIRouter()
+router = APIRouter(prefix=f"{settings.API_V1_STR}/login")
 
 @router.post("/access-token", response_model=schemas.Token)
-def login_for_access_token(
-    db: Session = Depends(get_db), form_data: OAuth2PasswordRequestForm = Depends()
+async def login_for_access_token(
+    db: AsyncSession = Depends(get_async_db), form_data: OAuth2PasswordRequestForm = Depends()
 ):
     """
     Endpoint para que un usuario inicie sesión con su username y password.
     Devuelve un token de acceso JWT.
+    bcrypt se ejecuta en un pool dedicado y acotado: si está saturado se responde 503.
     """
-    user = user_service.authenticate_user(
-        db, username=form_data.username, password=form_data.password
-    )
-    if not user:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Usuario o contraseña incorrectos",
-            headers={"WWW-Authenticate": "Bearer"},
+    started = time.perf_counter()
+    outcome = "error"
+    try:
+        try:
+            user = await user_service.authenticate_user(
+                db, username=form_data.username, password=form_data.password
+            )
+        except HashingSaturatedError:
+            outcome = "rejected"
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Demasiados inicios de sesión simultáneos. Inténtelo de nuevo en unos segundos.",
+                headers={"Retry-After": "1"},
+            )
+        if not user:
+            outcome = "invalid"
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Usuario o contraseña incorrectos",
+                headers={"WWW-Authenticate": "Bearer"},
+            )
+
+        access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
+        access_token = security.create_access_token(
+            subject=user.username, expires_delta=access_token_expires
         )
-    
-    access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
-    access_token = security.create_access_token(
-        subject=user.username, expires_delta=access_token_expires
-    )
-    
-    return {"access_token": access_token, "token_type": "bearer"}
\ No newline at end of file
+        outcome = "success"
+        return {"access_token": access_token, "token_type": "bearer"}
+    finally:
+        LOGIN_LATENCY.labels(outcome).observe(time.perf_counter() - started)
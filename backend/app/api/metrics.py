@@ -0,0 +1,17 @@
+# /app/api/metrics.py
+
+from fastapi import APIRouter
+from fastapi.responses import Response
+from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
+
+router = APIRouter()
+
+
+@router.get("/metrics", include_in_schema=False)
+def read_metrics():
+    """
+    Métricas en formato de texto de Prometheus: latencia por ruta, peticiones en curso,
+    duración de las operaciones de git, pandoc y mkdocs, y uso del pool de conexiones.
+    No requiere autenticación: exponer solo en la red interna (nginx solo publica /api/).
+    """
+    return Response(generate_latest(), media_type=CONTENT_TYPE_LATEST)
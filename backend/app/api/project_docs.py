@@ -1,19 +1,33 @@
 
 import os
 import aiofiles # Para operaciones de archivo asíncronas
-from fastapi import APIRouter, HTTPException, Depends, Body
+from fastapi import APIRouter, HTTPException, Depends, Body, Header, Request, Response
 from fastapi.responses import JSONResponse
+from starlette.concurrency import run_in_threadpool
 from pydantic import BaseModel
-from typing import List, Optional, Dict, Any
+from typing import Callable, List, Optional, Dict, Any, Tuple
 
-from app.api.dependencies import get_current_active_user # Asumiendo que quieres proteger estos endpoints
+from app.api.dependencies import ensure_document_unlocked, get_current_active_user # Asumiendo que quieres proteger estos endpoints
+from app.core.config import settings
+from app.core.http_cache import DOCUMENT_CACHE_CONTROL, etag_matches, make_etag
+from app.core.responses import json_response
 from app.db.models import User # Para el tipado de current_user
-
-router = APIRouter()
+from app.db.schemas import DocumentPatch, DocumentPatchResult
+from app.services.blob_hash import blob_hashes
+from app.services.content_cache import content_cache
+from app.services.document_service import document_service
+from app.services.event_bus import event_bus
+from app.services.patching import InvalidPatchError, PatchConflictError, make_patch_transform
+from app.services.repo_lock import RepositoryBusyError
+from app.services.search_service import search_index
+from app.services.tree_index import tree_index
+from app.services.worker_signals import worker_signals
+
+router = APIRouter(prefix=f"{settings.API_V1_STR}/project-docs")
 
 # Directorio base donde están los documentos del proyecto dentro del contenedor
 # Montado desde ./docs en el host a /docs_source en el contenedor app
-DOCS_SOURCE_DIR = "/docs_source"
+DOCS_SOURCE_DIR = settings.DOCS_DIRECTORY
 
 class FileNode(BaseModel):
     name: str
@@ -26,37 +40,6 @@ FileNode.model_rebuild() # Para la referencia recursiva de 'FileNode' en 'childr
 class DocumentContent(BaseModel):
     content: str
 
-def get_project_file_tree_recursive(root_dir: str, current_path: str = "") -> List[FileNode]:
-    """
-    Construye recursivamente el árbol de archivos y directorios,
-    filtrando por archivos .md y listando directorios.
-    """
-    tree_nodes: List[FileNode] = []
-    try:
-        full_current_path = os.path.join(root_dir, current_path)
-        if not os.path.exists(full_current_path) or not os.path.isdir(full_current_path):
-            return []
-
-        for item in sorted(os.listdir(full_current_path)):
-            item_path_abs = os.path.join(full_current_path, item)
-            item_path_rel = os.path.join(current_path, item) # Ruta relativa a DOCS_SOURCE_DIR
-
-            if item.startswith('.'): # Ignorar archivos/directorios que comienzan con un punto
-                continue
-
-            if os.path.isdir(item_path_abs):
-                children = get_project_file_tree_recursive(root_dir, item_path_rel)
-                # Solo incluir directorios si tienen archivos .md o subdirectorios con .md (opcional, para no mostrar vacíos)
-                # if children: # Descomentar si no quieres directorios vacíos (sin .md dentro)
-                tree_nodes.append(FileNode(name=item, path=item_path_rel, type="directory", children=children))
-            elif os.path.isfile(item_path_abs) and item.lower().endswith(".md"):
-                tree_nodes.append(FileNode(name=item, path=item_path_rel, type="file"))
-    except Exception as e:
-        # Loggear el error sería bueno aquí
-        print(f"Error traversing directory {full_current_path}: {e}")
-        return [] # Retornar lista vacía en caso de error de permisos u otros
-    return tree_nodes
-
 def secure_join(base: str, user_path: str) -> str:
     """
     Une de forma segura la ruta base con la ruta proporcionada por el usuario,
@@ -82,23 +65,46 @@ def secure_join(base: str, user_path: str) -> str:
 
 
 @router.get("/tree", response_model=List[FileNode], summary="Listar archivos y directorios de /docs_source")
-async def list_project_docs(current_user: User = Depends(get_current_active_user)):
+async def list_project_docs(request: Request, current_user: User = Depends(get_current_active_user)):
     if not os.path.exists(DOCS_SOURCE_DIR) or not os.path.isdir(DOCS_SOURCE_DIR):
         raise HTTPException(status_code=404, detail=f"Directorio fuente '{DOCS_SOURCE_DIR}' no encontrado en el servidor.")
 
-    tree = get_project_file_tree_recursive(DOCS_SOURCE_DIR)
-    return tree
+    # El árbol se sirve desde el índice compartido en memoria (ver services/tree_index.py), ya serializado:
+    # se evita validar cada nodo con FileNode y volver a generar el JSON en cada petición.
+    return json_response(request, tree_index.tree_json(), headers={"Cache-Control": DOCUMENT_CACHE_CONTROL})
 
 @router.get("/content/{file_path:path}", response_model=DocumentContent, summary="Obtener contenido de un archivo de /docs_source")
-async def get_project_doc_content(file_path: str, current_user: User = Depends(get_current_active_user)):
+async def get_project_doc_content(
+    file_path: str,
+    response: Response,
+    if_none_match: Optional[str] = Header(None),
+    current_user: User = Depends(get_current_active_user),
+):
     try:
         abs_file_path = secure_join(DOCS_SOURCE_DIR, file_path)
         if not os.path.isfile(abs_file_path) or not abs_file_path.lower().endswith(".md"):
             raise HTTPException(status_code=404, detail="Archivo no encontrado o no es un archivo Markdown.")
 
-        async with aiofiles.open(abs_file_path, mode="r", encoding="utf-8") as f:
-            content = await f.read()
-        return DocumentContent(content=content)
+        # Revalidación barata: si el hash del blob ya es conocido para este (inodo, tamaño, mtime), no se lee el archivo
+        st = os.stat(abs_file_path)
+        known_sha = blob_hashes.lookup(abs_file_path, st)
+        if known_sha and etag_matches(if_none_match, make_etag(known_sha)):
+            return _not_modified(known_sha)
+
+        # Caché de contenido compartida con el router 'documents': solo se lee el disco si el archivo cambió
+        cached = content_cache.get(abs_file_path, st)
+        if cached is not None:
+            data, blob_sha = cached
+        else:
+            async with aiofiles.open(abs_file_path, mode="rb") as f:
+                data = await f.read()
+            blob_sha = content_cache.put(abs_file_path, st, data)
+        if etag_matches(if_none_match, make_etag(blob_sha)):
+            return _not_modified(blob_sha)
+
+        response.headers["ETag"] = make_etag(blob_sha)
+        response.headers["Cache-Control"] = DOCUMENT_CACHE_CONTROL
+        return DocumentContent(content=data.decode("utf-8"))
     except HTTPException: # Re-lanzar HTTPExceptions de secure_join o de aquí
         raise
     except FileNotFoundError:
@@ -108,7 +114,61 @@ async def get_project_doc_content(file_path: str, current_user: User = Depends(g
         print(f"Error leyendo archivo {file_path}: {e}")
         raise HTTPException(status_code=500, detail=f"Error al leer el archivo: {str(e)}")
 
-@router.post("/content/{file_path:path}", summary="Guardar contenido de un archivo en /docs_source")
+def _write_document(
+    abs_file_path: str, content: Optional[str] = None, transform: Optional[Callable[[str], str]] = None
+) -> Tuple[str, str, bool]:
+    # Escribe el documento con el bloqueo de escritura del repositorio, compartido con el pipeline
+    # de commits y con los demás workers. Con 'transform', el contenido nuevo se calcula a partir
+    # del actual dentro del mismo bloqueo. Devuelve (contenido, revisión, si ya existía).
+    with document_service.write_lock.hold():
+        existed = os.path.isfile(abs_file_path)
+        if transform is not None:
+            content = transform(content_cache.read(abs_file_path)[0].decode("utf-8"))
+        data = content.encode("utf-8")
+        with open(abs_file_path, "wb") as f:
+            f.write(data)
+        revision = content_cache.put(abs_file_path, os.stat(abs_file_path), data)
+    return content, revision, existed
+
+def _repo_path(file_path: str) -> str:
+    # Ruta normalizada relativa al repositorio ('guias/intro.md'), la misma que usan las cachés,
+    # los eventos y las señales entre workers, sea cual sea la forma en que llegó en la URL.
+    try:
+        return document_service.repo_path(file_path)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Ruta inválida o maliciosa.")
+
+def _document_written(
+    repo_path: str, event_type: str, revision: str, author: str, content: Optional[str] = None, notify_workers: bool = True
+) -> None:
+    # Actualiza las cachés de este proceso, notifica a los clientes y avisa a los demás workers.
+    # 'repo_path' ya viene normalizada por _repo_path().
+    tree_index.invalidate(repo_path)
+    search_index.update_document(repo_path, content)
+    event_bus.publish(event_type, path=repo_path, revision=revision, commit=None, author=author)
+    if notify_workers:
+        worker_signals.publish("document.written", path=repo_path, event=event_type, revision=revision, author=author)
+
+def _apply_remote_write(data: Dict[str, Any]) -> None:
+    # Documento guardado por otro worker: mismas actualizaciones, sin volver a avisar.
+    _document_written(data["path"], data["event"], data["revision"], data["author"], notify_workers=False)
+
+worker_signals.subscribe("document.written", _apply_remote_write)
+
+def _repository_busy() -> HTTPException:
+    return HTTPException(
+        status_code=503,
+        detail="El repositorio está ocupado con otros guardados. Inténtelo de nuevo en unos segundos.",
+        headers={"Retry-After": "5"},
+    )
+
+def _not_modified(blob_sha: str) -> Response:
+    return Response(
+        status_code=304,
+        headers={"ETag": make_etag(blob_sha), "Cache-Control": DOCUMENT_CACHE_CONTROL},
+    )
+
+@router.post("/content/{file_path:path}", summary="Guardar contenido de un archivo en /docs_source", dependencies=[Depends(ensure_document_unlocked)])
 async def save_project_doc_content(
     file_path: str,
     payload: DocumentContent = Body(...),
@@ -116,6 +176,7 @@ async def save_project_doc_content(
 ):
     try:
         abs_file_path = secure_join(DOCS_SOURCE_DIR, file_path)
+        repo_path = _repo_path(file_path)
 
         # Asegurarse que el directorio padre existe, si no, crearlo (opcional, depende del caso de uso)
         # dir_name = os.path.dirname(abs_file_path)
@@ -125,11 +186,52 @@ async def save_project_doc_content(
         if not abs_file_path.lower().endswith(".md"):
              raise HTTPException(status_code=400, detail="Solo se pueden guardar archivos Markdown (.md).")
 
-        async with aiofiles.open(abs_file_path, mode="w", encoding="utf-8") as f:
-            await f.write(payload.content)
+        content, revision, existed = await run_in_threadpool(_write_document, abs_file_path, payload.content)
+        event_type = "document.saved" if existed else "document.created"
+        await run_in_threadpool(_document_written, repo_path, event_type, revision, current_user.username, content)
         return JSONResponse(status_code=200, content={"message": "Archivo guardado exitosamente."})
     except HTTPException:
         raise
+    except RepositoryBusyError:
+        raise _repository_busy()
+    except Exception as e:
+        # Loggear el error
+        print(f"Error guardando archivo {file_path}: {e}")
+        raise HTTPException(status_code=500, detail=f"Error al guardar el archivo: {str(e)}")
+
+@router.patch("/content/{file_path:path}", response_model=DocumentPatchResult, summary="Guardar cambios incrementales en un archivo de /docs_source", dependencies=[Depends(ensure_document_unlocked)])
+async def patch_project_doc_content(
+    file_path: str,
+    payload: DocumentPatch,
+    response: Response,
+    current_user: User = Depends(get_current_active_user)
+):
+    try:
+        abs_file_path = secure_join(DOCS_SOURCE_DIR, file_path)
+        repo_path = _repo_path(file_path)
+        if not abs_file_path.lower().endswith(".md"):
+             raise HTTPException(status_code=400, detail="Solo se pueden guardar archivos Markdown (.md).")
+
+        transform = make_patch_transform(payload.base, payload.operations)
+        # La comprobación de la revisión base y la escritura son atómicas (bloqueo de escritura del repositorio)
+        content, revision, _ = await run_in_threadpool(_write_document, abs_file_path, None, transform)
+        await run_in_threadpool(_document_written, repo_path, "document.saved", revision, current_user.username, content)
+        response.headers["ETag"] = make_etag(revision)
+        return DocumentPatchResult(message="Archivo guardado exitosamente.", revision=revision)
+    except HTTPException:
+        raise
+    except FileNotFoundError:
+        raise HTTPException(status_code=404, detail="Archivo no encontrado.")
+    except PatchConflictError as e:
+        raise HTTPException(
+            status_code=409,
+            detail="El archivo cambió desde la revisión base. Recargue el contenido y vuelva a aplicar los cambios.",
+            headers={"ETag": make_etag(e.current_sha)},
+        )
+    except InvalidPatchError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    except RepositoryBusyError:
+        raise _repository_busy()
     except Exception as e:
         # Loggear el error
         print(f"Error guardando archivo {file_path}: {e}")
@@ -1,61 +1,121 @@
 # /app/api/users.py
 
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from typing import List
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Optional
 
 from ..api import dependencies
+from ..core.config import settings
+from ..core.responses import json_response
 from ..db import models, schemas
-from ..db.database import get_db
+from ..db.database import get_async_db
 from ..services import user_service # Asumimos que este servicio existe
+from ..services.password_hashing import HashingSaturatedError
+
+router = APIRouter(prefix=f"{settings.API_V1_STR}/users")
+
+
+def _hashing_saturated() -> HTTPException:
+    # El pool de bcrypt está saturado (ver login.py): nada se guardó.
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="Demasiadas operaciones con contraseñas simultáneas. Inténtelo de nuevo en unos segundos.",
+        headers={"Retry-After": "1"},
+    )
 
-router = APIRouter()
 
 @router.post("/", response_model=schemas.User, status_code=status.HTTP_201_CREATED)
-def create_user(
+async def create_user(
     user_in: schemas.UserCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_admin_user: models.User = Depends(dependencies.get_current_admin_user)
 ):
     """
     Crea un nuevo usuario en el sistema.
-    Solo accesible para administradores.
+    Solo accesible para administradores. Si el pool de bcrypt está saturado se responde 503.
     """
-    user = user_service.get_user_by_email(db, email=user_in.email)
+    user = await user_service.get_user_by_email(db, email=user_in.email)
     if user:
         raise HTTPException(
             status_code=400,
             detail="Ya existe un usuario con este correo electrónico.",
         )
-    return user_service.create_user(db, user_in=user_in)
+    try:
+        return await user_service.create_user(db, user_in=user_in)
+    except HashingSaturatedError:
+        raise _hashing_saturated()
 
 
-@router.get("/", response_model=List[schemas.User])
-def read_users(
-    skip: int = 0,
-    limit: int = 100,
-    db: Session = Depends(get_db),
+@router.get("/", response_model=schemas.UserPage)
+async def read_users(
+    request: Request,
+    limit: int = Query(100, ge=1, le=500),
+    cursor: Optional[str] = Query(None, description="'next_cursor' de la página anterior"),
+    is_active: Optional[bool] = None,
+    is_admin: Optional[bool] = None,
+    username_prefix: Optional[str] = Query(None, max_length=50),
+    include_total: bool = Query(False, description="Incluir el total aproximado de usuarios que cumplen los filtros"),
+    db: AsyncSession = Depends(get_async_db),
     current_admin_user: models.User = Depends(dependencies.get_current_admin_user)
 ):
     """
-    Obtiene una lista de usuarios.
+    Obtiene una página de usuarios ordenados por id, con filtros opcionales.
+    Paginación por cursor: pedir la siguiente página con 'cursor=next_cursor'.
     Solo accesible para administradores.
     """
-    users = user_service.get_users(db, skip=skip, limit=limit)
-    return users
+    filters = {"is_active": is_active, "is_admin": is_admin, "username_prefix": username_prefix}
+    try:
+        users, next_cursor = await user_service.get_users(db, limit=limit, cursor=cursor, **filters)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Cursor inválido.")
+    total = await user_service.estimate_user_count(db, **filters) if include_total else None
+    page = schemas.UserPage(
+        items=[schemas.User.model_validate(user) for user in users],
+        next_cursor=next_cursor,
+        total_estimate=total,
+    )
+    # Serialización directa a bytes (pydantic-core) y compresión según Accept-Encoding
+    return json_response(request, page.model_dump_json().encode("utf-8"))
 
 
 @router.get("/{user_id}", response_model=schemas.User)
-def read_user(
+async def read_user(
     user_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_admin_user: models.User = Depends(dependencies.get_current_admin_user)
 ):
     """
     Obtiene un usuario específico por su ID.
     Solo accesible para administradores.
     """
-    db_user = user_service.get_user(db, user_id=user_id)
+    db_user = await user_service.get_user(db, user_id=user_id)
+    if db_user is None:
+        raise HTTPException(status_code=404, detail="Usuario no encontrado")
+    return db_user
+
+
+@router.patch("/{user_id}", response_model=schemas.User)
+async def update_user(
+    user_id: int,
+    user_in: schemas.UserUpdate,
+    db: AsyncSession = Depends(get_async_db),
+    current_admin_user: models.User = Depends(dependencies.get_current_admin_user)
+):
+    """
+    Actualiza el correo, la contraseña o el estado (activo/inactivo) de un usuario.
+    Solo accesible para administradores. Invalida la caché de autenticación del usuario.
+    Si cambia la contraseña y el pool de bcrypt está saturado se responde 503.
+    """
+    db_user = await user_service.get_user(db, user_id=user_id)
     if db_user is None:
         raise HTTPException(status_code=404, detail="Usuario no encontrado")
-    return db_user
\ No newline at end of file
+    if user_in.email and user_in.email != db_user.email:
+        if await user_service.get_user_by_email(db, email=user_in.email):
+            raise HTTPException(
+                status_code=400,
+                detail="Ya existe un usuario con este correo electrónico.",
+            )
+    try:
+        return await user_service.update_user(db, db_user=db_user, user_in=user_in)
+    except HashingSaturatedError:
+        raise _hashing_saturated()
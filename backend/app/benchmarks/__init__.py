@@ -0,0 +1,6 @@
+# /app/benchmarks/__init__.py
+#
+# Reproducible load tests for the documents API: synthetic corpus generation
+# (corpus.py), concurrent scenario runner and percentile reports (runner.py),
+# and the `python -m app.benchmarks` command line (__main__.py).
+# Not imported by the application; requires the extra packages in requirements.txt.
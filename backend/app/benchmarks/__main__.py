@@ -0,0 +1,296 @@
+# /app/benchmarks/__main__.py
+
+"""
+Benchmark runner. From the backend directory:
+
+    python -m app.benchmarks --files 10000 --output bench.json
+    python -m app.benchmarks --mode http --workers 4 --concurrency 32
+    python -m app.benchmarks --base-url http://localhost:8000 --username admin --password ...
+    python -m app.benchmarks --files 10000 --baseline before.json
+
+Without --base-url a synthetic corpus is generated under a temporary
+directory and the app is configured to use it (DOCS_DIRECTORY, cache and
+site directories, and SQLite unless --database-url points at e.g. a local
+Postgres).
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from contextlib import asynccontextmanager
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+import httpx
+
+from app.benchmarks.corpus import generate_corpus
+from app.benchmarks.runner import build_scenarios, flatten_tree, run_scenario
+
+# Bump when the report layout changes, so comparisons refuse mismatched files.
+REPORT_FORMAT_VERSION = 1
+# The directory containing the `app` package, where uvicorn must be started.
+BACKEND_DIR = Path(__file__).resolve().parents[2]
+LOGIN_URL = "/api/v1/login/access-token"
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(prog="python -m app.benchmarks", description="DocuHub load test and benchmark.")
+    parser.add_argument("--mode", choices=("inprocess", "http"), default="inprocess",
+                        help="Drive the app through ASGI in this process, or over HTTP with uvicorn.")
+    parser.add_argument("--base-url", help="Benchmark an already running server instead of a generated corpus.")
+    parser.add_argument("--username", default="benchmark", help="Account to log in with.")
+    parser.add_argument("--password", default="benchmark-password")
+    parser.add_argument("--workdir", help="Where the corpus, database and caches go (default: a new temp dir).")
+    parser.add_argument("--database-url", help="Database for the app (default: SQLite in the workdir).")
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn worker processes in http mode.")
+    parser.add_argument("--files", type=int, default=1000, help="Documents in the synthetic corpus.")
+    parser.add_argument("--projects", type=int, default=10)
+    parser.add_argument("--words", type=int, default=400, help="Approximate words per document.")
+    parser.add_argument("--history-commits", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--concurrency", type=int, default=8, help="Concurrent clients per scenario.")
+    parser.add_argument("--requests", type=int, default=200, help="Measured requests for tree, read and save.")
+    parser.add_argument("--slow-requests", type=int, default=10, help="Measured requests for pdf and publish.")
+    parser.add_argument("--scenarios", default="tree,read,save,pdf,publish",
+                        help="Comma-separated scenarios to run, in order.")
+    parser.add_argument("--output", help="Write the JSON report here instead of stdout.")
+    parser.add_argument("--baseline", help="A previous report to compare latencies and throughput against.")
+    return parser.parse_args(argv)
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _code_revision() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"], cwd=BACKEND_DIR, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def prepare_environment(args: argparse.Namespace, workdir: Path) -> Dict[str, Any]:
+    """
+    Generates the corpus and points the app's settings at the work directory.
+    Must run before anything under `app` other than this package is imported,
+    since settings are read once at import time.
+
+    Returns:
+        Dict[str, Any]: The corpus description for the report.
+    """
+    docs = workdir / "docs"
+    started = time.perf_counter()
+    if not (docs / ".git").exists():
+        print(f"Generating {args.files} documents under {docs}...", file=sys.stderr)
+        generate_corpus(
+            docs,
+            files=args.files,
+            projects=args.projects,
+            approx_words=args.words,
+            history_commits=args.history_commits,
+            seed=args.seed,
+        )
+    os.environ.update({
+        "DOCS_DIRECTORY": str(docs),
+        "SITE_DIRECTORY": str(workdir / "site"),
+        "CACHE_DIRECTORY": str(workdir / "cache"),
+        "DATABASE_URL": args.database_url or f"sqlite:///{workdir / 'benchmark.db'}",
+        "SECRET_KEY": os.environ.get("SECRET_KEY") or "benchmark-secret",
+        # The benchmark measures the documents API, not bcrypt.
+        "BCRYPT_ROUNDS": "4",
+    })
+    return {
+        "files": args.files,
+        "projects": args.projects,
+        "approx_words": args.words,
+        "history_commits": args.history_commits,
+        "seed": args.seed,
+        "generation_seconds": round(time.perf_counter() - started, 2),
+    }
+
+
+async def ensure_user(username: str, password: str) -> None:
+    """Creates the benchmark admin account in the configured database if missing."""
+    from app.db import models, schemas
+    from app.db.database import AsyncSessionLocal, engine
+    from app.services import user_service
+
+    models.Base.metadata.create_all(bind=engine)
+    async with AsyncSessionLocal() as db:
+        if await user_service.get_user_by_username(db, username=username):
+            return
+        user = await user_service.create_user(
+            db, schemas.UserCreate(username=username, email=f"{username}@example.com", password=password)
+        )
+        user.is_admin = True
+        db.add(user)
+        await db.commit()
+
+
+@asynccontextmanager
+async def _lifespan(app: Any) -> AsyncIterator[None]:
+    """Runs the app's startup and shutdown handlers, as a server would."""
+    to_app: asyncio.Queue = asyncio.Queue()
+    from_app: asyncio.Queue = asyncio.Queue()
+    task = asyncio.create_task(
+        app({"type": "lifespan", "asgi": {"version": "3.0"}, "state": {}}, to_app.get, from_app.put)
+    )
+    await to_app.put({"type": "lifespan.startup"})
+    message = await from_app.get()
+    if message["type"] == "lifespan.startup.failed":
+        raise RuntimeError(f"Application startup failed: {message.get('message')}")
+    try:
+        yield
+    finally:
+        await to_app.put({"type": "lifespan.shutdown"})
+        await from_app.get()
+        await task
+
+
+@asynccontextmanager
+async def open_client(args: argparse.Namespace) -> AsyncIterator[httpx.AsyncClient]:
+    """Yields an HTTP client bound to the app under test, in the selected mode."""
+    limits = httpx.Limits(max_connections=args.concurrency * 2, max_keepalive_connections=args.concurrency * 2)
+    timeout = httpx.Timeout(600.0)
+
+    if args.base_url:
+        async with httpx.AsyncClient(base_url=args.base_url, limits=limits, timeout=timeout) as client:
+            yield client
+        return
+
+    await ensure_user(args.username, args.password)
+    if args.mode == "inprocess":
+        from app.main import app
+
+        async with _lifespan(app):
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://benchmark", timeout=timeout) as client:
+                yield client
+        return
+
+    port = _free_port()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--host", "127.0.0.1", "--port", str(port),
+         "--workers", str(args.workers), "--log-level", "warning"],
+        cwd=BACKEND_DIR,
+    )
+    try:
+        async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{port}", limits=limits, timeout=timeout) as client:
+            deadline = time.monotonic() + 120
+            while True:
+                try:
+                    if (await client.get("/health/ready")).status_code == 200:
+                        break
+                except httpx.TransportError:
+                    pass
+                if server.poll() is not None or time.monotonic() > deadline:
+                    raise RuntimeError("The uvicorn server did not start.")
+                await asyncio.sleep(0.2)
+            yield client
+    finally:
+        server.terminate()
+        server.wait(timeout=30)
+
+
+async def run(args: argparse.Namespace, corpus: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """Logs in, discovers the documents and runs every selected scenario."""
+    async with open_client(args) as client:
+        response = await client.post(LOGIN_URL, data={"username": args.username, "password": args.password})
+        response.raise_for_status()
+        client.headers["Authorization"] = f"Bearer {response.json()['access_token']}"
+
+        tree = await client.get("/api/v1/documents/tree")
+        tree.raise_for_status()
+        paths = flatten_tree(tree.json())
+
+        local = not args.base_url
+        scenarios = build_scenarios(
+            paths,
+            requests=args.requests,
+            slow_requests=args.slow_requests,
+            seed=args.seed,
+            pdf_unavailable="pandoc is not installed." if local and not shutil.which("pandoc") else None,
+            publish_unavailable="mkdocs is not installed." if local and not shutil.which("mkdocs") else None,
+        )
+        selected = [name.strip() for name in args.scenarios.split(",") if name.strip()]
+        results = {}
+        for scenario in sorted((s for s in scenarios if s.name in selected), key=lambda s: selected.index(s.name)):
+            print(f"Running '{scenario.name}'...", file=sys.stderr)
+            results[scenario.name] = await run_scenario(client, scenario, args.concurrency)
+
+    return {
+        "format_version": REPORT_FORMAT_VERSION,
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "code_revision": _code_revision(),
+        "environment": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+        },
+        "config": {
+            "mode": "external" if args.base_url else args.mode,
+            "workers": args.workers if args.mode == "http" and not args.base_url else None,
+            "database": (os.environ.get("DATABASE_URL", "").split(":", 1)[0] or None) if not args.base_url else None,
+            "concurrency": args.concurrency,
+            "requests": args.requests,
+            "slow_requests": args.slow_requests,
+        },
+        "corpus": {**(corpus or {}), "documents_found": len(paths)},
+        "scenarios": results,
+    }
+
+
+def compare(baseline: Dict[str, Any], report: Dict[str, Any]) -> str:
+    """
+    Formats the relative change of each scenario's throughput and latency
+    percentiles against a baseline report (negative latency change = faster).
+    """
+    if baseline.get("format_version") != report["format_version"]:
+        return "Baseline report has a different format version; not comparing."
+    lines = [f"{'scenario':<10}{'metric':<16}{'baseline':>12}{'current':>12}{'change':>10}"]
+    for name, current in report["scenarios"].items():
+        before = baseline.get("scenarios", {}).get(name)
+        if not before or "skipped" in before or "skipped" in current:
+            continue
+        metrics = [("throughput_rps", before["throughput_rps"], current["throughput_rps"])]
+        metrics += [
+            (f"{key}_ms", before["latency_ms"][key], current["latency_ms"][key]) for key in ("p50", "p95", "p99")
+        ]
+        for metric, old, new in metrics:
+            change = f"{100 * (new - old) / old:+.1f}%" if old else "n/a"
+            lines.append(f"{name:<10}{metric:<16}{old:>12}{new:>12}{change:>10}")
+    return "\n".join(lines)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    args = parse_args(argv)
+    corpus = None
+    if not args.base_url:
+        workdir = Path(args.workdir) if args.workdir else Path(tempfile.mkdtemp(prefix="docuhub-benchmark-"))
+        corpus = prepare_environment(args, workdir)
+
+    report = asyncio.run(run(args, corpus))
+    text = json.dumps(report, indent=2, sort_keys=True)
+    if args.output:
+        Path(args.output).write_text(text + "\n", encoding="utf-8")
+    else:
+        print(text)
+    if args.baseline:
+        print(compare(json.loads(Path(args.baseline).read_text(encoding="utf-8")), report), file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+# /app/benchmarks/corpus.py
+
+import os
+import random
+import subprocess
+from pathlib import Path
+from typing import List
+
+# Words the synthetic documents are written with; a small vocabulary keeps
+# documents realistic for search and diff workloads (repeated terms).
+_WORDS = (
+    "api cache client commit config database deploy document endpoint error git "
+    "index install lock manual merge network page pipeline project publish query "
+    "release render request response review schema search server service session "
+    "setup site status storage template test token tree update upgrade user version "
+    "workflow the a of to and in for is on with by this that from as be are it"
+).split()
+
+_GIT_AUTHOR_ENV = {
+    "GIT_AUTHOR_NAME": "benchmark",
+    "GIT_AUTHOR_EMAIL": "benchmark@example.com",
+    "GIT_COMMITTER_NAME": "benchmark",
+    "GIT_COMMITTER_EMAIL": "benchmark@example.com",
+}
+
+
+def _sentence(rng: random.Random, words: int) -> str:
+    text = " ".join(rng.choice(_WORDS) for _ in range(words))
+    return text[0].upper() + text[1:] + "."
+
+
+def make_document(rng: random.Random, title: str, approx_words: int) -> str:
+    """
+    Builds a Markdown document with headings, paragraphs, lists and code
+    blocks, roughly `approx_words` long.
+
+    Args:
+        rng (random.Random): The seeded generator, for reproducible output.
+        title (str): The level-1 heading.
+        approx_words (int): Target length in words.
+
+    Returns:
+        str: The Markdown text.
+    """
+    parts = [f"# {title}", ""]
+    written = 0
+    section = 1
+    while written < approx_words:
+        parts += [f"## Section {section}", ""]
+        for _ in range(rng.randint(1, 3)):
+            paragraph = " ".join(_sentence(rng, rng.randint(6, 18)) for _ in range(rng.randint(2, 5)))
+            parts += [paragraph, ""]
+            written += paragraph.count(" ") + 1
+        kind = rng.random()
+        if kind < 0.3:
+            parts += [f"- {_sentence(rng, rng.randint(3, 8))}" for _ in range(rng.randint(2, 6))] + [""]
+        elif kind < 0.45:
+            parts += ["```bash", f"docuhub {rng.choice(_WORDS)} --{rng.choice(_WORDS)}", "```", ""]
+        section += 1
+    return "\n".join(parts)
+
+
+def synthetic_paths(rng: random.Random, files: int, projects: int, max_depth: int, fanout: int) -> List[str]:
+    """
+    Draws the relative paths of a corpus: each document goes to a random
+    project and a random chain of nested sections.
+
+    Args:
+        rng (random.Random): The seeded generator.
+        files (int): Number of documents.
+        projects (int): Number of top-level project directories.
+        max_depth (int): Maximum section nesting below a project.
+        fanout (int): Number of distinct section names per level.
+
+    Returns:
+        List[str]: Paths such as 'Project 003/section-1/section-4/doc-000042.md'.
+    """
+    paths = []
+    for number in range(files):
+        parts = [f"Project {rng.randrange(projects):03d}"]
+        parts += [f"section-{rng.randrange(fanout)}" for _ in range(rng.randint(0, max_depth))]
+        paths.append("/".join(parts + [f"doc-{number:06d}.md"]))
+    return paths
+
+
+def _git(root: Path, *args: str) -> None:
+    subprocess.run(
+        ["git", *args],
+        cwd=root,
+        check=True,
+        capture_output=True,
+        env={**os.environ, **_GIT_AUTHOR_ENV},
+    )
+
+
+def generate_corpus(
+    root: Path,
+    files: int,
+    projects: int = 10,
+    max_depth: int = 3,
+    fanout: int = 8,
+    approx_words: int = 400,
+    history_commits: int = 20,
+    changes_per_commit: int = 50,
+    seed: int = 0,
+) -> List[str]:
+    """
+    Writes a reproducible documentation corpus and its git history: Markdown
+    files spread over project directories and nested sections, one initial
+    commit with every file, then `history_commits` commits each rewriting a
+    random sample of documents. The same arguments always produce the same
+    files and the same history shape.
+
+    Args:
+        root (Path): The (empty or missing) documents directory.
+        files (int): Number of Markdown files.
+        projects (int): Number of top-level project directories.
+        max_depth (int): Maximum section nesting below a project.
+        fanout (int): Number of distinct section names per level.
+        approx_words (int): Approximate length of each document.
+        history_commits (int): Follow-up commits after the initial one.
+        changes_per_commit (int): Documents rewritten by each follow-up commit.
+        seed (int): Random seed.
+
+    Returns:
+        List[str]: The relative paths of the generated documents.
+    """
+    rng = random.Random(seed)
+    root.mkdir(parents=True, exist_ok=True)
+    _git(root, "init", "-q")
+
+    paths = synthetic_paths(rng, files, projects, max_depth, fanout)
+
+    for number, relative_path in enumerate(paths):
+        full_path = root / relative_path
+        full_path.parent.mkdir(parents=True, exist_ok=True)
+        full_path.write_text(make_document(rng, f"Document {number}", approx_words), encoding="utf-8")
+    _git(root, "add", "-A")
+    _git(root, "commit", "-q", "-m", f"Synthetic corpus: {files} documents")
+
+    for revision in range(1, history_commits + 1):
+        for relative_path in rng.sample(paths, min(changes_per_commit, len(paths))):
+            title = f"{Path(relative_path).stem} (revision {revision})"
+            (root / relative_path).write_text(make_document(rng, title, approx_words), encoding="utf-8")
+        _git(root, "commit", "-q", "-a", "-m", f"Synthetic revision {revision}")
+    return paths
@@ -0,0 +1,184 @@
+# /app/benchmarks/runner.py
+
+import asyncio
+import itertools
+import math
+import random
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+import httpx
+
+API = "/api/v1/documents"
+# Publish job states after which polling stops.
+_FINISHED_STATES = {"succeeded", "failed"}
+
+# One benchmarked operation: takes the client and the worker's request number,
+# returns the HTTP status that decides success.
+Operation = Callable[[httpx.AsyncClient, int], Awaitable[int]]
+
+
+@dataclass
+class Scenario:
+    """An endpoint workload: what one request does and how many to send."""
+
+    name: str
+    operation: Operation
+    requests: int
+    warmup: int = 0
+    # Set when the scenario cannot run here (e.g. pandoc is not installed).
+    skipped: Optional[str] = None
+
+
+@dataclass
+class Result:
+    latencies: List[float] = field(default_factory=list)
+    statuses: Counter = field(default_factory=Counter)
+    errors: int = 0
+    elapsed: float = 0.0
+
+
+def percentile(sorted_values: List[float], fraction: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(fraction * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+def summarize(result: Result) -> Dict[str, Any]:
+    """
+    Reduces raw measurements to the report fields: throughput, error count,
+    status codes and latency percentiles in milliseconds.
+    """
+    latencies = sorted(result.latencies)
+    count = len(latencies)
+    return {
+        "requests": count,
+        "errors": result.errors,
+        "status_codes": {str(code): n for code, n in sorted(result.statuses.items())},
+        "elapsed_seconds": round(result.elapsed, 4),
+        "throughput_rps": round(count / result.elapsed, 2) if result.elapsed else 0.0,
+        "latency_ms": {
+            "mean": round(1000 * sum(latencies) / count, 3) if count else 0.0,
+            "p50": round(1000 * percentile(latencies, 0.50), 3),
+            "p95": round(1000 * percentile(latencies, 0.95), 3),
+            "p99": round(1000 * percentile(latencies, 0.99), 3),
+            "max": round(1000 * latencies[-1], 3) if count else 0.0,
+        },
+    }
+
+
+async def run_scenario(client: httpx.AsyncClient, scenario: Scenario, concurrency: int) -> Dict[str, Any]:
+    """
+    Sends the scenario's warm-up requests, then its measured requests from
+    `concurrency` concurrent workers sharing one request counter.
+
+    Returns:
+        Dict[str, Any]: The scenario's summary (see `summarize()`).
+    """
+    if scenario.skipped:
+        return {"skipped": scenario.skipped}
+
+    for number in range(scenario.warmup):
+        await scenario.operation(client, number)
+
+    result = Result()
+    counter = itertools.count()
+
+    async def worker() -> None:
+        while (number := next(counter)) < scenario.requests:
+            started = time.perf_counter()
+            try:
+                status_code = await scenario.operation(client, number)
+            except httpx.HTTPError as e:
+                result.errors += 1
+                result.statuses[type(e).__name__] += 1
+                continue
+            result.latencies.append(time.perf_counter() - started)
+            result.statuses[status_code] += 1
+            if status_code >= 400:
+                result.errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(max(1, concurrency))))
+    result.elapsed = time.perf_counter() - started
+    return summarize(result)
+
+
+def flatten_tree(nodes: List[Dict[str, Any]]) -> List[str]:
+    """Returns the paths of every Markdown file in a `/documents/tree` response."""
+    paths = []
+    stack = list(nodes)
+    while stack:
+        node = stack.pop()
+        if node.get("type") == "file" and node.get("path", "").endswith(".md"):
+            paths.append(node["path"])
+        stack.extend(node.get("children") or [])
+    return sorted(paths)
+
+
+def build_scenarios(
+    paths: List[str],
+    requests: int,
+    slow_requests: int,
+    seed: int = 0,
+    pdf_unavailable: Optional[str] = None,
+    publish_unavailable: Optional[str] = None,
+    publish_timeout: float = 600.0,
+) -> List[Scenario]:
+    """
+    Builds the standard workloads: tree, read, save, pdf and publish. Target
+    documents are drawn from `paths` with a seeded generator so two runs over
+    the same corpus hit the same documents in the same order.
+
+    Args:
+        paths (List[str]): Documents to read, save and render.
+        requests (int): Measured requests for tree, read and save.
+        slow_requests (int): Measured requests for pdf and publish.
+        seed (int): Random seed for target selection.
+        pdf_unavailable (Optional[str]): Reason to skip the pdf scenario.
+        publish_unavailable (Optional[str]): Reason to skip the publish scenario.
+        publish_timeout (float): Seconds to wait for one publish job.
+    """
+    rng = random.Random(seed)
+    targets = [rng.choice(paths) for _ in range(max(requests, slow_requests))] if paths else []
+
+    async def tree(client: httpx.AsyncClient, number: int) -> int:
+        return (await client.get(f"{API}/tree")).status_code
+
+    async def read(client: httpx.AsyncClient, number: int) -> int:
+        return (await client.get(f"{API}/content/{targets[number % len(targets)]}")).status_code
+
+    async def save(client: httpx.AsyncClient, number: int) -> int:
+        path = targets[number % len(targets)]
+        content = f"# Benchmark save {number}\n\nWritten by the save scenario at {time.time()}.\n"
+        return (await client.post(f"{API}/content/{path}", json={"content": content})).status_code
+
+    async def pdf(client: httpx.AsyncClient, number: int) -> int:
+        # Read in reverse so the pdf renders do not only hit documents the save scenario just rewrote.
+        return (await client.get(f"{API}/pdf/{targets[-1 - number % len(targets)]}")).status_code
+
+    async def publish(client: httpx.AsyncClient, number: int) -> int:
+        response = await client.post(f"{API}/publish")
+        if response.status_code >= 400:
+            return response.status_code
+        job = response.json()
+        deadline = time.monotonic() + publish_timeout
+        while job["status"] not in _FINISHED_STATES and time.monotonic() < deadline:
+            await asyncio.sleep(0.1)
+            job = (await client.get(f"{API}/publish/{job['id']}")).json()
+        if job["status"] == "succeeded":
+            return 200
+        return 504 if job["status"] not in _FINISHED_STATES else 500
+
+    no_documents = None if paths else "The corpus has no Markdown documents."
+    return [
+        Scenario("tree", tree, requests, warmup=5),
+        Scenario("read", read, requests, warmup=5, skipped=no_documents),
+        Scenario("save", save, requests, warmup=2, skipped=no_documents),
+        Scenario("pdf", pdf, slow_requests, skipped=no_documents or pdf_unavailable),
+        Scenario("publish", publish, slow_requests, skipped=publish_unavailable),
+    ]
@@ -0,0 +1,106 @@
+# /app/benchmarks/serialization.py
+
+"""
+Micro-benchmark of the tree response's serialization cost. From the backend directory:
+
+    python -m app.benchmarks.serialization --files 10000 100000
+
+Compares, for a synthetic tree shaped like `tree_index.tree()`:
+  - response_model: what FastAPI does with `response_model=List[FileNode]`
+    (validate every node, dump it to JSON-compatible data, json.dumps);
+  - dumps: one serialization of the plain dicts (orjson when installed);
+  - cached: serving the bytes cached alongside the tree (after the first request);
+  - gzip: compressing the body once per tree version, and the size saved.
+"""
+
+import argparse
+import json
+import random
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+from pydantic import BaseModel, TypeAdapter
+
+from app.benchmarks.corpus import synthetic_paths
+from app.core.responses import EncodedJSON, compress, dumps, orjson
+
+
+class _FileNode(BaseModel):
+    # Same shape as the FileNode response model of the project-docs router.
+    name: str
+    path: str
+    type: str
+    children: Optional[List["_FileNode"]] = None
+
+
+def build_tree(paths: List[str]) -> List[Dict[str, Any]]:
+    """Builds nodes in the same layout and order as `DocumentTreeIndex.tree()`."""
+    root: Dict[str, Any] = {}
+    for path in paths:
+        node = root
+        for part in path.split("/")[:-1]:
+            node = node.setdefault(part, {})
+        node[path.rsplit("/", 1)[-1]] = None
+
+    def nodes(level: Dict[str, Any], prefix: str) -> List[Dict[str, Any]]:
+        result = []
+        for name in sorted(level):
+            path = f"{prefix}/{name}" if prefix else name
+            if level[name] is None:
+                result.append({"name": name, "type": "file", "path": path})
+            else:
+                result.append({"name": name, "type": "directory", "path": path, "children": nodes(level[name], path)})
+        return result
+
+    return nodes(root, "")
+
+
+def _best_of(function: Callable[[], Any], repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        function()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def measure(files: int, repeat: int = 5, seed: int = 0) -> Dict[str, Any]:
+    """
+    Times each serialization path for a tree of `files` documents.
+
+    Returns:
+        Dict[str, Any]: Best-of-`repeat` timings in milliseconds and body sizes in bytes.
+    """
+    tree = build_tree(synthetic_paths(random.Random(seed), files, projects=10, max_depth=3, fanout=8))
+    adapter = TypeAdapter(List[_FileNode])
+
+    def response_model() -> bytes:
+        data = adapter.dump_python(adapter.validate_python(tree), mode="json")
+        return json.dumps(data, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode("utf-8")
+
+    body = dumps(tree)
+    encoded = EncodedJSON(body)
+    encoded.encoded("gzip")
+    gzipped = compress(body, "gzip")
+    return {
+        "files": files,
+        "encoder": "orjson" if orjson is not None else "json",
+        "response_model_ms": round(1000 * _best_of(response_model, repeat), 3),
+        "dumps_ms": round(1000 * _best_of(lambda: dumps(tree), repeat), 3),
+        "cached_ms": round(1000 * _best_of(lambda: encoded.encoded("gzip"), repeat), 3),
+        "gzip_ms": round(1000 * _best_of(lambda: compress(body, "gzip"), repeat), 3),
+        "body_bytes": len(body),
+        "gzip_bytes": len(gzipped),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(prog="python -m app.benchmarks.serialization")
+    parser.add_argument("--files", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    print(json.dumps([measure(files, args.repeat) for files in args.files], indent=2))
+
+
+if __name__ == "__main__":
+    main()
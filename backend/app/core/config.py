@@ -1,6 +1,7 @@
 #
 # /app/core/config.py
 import os
+from typing import Optional
 from pydantic_settings import BaseSettings
 
 class Settings(BaseSettings):
@@ -10,12 +11,101 @@ class Settings(BaseSettings):
 
     # Lee desde las variables de entorno inyectadas por Docker Compose
     DATABASE_URL: str = os.getenv("DATABASE_URL")
+    # URL del motor asíncrono; si no se define se deriva de DATABASE_URL (postgresql -> postgresql+asyncpg)
+    ASYNC_DATABASE_URL: Optional[str] = None
     SECRET_KEY: str = os.getenv("SECRET_KEY")
+
+    # Pool de conexiones (aplica a los motores síncrono y asíncrono)
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: float = 30.0
+    DB_POOL_RECYCLE: int = 1800
+    DB_POOL_PRE_PING: bool = True
+
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
     ALGORITHM: str = "HS256"
 
+    # Hashing de contraseñas: coste de bcrypt y pool dedicado con cola acotada
+    BCRYPT_ROUNDS: int = 12
+    PASSWORD_HASH_WORKERS: int = 2
+    PASSWORD_HASH_MAX_PENDING: int = 32
+
+    # Caché de autenticación: usuarios resueltos y tokens ya verificados
+    AUTH_CACHE_TTL_SECONDS: float = 60.0
+    AUTH_CACHE_MAX_ENTRIES: int = 10000
+
+    # Listado de usuarios: segundos que se reutiliza el total estimado de cada filtro
+    USER_COUNT_CACHE_TTL_SECONDS: float = 60.0
+
+    # Flujo de eventos (SSE): eventos pendientes por cliente antes de pedirle que resincronice,
+    # y eventos recientes guardados para reanudar una conexión (Last-Event-ID)
+    EVENT_SUBSCRIBER_BUFFER: int = 256
+    EVENT_HISTORY_SIZE: int = 1000
+    EVENT_KEEPALIVE_SECONDS: float = 15.0
+    # Segundos de validez del ticket de un solo uso con el que EventSource abre el flujo
+    STREAM_TICKET_EXPIRE_SECONDS: int = 30
+
+    # Bloqueos de edición: un bloqueo caduca si no se renueva (heartbeat) antes de este plazo
+    DOCUMENT_LOCK_TTL_SECONDS: float = 120.0
+
     # Rutas del sistema de archivos
     DOCS_DIRECTORY: str = "/docs_source"
+    SITE_DIRECTORY: str = "/docs_build/site"
+
+    # Commits agrupados: ventana de espera (segundos) y tamaño máximo de lote
+    GROUP_COMMIT_WINDOW: float = 0.05
+    GROUP_COMMIT_MAX_BATCH: int = 200
+    # Segundos máximos que un guardado espera a su commit (cola, bloqueo de escritura y commit)
+    GROUP_COMMIT_SAVE_TIMEOUT: float = 120.0
+
+    # Arranque: precarga en segundo plano de las cachés (árbol, búsqueda, historial y los
+    # documentos modificados más recientemente); /health/ready no responde 200 hasta que termina
+    STARTUP_WARMUP: bool = True
+    STARTUP_WARMUP_DOCUMENTS: int = 200
+    # Tiempo máximo (segundos) de la comprobación de la base de datos en /health/ready
+    READINESS_DB_TIMEOUT: float = 2.0
+
+    # Varios workers: segundos máximos de espera por el bloqueo de escritura del repositorio Git
+    REPO_WRITE_LOCK_TIMEOUT: float = 30.0
+    # Varios workers: segundos máximos que una publicación espera a que termine la compilación
+    # de MkDocs de otro worker sobre el mismo SITE_DIRECTORY
+    PUBLISH_SITE_LOCK_TIMEOUT: float = 600.0
+    # Señales entre workers para invalidar cachés: segundos entre lecturas del diario (0 las desactiva)
+    # y tamaño en bytes a partir del cual el diario se rota
+    WORKER_SIGNAL_POLL_INTERVAL: float = 0.5
+    WORKER_SIGNAL_JOURNAL_MAX_BYTES: int = 4 * 1024 * 1024
+
+    # Importación masiva (zip/tar): tamaño máximo de la subida, número de archivos, tamaño de cada
+    # archivo y tamaño total descomprimido (protege frente a archivos comprimidos maliciosos)
+    IMPORT_MAX_UPLOAD_BYTES: int = 1024 * 1024 * 1024
+    IMPORT_MAX_FILES: int = 100000
+    IMPORT_MAX_FILE_BYTES: int = 50 * 1024 * 1024
+    IMPORT_MAX_TOTAL_BYTES: int = 4 * 1024 * 1024 * 1024
+
+    # Índice en memoria del árbol de documentos (segundos entre pasadas del watcher; 0 lo desactiva)
+    TREE_INDEX_POLL_INTERVAL: float = 2.0
+
+    # Datos derivados persistentes (índice de búsqueda, cachés). Fuera del repo Git de documentos.
+    CACHE_DIRECTORY: str = "/docs_build/.cache"
+    SEARCH_INDEX_FLUSH_INTERVAL: float = 30.0
+    HISTORY_INDEX_FLUSH_INTERVAL: float = 30.0
+
+    # Respuestas JSON grandes (árbol, listados): tamaño mínimo en bytes para comprimirlas (gzip/brotli)
+    RESPONSE_COMPRESSION_MIN_BYTES: int = 1024
+
+    # Caché de contenido de documentos (LRU): presupuesto total en bytes (0 la desactiva)
+    # y tamaño máximo de un documento para entrar en caché
+    DOCUMENT_CACHE_MAX_BYTES: int = 64 * 1024 * 1024
+    DOCUMENT_CACHE_MAX_ENTRY_BYTES: int = 1024 * 1024
+
+    # Número de archivos cuyo hash de blob (ETag) se memoriza por (inodo, tamaño, mtime)
+    BLOB_HASH_CACHE_ENTRIES: int = 10000
+
+    # Generación de PDF con Pandoc: caché en disco y pool de procesos acotado
+    PDF_CACHE_MAX_BYTES: int = 512 * 1024 * 1024
+    PDF_RENDER_WORKERS: int = 2
+    PDF_RENDER_MAX_QUEUE: int = 16
+    PDF_RENDER_TIMEOUT: float = 120.0
 
     class Config:
         case_sensitive = True
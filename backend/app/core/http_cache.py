@@ -0,0 +1,96 @@
+# /app/core/http_cache.py
+
+from typing import Optional, Tuple
+
+# Los documentos requieren autenticación: solo la caché privada del navegador puede
+# guardarlos, y debe revalidarlos (If-None-Match) antes de cada uso.
+DOCUMENT_CACHE_CONTROL = "private, no-cache"
+
+
+def make_etag(blob_sha: str) -> str:
+    """
+    Builds a strong ETag header value from a git blob SHA.
+
+    Args:
+        blob_sha (str): The hex SHA of the document content.
+
+    Returns:
+        str: The quoted ETag.
+    """
+    return f'"{blob_sha}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """
+    Evaluates an If-None-Match header against the current ETag, using the
+    weak comparison that RFC 9110 prescribes for this header.
+
+    Args:
+        if_none_match (Optional[str]): The raw header value sent by the client.
+        etag (str): The current ETag of the resource.
+
+    Returns:
+        bool: True if the client's copy is current and a 304 can be sent.
+    """
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag[2:] if etag.startswith("W/") else etag
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == opaque:
+            return True
+    return False
+
+
+def if_range_matches(if_range: Optional[str], etag: str) -> bool:
+    """
+    Evaluates an If-Range header: the Range may only be honoured if the
+    client's validator is exactly the current strong ETag. Dates are not
+    accepted as validators (documents are identified by content, not mtime).
+
+    Args:
+        if_range (Optional[str]): The raw header value, if any.
+        etag (str): The current (strong) ETag of the resource.
+
+    Returns:
+        bool: True if there is no If-Range header or it matches.
+    """
+    return if_range is None or if_range.strip() == etag
+
+
+def parse_byte_range(range_header: Optional[str], size: int) -> Optional[Tuple[int, int]]:
+    """
+    Parses a single-range `Range: bytes=...` header (RFC 9110, section 14.2).
+    Headers the server may ignore (missing, malformed, other units, several
+    ranges) yield None, meaning the whole representation is sent with 200.
+
+    Args:
+        range_header (Optional[str]): The raw header value, if any.
+        size (int): The size of the representation in bytes.
+
+    Raises:
+        ValueError: If the range cannot be satisfied (answer 416).
+
+    Returns:
+        Optional[Tuple[int, int]]: (first byte, last byte), both inclusive.
+    """
+    if not range_header:
+        return None
+    unit, _, spec = range_header.partition("=")
+    if unit.strip().lower() != "bytes" or "," in spec:
+        return None
+    first, _, last = (part.strip() for part in spec.partition("-"))
+    if (first and not first.isdigit()) or (last and not last.isdigit()) or not (first or last):
+        return None
+    if first and last and int(first) > int(last):
+        return None
+    if size == 0 or (first and int(first) >= size) or (not first and int(last) == 0):
+        raise ValueError("Unsatisfiable range.")
+    if not first:
+        # Suffix range: the last N bytes.
+        return max(0, size - int(last)), size - 1
+    return int(first), min(int(last), size - 1) if last else size - 1
@@ -0,0 +1,153 @@
+# /app/core/metrics.py
+
+import time
+from contextlib import contextmanager
+from typing import Callable, Iterable, Iterator, List
+
+from prometheus_client import REGISTRY, Counter, Gauge, Histogram
+from prometheus_client.metrics_core import Metric
+from prometheus_client.registry import Collector
+
+# Latency histograms use the prometheus_client default buckets (5 ms to 10 s).
+# Buckets for slow subprocesses (pandoc, mkdocs), in seconds.
+SUBPROCESS_BUCKETS = (0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0)
+
+
+@contextmanager
+def time_with_outcome(histogram: Histogram, *label_values: str) -> Iterator[None]:
+    """
+    Observes the duration of the `with` block on a histogram whose last label
+    is 'outcome'. Pass the values of the other labels: the outcome is filled
+    in as 'success' or 'error' depending on whether the block raised.
+    """
+    started = time.perf_counter()
+    outcome = "success"
+    try:
+        yield
+    except BaseException:
+        outcome = "error"
+        raise
+    finally:
+        histogram.labels(*label_values, outcome).observe(time.perf_counter() - started)
+
+
+class _CallbackCollector(Collector):
+    """Adapts a function evaluated at scrape time to the prometheus_client registry."""
+
+    def __init__(self, callback: Callable[[], Iterable[Metric]]):
+        self.callback = callback
+
+    def collect(self) -> List[Metric]:
+        try:
+            return list(self.callback())
+        except Exception as e:
+            print(f"Error collecting metrics from {self.callback!r}: {e}")
+            return []
+
+    def describe(self) -> List[Metric]:
+        # Nothing to check against the other metric names: the callback is only run at scrape time.
+        return []
+
+
+def register_collector(callback: Callable[[], Iterable[Metric]]) -> None:
+    """
+    Registers a function evaluated at scrape time, for values that are cheaper
+    to read on demand than to track (e.g. connection pool usage).
+
+    Args:
+        callback: Returns prometheus_client metric families (e.g. GaugeMetricFamily).
+    """
+    REGISTRY.register(_CallbackCollector(callback))
+
+
+# --- HTTP metrics ---
+HTTP_REQUEST_DURATION = Histogram(
+    "docuhub_http_request_duration_seconds",
+    "HTTP request latency, by method, route template and status code.",
+    labelnames=("method", "route", "status"),
+)
+HTTP_REQUESTS_IN_FLIGHT = Gauge(
+    "docuhub_http_requests_in_flight",
+    "HTTP requests currently being served.",
+)
+
+# --- Startup metrics ---
+STARTUP_PHASE_DURATION = Gauge(
+    "docuhub_startup_phase_seconds",
+    "Duration of each startup and cache warm-up phase of this process.",
+    labelnames=("phase",),
+)
+
+# --- Login metrics ---
+LOGIN_LATENCY = Histogram(
+    "docuhub_login_duration_seconds",
+    "Login endpoint latency, by outcome.",
+    labelnames=("outcome",),
+)
+PASSWORD_HASH_QUEUE_WAIT = Histogram(
+    "docuhub_password_hash_queue_wait_seconds",
+    "Time a bcrypt operation waited for a hashing worker.",
+)
+PASSWORD_HASH_REJECTED = Counter(
+    "docuhub_password_hash_rejected_total",
+    "bcrypt operations rejected because the hashing queue was full.",
+)
+
+# --- Document repository (git) metrics ---
+GIT_OPERATION_DURATION = Histogram(
+    "docuhub_git_operation_duration_seconds",
+    "Duration of git operations on the documents repository, by operation and outcome.",
+    labelnames=("operation", "outcome"),
+)
+COMMIT_BATCH_SIZE = Histogram(
+    "docuhub_commit_batch_saves",
+    "Number of saves folded into each commit by the commit pipeline.",
+    buckets=(1, 2, 5, 10, 20, 50, 100, 200),
+)
+REPO_WRITE_LOCK_WAIT = Histogram(
+    "docuhub_repo_write_lock_wait_seconds",
+    "Time spent waiting for the cross-process repository write lock.",
+)
+REPO_WRITE_LOCK_TIMEOUTS = Counter(
+    "docuhub_repo_write_lock_timeouts_total",
+    "Repository writes abandoned because the write lock was not acquired in time.",
+)
+
+# --- Cross-worker signals ---
+WORKER_SIGNALS = Counter(
+    "docuhub_worker_signals_total",
+    "Cache invalidation signals exchanged with the other workers, by direction.",
+    labelnames=("direction",),
+)
+
+# --- Document content cache metrics ---
+DOCUMENT_CACHE_REQUESTS = Counter(
+    "docuhub_document_cache_requests_total",
+    "Document content reads, by whether the content cache had a current copy.",
+    labelnames=("result",),
+)
+DOCUMENT_CACHE_EVICTIONS = Counter(
+    "docuhub_document_cache_evictions_total",
+    "Documents evicted from the content cache to stay within its byte budget.",
+)
+
+# --- PDF rendering (pandoc) metrics ---
+PANDOC_RENDER_DURATION = Histogram(
+    "docuhub_pandoc_render_duration_seconds",
+    "Duration of pandoc PDF renders, by outcome.",
+    labelnames=("outcome",),
+    buckets=SUBPROCESS_BUCKETS,
+)
+PDF_CACHE_REQUESTS = Counter(
+    "docuhub_pdf_cache_requests_total",
+    "PDF requests, by whether the rendered file was already cached.",
+    labelnames=("result",),
+)
+
+# --- Site publishing (mkdocs) metrics ---
+MKDOCS_BUILD_DURATION = Histogram(
+    "docuhub_mkdocs_build_duration_seconds",
+    "Duration of mkdocs builds, by mode and outcome.",
+    labelnames=("mode", "outcome"),
+    buckets=SUBPROCESS_BUCKETS,
+)
@@ -0,0 +1,43 @@
+# /app/core/pagination.py
+
+import base64
+import json
+from typing import Any, List
+
+
+def encode_cursor(*key: Any) -> str:
+    """
+    Builds an opaque, URL-safe keyset pagination cursor from the sort key of
+    the last item of a page.
+
+    Args:
+        *key (Any): JSON-serializable sort key values (e.g. created_at, id).
+
+    Returns:
+        str: The cursor.
+    """
+    raw = json.dumps(list(key), separators=(",", ":"), default=str)
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii")
+
+
+def decode_cursor(cursor: str, size: int) -> List[Any]:
+    """
+    Parses a cursor produced by `encode_cursor`.
+
+    Args:
+        cursor (str): The cursor sent by the client.
+        size (int): The expected number of key values.
+
+    Raises:
+        ValueError: If the cursor is malformed.
+
+    Returns:
+        List[Any]: The sort key values.
+    """
+    try:
+        key = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+    except Exception as e:
+        raise ValueError("Invalid cursor.") from e
+    if not isinstance(key, list) or len(key) != size:
+        raise ValueError("Invalid cursor.")
+    return key
@@ -0,0 +1,150 @@
+# /app/core/responses.py
+
+import gzip
+import hashlib
+import json
+import threading
+from typing import Any, Dict, Mapping, Optional, Union
+
+from fastapi import Request, Response
+
+from app.core.config import settings
+from app.core.http_cache import etag_matches
+
+# orjson serializes several times faster than the standard library and is
+# used when installed; the output is the same compact JSON either way.
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Brotli is optional: without it only gzip is negotiated.
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+JSON_MEDIA_TYPE = "application/json"
+
+
+def dumps(payload: Any) -> bytes:
+    """
+    Serializes a JSON-compatible value (dicts, lists, str, numbers, None)
+    to compact UTF-8 JSON.
+
+    Args:
+        payload (Any): The value to serialize.
+
+    Returns:
+        bytes: The JSON document.
+    """
+    if orjson is not None:
+        return orjson.dumps(payload)
+    return json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def choose_encoding(accept_encoding: Optional[str]) -> Optional[str]:
+    """
+    Picks the content coding for a response from the client's Accept-Encoding:
+    'br' if Brotli is available and accepted, else 'gzip' if accepted.
+
+    Args:
+        accept_encoding (Optional[str]): The raw request header.
+
+    Returns:
+        Optional[str]: 'br', 'gzip', or None to send the body uncompressed.
+    """
+    if not accept_encoding:
+        return None
+    accepted = set()
+    for item in accept_encoding.lower().split(","):
+        coding, _, params = item.partition(";")
+        quality = params.strip()
+        if quality.startswith("q="):
+            try:
+                if float(quality[2:]) <= 0:
+                    continue
+            except ValueError:
+                continue
+        accepted.add(coding.strip())
+    if brotli is not None and ("br" in accepted or "*" in accepted):
+        return "br"
+    if "gzip" in accepted or "*" in accepted:
+        return "gzip"
+    return None
+
+
+def compress(body: bytes, encoding: str) -> bytes:
+    """
+    Compresses a response body. Levels favour speed: JSON compresses well
+    even at moderate levels, and the tree is recompressed after every change.
+
+    Args:
+        body (bytes): The uncompressed body.
+        encoding (str): 'br' or 'gzip' (see `choose_encoding()`).
+
+    Returns:
+        bytes: The encoded body.
+    """
+    if encoding == "br":
+        return brotli.compress(body, quality=5)
+    return gzip.compress(body, compresslevel=6, mtime=0)
+
+
+class EncodedJSON:
+    """
+    A serialized JSON body kept ready to send: the bytes, a validator and
+    each compressed variant, computed at most once. Used for large responses
+    that many requests share (e.g. the document tree).
+    """
+
+    def __init__(self, body: bytes):
+        self.body = body
+        # Weak: the same validator is sent for every content coding of the body.
+        self.etag = f'W/"{hashlib.sha1(body).hexdigest()}"'
+        self._lock = threading.Lock()
+        self._variants: Dict[str, bytes] = {}
+
+    def encoded(self, encoding: str) -> bytes:
+        """Returns the body compressed with `encoding`, compressing it on first use."""
+        with self._lock:
+            variant = self._variants.get(encoding)
+            if variant is None:
+                variant = self._variants[encoding] = compress(self.body, encoding)
+            return variant
+
+
+def json_response(
+    request: Request,
+    payload: Union[bytes, EncodedJSON],
+    status_code: int = 200,
+    headers: Optional[Mapping[str, str]] = None,
+) -> Response:
+    """
+    Builds a JSON response from already serialized bytes, compressed with
+    the best coding the client accepts when the body is large enough to
+    benefit (RESPONSE_COMPRESSION_MIN_BYTES). Cached bodies (`EncodedJSON`)
+    also carry an ETag and answer If-None-Match with 304.
+
+    Args:
+        request (Request): The request, for Accept-Encoding and If-None-Match.
+        payload (Union[bytes, EncodedJSON]): The serialized JSON body.
+        status_code (int): The HTTP status on success.
+        headers (Optional[Mapping[str, str]]): Extra response headers.
+
+    Returns:
+        Response: The response to return from the endpoint.
+    """
+    response_headers = {"Vary": "Accept-Encoding", **(headers or {})}
+    body = payload.body if isinstance(payload, EncodedJSON) else payload
+
+    if isinstance(payload, EncodedJSON):
+        response_headers["ETag"] = payload.etag
+        if etag_matches(request.headers.get("if-none-match"), payload.etag):
+            return Response(status_code=304, headers=response_headers)
+
+    encoding = choose_encoding(request.headers.get("accept-encoding"))
+    if encoding and len(body) >= settings.RESPONSE_COMPRESSION_MIN_BYTES:
+        body = payload.encoded(encoding) if isinstance(payload, EncodedJSON) else compress(body, encoding)
+        response_headers["Content-Encoding"] = encoding
+    return Response(content=body, status_code=status_code, headers=response_headers, media_type=JSON_MEDIA_TYPE)
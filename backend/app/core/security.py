@@ -1,7 +1,8 @@
 # /app/core/security.py
 
+import uuid
 from datetime import datetime, timedelta
-from typing import Any, Optional
+from typing import Any, Dict, Optional, Tuple
 
 from jose import JWTError, jwt
 from passlib.context import CryptContext
@@ -10,7 +11,11 @@ from app.core.config import settings
 
 # 1. Contexto de Passlib para el Hashing de Contraseñas
 #    Usamos bcrypt, que es el estándar recomendado para contraseñas.
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+#    Si cambian los parámetros (p. ej. BCRYPT_ROUNDS), los hashes antiguos se
+#    regeneran de forma transparente en el siguiente login (ver verify_and_update_password).
+pwd_context = CryptContext(
+    schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=settings.BCRYPT_ROUNDS
+)
 
 
 # 2. Funciones de Contraseña
@@ -30,6 +35,24 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
 
 
+def verify_and_update_password(
+    plain_password: str, hashed_password: str
+) -> Tuple[bool, Optional[str]]:
+    """
+    Verifies a password and checks whether its hash needs to be regenerated
+    because the hashing scheme or its parameters changed.
+
+    Args:
+        plain_password (str): The password in plain text.
+        hashed_password (str): The hashed password from the database.
+
+    Returns:
+        Tuple[bool, Optional[str]]: Whether the password matches, and a new hash
+                                    to store if the current one is outdated.
+    """
+    return pwd_context.verify_and_update(plain_password, hashed_password)
+
+
 def get_password_hash(password: str) -> str:
     """
     Generates a hash for a plain text password.
@@ -45,6 +68,9 @@ def get_password_hash(password: str) -> str:
 
 # 3. Funciones de Token JWT (JSON Web Token)
 
+# 'scope' de los tickets del flujo de eventos (ver create_stream_ticket).
+STREAM_TICKET_SCOPE = "event-stream"
+
 
 def create_access_token(subject: Any, expires_delta: Optional[timedelta] = None) -> str:
     """
@@ -66,8 +92,8 @@ def create_access_token(subject: Any, expires_delta: Optional[timedelta] = None)
         )
 
     # The token 'payload' contains the data we want to store within it.
-    # 'exp' (expiration) and 'sub' (subject) are standard JWT claims.
-    to_encode = {"exp": expire, "sub": str(subject)}
+    # 'exp' (expiration), 'sub' (subject) and 'jti' (token id) are standard JWT claims.
+    to_encode = {"exp": expire, "sub": str(subject), "jti": uuid.uuid4().hex}
 
     encoded_jwt = jwt.encode(
         claims=to_encode, key=settings.SECRET_KEY, algorithm=settings.ALGORITHM
@@ -75,6 +101,27 @@ def create_access_token(subject: Any, expires_delta: Optional[timedelta] = None)
     return encoded_jwt
 
 
+def create_stream_ticket(subject: Any, expires_in: int) -> str:
+    """
+    Creates a short-lived JWT that only opens the event stream.
+
+    Args:
+        subject (Any): The subject of the ticket (the username).
+        expires_in (int): The lifespan of the ticket, in seconds.
+
+    Returns:
+        str: The encoded JWT ticket.
+    """
+    # The 'scope' claim keeps the ticket from being accepted as an access token.
+    to_encode = {
+        "exp": datetime.utcnow() + timedelta(seconds=expires_in),
+        "sub": str(subject),
+        "jti": uuid.uuid4().hex,
+        "scope": STREAM_TICKET_SCOPE,
+    }
+    return jwt.encode(claims=to_encode, key=settings.SECRET_KEY, algorithm=settings.ALGORITHM)
+
+
 def decode_token(token: str) -> Optional[str]:
     """
     Decodes a JWT token to retrieve its 'subject'.
@@ -95,3 +142,22 @@ def decode_token(token: str) -> Optional[str]:
         # If the token has expired, has an invalid signature, etc., jose will raise an error.
         # In that case, we return None.
         return None
+
+
+def decode_token_claims(token: str) -> Optional[Dict[str, Any]]:
+    """
+    Decodes and verifies a JWT token, returning all of its claims.
+
+    Args:
+        token (str): The JWT token to decode.
+
+    Returns:
+        Optional[Dict[str, Any]]: The claims ('sub', 'exp', 'jti', ...) if the
+                                  token is valid, otherwise None.
+    """
+    try:
+        return jwt.decode(
+            token=token, key=settings.SECRET_KEY, algorithms=[settings.ALGORITHM]
+        )
+    except JWTError:
+        return None
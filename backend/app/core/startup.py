@@ -0,0 +1,108 @@
+# /app/core/startup.py
+
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, Optional
+
+from app.core.metrics import STARTUP_PHASE_DURATION
+
+
+class StartupState:
+    """
+    Tracks the startup of this process: how long each phase took, whether
+    the critical phases finished, and the state of the background cache
+    warm-up. Read by the health endpoints; phase durations are also exported
+    to /metrics.
+
+    The process is ready once startup finished and the warm-up is over
+    (whether it succeeded or not: caches still fill lazily on first use),
+    and stops being ready when shutdown begins.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._began_at = time.monotonic()
+        self._phases: Dict[str, float] = {}
+        self._started = False
+        self._stopping = False
+        # 'pending', 'running', 'done', 'failed' or 'disabled'
+        self._warmup = "pending"
+        self._warmup_error: Optional[str] = None
+
+    def begin(self) -> None:
+        """Marks the start of the application's startup (lifespan entry)."""
+        with self._lock:
+            self._began_at = time.monotonic()
+            self._phases.clear()
+            self._started = False
+            self._stopping = False
+            self._warmup = "pending"
+            self._warmup_error = None
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        """
+        Times a block as a named phase. The duration is recorded even if the
+        block raises, so a failed startup still shows where the time went.
+
+        Args:
+            name (str): The phase name, e.g. 'database' or 'warmup_search'.
+        """
+        start = time.monotonic()
+        try:
+            yield
+        finally:
+            self.record(name, time.monotonic() - start)
+
+    def record(self, name: str, seconds: float) -> None:
+        """Records the duration of a phase."""
+        with self._lock:
+            self._phases[name] = seconds
+        STARTUP_PHASE_DURATION.labels(name).set(seconds)
+
+    def mark_started(self) -> float:
+        """
+        Marks the critical phases as finished.
+
+        Returns:
+            float: Seconds since `begin()`.
+        """
+        total = time.monotonic() - self._began_at
+        self.record("startup", total)
+        with self._lock:
+            self._started = True
+        return total
+
+    def set_warmup(self, status: str, error: Optional[str] = None) -> None:
+        """Updates the state of the background warm-up."""
+        with self._lock:
+            self._warmup = status
+            self._warmup_error = error
+
+    def mark_stopping(self) -> None:
+        """Marks the beginning of shutdown: the process no longer accepts new work."""
+        with self._lock:
+            self._stopping = True
+
+    @property
+    def ready(self) -> bool:
+        with self._lock:
+            return self._started and not self._stopping and self._warmup not in ("pending", "running")
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Returns the startup state, as reported by /health/ready."""
+        with self._lock:
+            state = {
+                "started": self._started,
+                "stopping": self._stopping,
+                "warmup": self._warmup,
+                "phases": {name: round(seconds, 4) for name, seconds in self._phases.items()},
+            }
+            if self._warmup_error:
+                state["warmup_error"] = self._warmup_error
+            return state
+
+
+# A single instance is created (Singleton pattern) to be easily imported and used by other modules.
+startup_state = StartupState()
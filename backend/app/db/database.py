@@ -1,22 +1,102 @@
 # /app/db/database.py
 
+from typing import Any, Dict, List
+
+from prometheus_client.core import GaugeMetricFamily
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.ext.declarative import declarative_base
 
 # Cambia la importación a una ruta relativa explícita desde la raíz del paquete 'app'
 from ..core.config import settings # <-- CAMBIO CLAVE AQUÍ
+from ..core.metrics import register_collector
+
+# Drivers asíncronos equivalentes a cada backend síncrono
+_ASYNC_DRIVERS = {
+    "postgresql": "postgresql+asyncpg",
+    "sqlite": "sqlite+aiosqlite",
+}
+
+
+def _async_database_url() -> str:
+    """
+    Devuelve la URL del motor asíncrono: ASYNC_DATABASE_URL si está definida,
+    o DATABASE_URL con el driver asíncrono correspondiente (p. ej. asyncpg).
+    """
+    if settings.ASYNC_DATABASE_URL:
+        return settings.ASYNC_DATABASE_URL
+    url = make_url(settings.DATABASE_URL)
+    return url.set(drivername=_ASYNC_DRIVERS.get(url.get_backend_name(), url.drivername)).render_as_string(
+        hide_password=False
+    )
 
-# El resto del archivo se mantiene igual
-engine = create_engine(settings.DATABASE_URL)
+
+def _engine_options(url: str) -> Dict[str, Any]:
+    """
+    Opciones del pool de conexiones configurables desde Settings.
+    SQLite (usado en pruebas locales) no admite dimensionar el pool.
+    """
+    if make_url(url).get_backend_name() == "sqlite":
+        return {}
+    return {
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+    }
+
+
+# --- Motor síncrono (tareas de arranque, scripts y código que aún corre en el threadpool) ---
+engine = create_engine(settings.DATABASE_URL, **_engine_options(settings.DATABASE_URL))
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# --- Motor asíncrono: los endpoints async no dependen del número de hilos del threadpool ---
+ASYNC_DATABASE_URL = _async_database_url()
+async_engine = create_async_engine(ASYNC_DATABASE_URL, **_engine_options(ASYNC_DATABASE_URL))
+
+# expire_on_commit=False: los objetos siguen siendo legibles tras el commit sin otra consulta
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
 Base = declarative_base()
 
+
+def _collect_pool_metrics() -> List[GaugeMetricFamily]:
+    """
+    Uso de los pools de conexiones en el momento del scrape de /metrics.
+    Los pools sin tamaño fijo (SQLite) no exponen estos contadores y se omiten.
+    """
+    gauges = {
+        "docuhub_db_pool_size": ("Configured size of the connection pool.", "size"),
+        "docuhub_db_pool_checked_out": ("Connections currently in use.", "checkedout"),
+        "docuhub_db_pool_checked_in": ("Idle connections held by the pool.", "checkedin"),
+        "docuhub_db_pool_overflow": ("Connections opened beyond the pool size.", "overflow"),
+    }
+    pools = {"sync": engine.pool, "async": async_engine.sync_engine.pool}
+    families = []
+    for name, (help_text, attribute) in gauges.items():
+        family = GaugeMetricFamily(name, help_text, labels=["engine"])
+        for label, pool in pools.items():
+            if callable(getattr(pool, attribute, None)):
+                family.add_metric([label], getattr(pool, attribute)())
+        if family.samples:
+            families.append(family)
+    return families
+
+
+register_collector(_collect_pool_metrics)
+
 def get_db():
     db = SessionLocal()
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
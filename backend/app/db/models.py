@@ -1,6 +1,6 @@
 # /app/db/models.py
 
-from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Boolean, Text
+from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Boolean, Text, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func # Para obtener la fecha y hora actual de la BD
 
@@ -25,6 +25,14 @@ class User(Base):
     # Relación uno-a-muchos: Un usuario puede tener muchos comentarios.
     comments = relationship("Comment", back_populates="owner")
 
+    # Índices para los filtros del listado paginado por id (ver user_service.get_users).
+    __table_args__ = (
+        Index("ix_users_is_active_id", "is_active", "id"),
+        Index("ix_users_is_admin_id", "is_admin", "id"),
+        # Búsqueda por prefijo (LIKE 'abc%') en PostgreSQL con cualquier collation.
+        Index("ix_users_username_prefix", "username", postgresql_ops={"username": "varchar_pattern_ops"}),
+    )
+
 
 class Comment(Base):
     """
@@ -57,6 +65,8 @@ class DocumentLock(Base):
     # La ruta del documento es la clave primaria. Solo puede haber un bloqueo por documento.
     document_path = Column(String(512), primary_key=True)
     
+    # Último heartbeat del bloqueo: se renueva con cada petición de renovación y
+    # el bloqueo caduca DOCUMENT_LOCK_TTL_SECONDS después.
     locked_at = Column(DateTime(timezone=True), server_default=func.now())
     
     # Clave foránea que indica qué usuario tiene el bloqueo.
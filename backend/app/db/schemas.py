@@ -36,6 +36,12 @@ class User(UserBase):
         # objeto de SQLAlchemy a este schema.
         from_attributes = True
 
+# --- Una página del listado de usuarios; 'next_cursor' se envía como 'cursor' para pedir la siguiente ---
+class UserPage(BaseModel):
+    items: List[User]
+    next_cursor: Optional[str] = Field(None, description="Cursor opaco de la siguiente página; null si no hay más")
+    total_estimate: Optional[int] = Field(None, description="Total aproximado (en caché) de usuarios que cumplen los filtros")
+
 
 # ==============================================================================
 # Esquemas para la gestión de COMENTARIOS (Comments)
@@ -59,7 +65,16 @@ class Comment(CommentBase):
     owner: User  # Anida el schema 'User' para devolver los datos del propietario
 
     class Config:
-        orm_mode = True
+        from_attributes = True
+
+# --- Una página de comentarios; 'next_cursor' se envía como 'cursor' para pedir la siguiente ---
+class CommentPage(BaseModel):
+    items: List[Comment]
+    next_cursor: Optional[str] = Field(None, description="Cursor opaco de la siguiente página; null si no hay más")
+
+# --- Número de comentarios de varios documentos (todos si no se indican rutas) ---
+class CommentCountsRequest(BaseModel):
+    paths: Optional[List[str]] = Field(None, max_length=5000, description="Rutas de los documentos a consultar")
 
 
 # ==============================================================================
@@ -71,14 +86,117 @@ class Document(BaseModel):
     path: str
     content: str
 
+# --- Una operación de parche: reemplaza las líneas [start, end) de la revisión base ---
+class LinePatchOperation(BaseModel):
+    start: int = Field(..., ge=0, description="Primera línea reemplazada (base 0)")
+    end: int = Field(..., ge=0, description="Línea siguiente a la última reemplazada (exclusiva)")
+    lines: List[str] = Field(default_factory=list, description="Líneas nuevas, sin el salto de línea final")
+
+# --- Guardado incremental: revisión base (hash del blob / ETag) y las operaciones a aplicar ---
+class DocumentPatch(BaseModel):
+    base: str = Field(..., description="Hash del blob (ETag) sobre el que se hicieron los cambios")
+    operations: List[LinePatchOperation] = Field(..., max_length=10000)
+
+# --- Respuesta de un guardado incremental: la nueva revisión, base del siguiente parche ---
+class DocumentPatchResult(BaseModel):
+    message: str
+    revision: str
+
+# --- Resultado de una importación masiva (zip/tar) en un único commit ---
+class DocumentImportResult(BaseModel):
+    path: str = Field(..., description="Directorio de destino ('' para la raíz)")
+    revision: Optional[str] = Field(None, description="Commit creado; null si ningún archivo cambió")
+    files: int
+    created: int
+    updated: int
+    unchanged: int
+
+# --- Un nodo del listado de directorios por niveles (carga bajo demanda) ---
+class DirectoryNode(BaseModel):
+    name: str
+    path: str
+    type: str = Field(..., description="'file' o 'directory'")
+    child_count: Optional[int] = Field(None, description="Número de entradas directas del directorio")
+    children: Optional[List["DirectoryNode"]] = Field(
+        None, description="Primeras entradas del directorio si se pidió más de un nivel; si son menos que 'child_count', pedir el directorio"
+    )
+
+# --- Una página del listado de un directorio ---
+class DirectoryListing(BaseModel):
+    path: str
+    items: List[DirectoryNode]
+    next_cursor: Optional[str] = Field(None, description="Cursor opaco de la siguiente página; null si no hay más")
+
+# --- Una revisión de un documento (un commit que lo modificó) ---
+class DocumentRevision(BaseModel):
+    revision: str = Field(..., description="SHA del commit")
+    blob: Optional[str] = Field(None, description="Hash del blob del documento en esa revisión (ETag)")
+    author_name: str
+    author_email: str
+    authored_at: datetime
+    message: str
+    deleted: bool = Field(False, description="El documento se eliminó en esta revisión")
+
+# --- Una página del historial de un documento, de la revisión más reciente a la más antigua ---
+class DocumentHistoryPage(BaseModel):
+    path: str
+    items: List[DocumentRevision]
+    next_cursor: Optional[str] = Field(None, description="Cursor opaco de la siguiente página; null si no hay más")
+
+# --- Contenido de un documento en una revisión concreta ---
+class DocumentRevisionContent(BaseModel):
+    path: str
+    revision: str
+    blob: str
+    content: str
+
 # --- Esquema para representar el estado de un bloqueo ---
 class DocumentLock(BaseModel):
     document_path: str
     locked_at: datetime
+    expires_at: datetime # Caduca si no se renueva antes de esta fecha
     locked_by: User # Anida el schema 'User' para mostrar quién tiene el bloqueo
 
     class Config:
-        orm_mode = True
+        from_attributes = True
+
+# --- Consulta del estado de bloqueo de varios documentos en una sola petición ---
+class DocumentLockStatusRequest(BaseModel):
+    paths: List[str] = Field(..., max_length=5000, description="Rutas de los documentos a consultar")
+
+
+# ==============================================================================
+# Esquemas para la BÚSQUEDA de texto completo
+# ==============================================================================
+
+# --- Un documento encontrado, con su puntuación BM25 y un extracto resaltado ---
+class SearchResult(BaseModel):
+    path: str
+    score: float
+    snippet: str = Field(..., description="Extracto HTML escapado con las coincidencias en <mark>")
+
+# --- Respuesta de una búsqueda: total de coincidencias y la página solicitada ---
+class SearchResponse(BaseModel):
+    query: str
+    total: int
+    results: List[SearchResult]
+
+
+# ==============================================================================
+# Esquemas para la PUBLICACIÓN del sitio (MkDocs)
+# ==============================================================================
+
+# --- Estado de un trabajo de publicación en segundo plano ---
+class PublishJob(BaseModel):
+    id: str
+    status: str = Field(..., description="queued | running | succeeded | failed")
+    requested_by: str
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    revision: Optional[str] = Field(None, description="Commit HEAD publicado")
+    mode: Optional[str] = Field(None, description="full | incremental | skipped")
+    detail: Optional[str] = None
 
 
 # ==============================================================================
@@ -93,3 +211,8 @@ class Token(BaseModel):
 # --- Esquema para los datos contenidos dentro del token JWT ---
 class TokenData(BaseModel):
     username: Optional[str] = None
+
+# --- Esquema del ticket de un solo uso para abrir el flujo de eventos (EventSource) ---
+class StreamTicket(BaseModel):
+    ticket: str
+    expires_in: int = Field(..., description="Segundos de validez del ticket")
@@ -3,24 +3,26 @@
 import asyncio
 
 from app.db import models, schemas
-from app.db.database import Base, SessionLocal, engine
+from app.db.database import AsyncSessionLocal, Base, engine
 from app.services import user_service
-from sqlalchemy.orm import Session
 
 # --- IMPORTANTE ---
 # Asegúrate de que las tablas estén creadas antes de intentar insertar datos.
 # Esta línea es redundante si main.py ya la ejecutó, pero es segura de correr de nuevo.
 Base.metadata.create_all(bind=engine)
 
-# Obtener una sesión de base de datos
-db: Session = SessionLocal()
-
 
 async def create_initial_user():
+    # Obtener una sesión de base de datos (se cierra al salir del bloque)
+    async with AsyncSessionLocal() as db:
+        await _create_admin(db)
+
+
+async def _create_admin(db):
     print("Verificando si el usuario administrador ya existe...")
 
     # Comprobar si ya existe un usuario con ese nombre o email
-    user = user_service.get_user_by_username(db, username="admin")
+    user = await user_service.get_user_by_username(db, username="admin")
 
     if user:
         print("El usuario 'admin' ya existe. No se tomará ninguna acción.")
@@ -36,19 +38,16 @@ async def create_initial_user():
         )
 
         # Usamos el servicio para crear el usuario (que se encarga del hashing)
-        new_user = user_service.create_user(db, user_in=user_in)
+        new_user = await user_service.create_user(db, user_in=user_in)
 
         # Hacemos que sea administrador
         new_user.is_admin = True
         db.add(new_user)
-        db.commit()
+        await db.commit()
 
         print("¡Superusuario 'admin' creado con éxito!")
         print("Contraseña: admin")
 
-    # Cerrar la sesión de la base de datos
-    db.close()
-
 
 if __name__ == "__main__":
     # Ejecutar la función asíncrona
@@ -1,16 +1,97 @@
-from app.api import documents, login, project_docs, users
+import asyncio
+from contextlib import asynccontextmanager
+
+from app.api import comments, documents, events, health, locks, login, metrics, project_docs, users
 from app.core.config import settings
+from app.core.middleware import MetricsMiddleware
+from app.core.startup import startup_state
 from app.db import models
 
 # Application imports
 from app.db.database import engine
+from app.services.document_service import document_service
+from app.services.lock_service import document_locks
+from app.services.search_service import search_index
+from app.services.tree_index import tree_index
+from app.services.worker_signals import worker_signals
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
-# --- 1. Database Table Creation ---
-# SQLAlchemy uses the imported models to create tables if they do not exist.
-# It is crucial to import 'models' so that Base.metadata becomes aware of them.
-models.Base.metadata.create_all(bind=engine)
+
+# --- 1. Startup Phases ---
+def create_database_schema() -> None:
+    # SQLAlchemy uses the imported models to create tables if they do not exist.
+    # It is crucial to import 'models' so that Base.metadata becomes aware of them.
+    with startup_state.phase("database"):
+        models.Base.metadata.create_all(bind=engine)
+        # create_all only creates indexes together with new tables: add the ones declared later.
+        for table in models.Base.metadata.sorted_tables:
+            for index in table.indexes:
+                index.create(bind=engine, checkfirst=True)
+
+
+def open_document_repository() -> None:
+    # Opens (or initializes) the Git repository of the documents.
+    with startup_state.phase("git"):
+        document_service.initialize()
+
+
+async def warm_up_caches() -> None:
+    # Fills the in-memory caches in the background, so the first requests do not pay for
+    # scanning the corpus. Independent caches are warmed in parallel threads.
+    def warm(name, function, *args):
+        with startup_state.phase(f"warmup_{name}"):
+            function(*args)
+
+    startup_state.set_warmup("running")
+    try:
+        with startup_state.phase("warmup"):
+            await asyncio.gather(
+                asyncio.to_thread(warm, "tree", tree_index.tree_json),
+                asyncio.to_thread(warm, "search", search_index.warm_up),
+                asyncio.to_thread(warm, "history", document_service.history.warm_up),
+                asyncio.to_thread(warm, "content", document_service.warm_content_cache),
+            )
+    except Exception as e:
+        # Not fatal: every cache also fills itself on first use.
+        print(f"Error warming up caches: {e}")
+        startup_state.set_warmup("failed", str(e))
+        return
+    startup_state.set_warmup("done")
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    startup_state.begin()
+    # Follow the other workers' changes from now on: anything older is already on disk or in the database.
+    worker_signals.start()
+    # The database schema and the Git repository are independent: set them up in parallel.
+    await asyncio.gather(
+        asyncio.to_thread(create_database_schema),
+        asyncio.to_thread(open_document_repository),
+    )
+    # Restores the unexpired edit leases stored in the database.
+    with startup_state.phase("locks"):
+        await document_locks.load()
+
+    total = startup_state.mark_started()
+    phases = ", ".join(f"{name} {seconds:.3f}s" for name, seconds in startup_state.snapshot()["phases"].items())
+    print(f"Startup completed in {total:.3f}s ({phases}).")
+
+    warmup = None
+    if settings.STARTUP_WARMUP:
+        warmup = asyncio.create_task(warm_up_caches())
+    else:
+        startup_state.set_warmup("disabled")
+    try:
+        yield
+    finally:
+        # Readiness fails from here on, so load balancers stop sending new requests.
+        startup_state.mark_stopping()
+        worker_signals.stop()
+        if warmup is not None:
+            warmup.cancel()
+
 
 origins = [
     "http://localhost",
@@ -23,6 +104,7 @@ app = FastAPI(
     title=settings.PROJECT_NAME,
     version=settings.PROJECT_VERSION,
     openapi_url=f"{settings.API_V1_STR}/openapi.json",
+    lifespan=lifespan,
 )
 
 
@@ -33,17 +115,21 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+# Per-route latency histograms and in-flight requests, exposed at /metrics.
+app.add_middleware(MetricsMiddleware)
 
 # --- 3. API Router Inclusion ---
 # The API is modularized by including routers from different files.
-# This keeps the code organized and scalable.
-app.include_router(login.router, prefix=f"{settings.API_V1_STR}/login", tags=["Login"])
-app.include_router(users.router, prefix=f"{settings.API_V1_STR}/users", tags=["Users"])
-app.include_router(
-    documents.router, prefix=f"{settings.API_V1_STR}/documents", tags=["Documents"]
-)
-app.include_router(
-    project_docs.router,
-    prefix=f"{settings.API_V1_STR}/project-docs",
-    tags=["Project Docs Editor"],
-)
+# This keeps the code organized and scalable. Each router declares its own
+# prefix, so a route's path is its full template (the metrics route label).
+app.include_router(login.router, tags=["Login"])
+app.include_router(users.router, tags=["Users"])
+app.include_router(documents.router, tags=["Documents"])
+app.include_router(comments.router, tags=["Comments"])
+app.include_router(locks.router, tags=["Document Locks"])
+app.include_router(events.router, tags=["Events"])
+app.include_router(project_docs.router, tags=["Project Docs Editor"])
+# Outside the API prefix: scraped by Prometheus, not by the frontend.
+app.include_router(metrics.router, tags=["Metrics"])
+# Outside the API prefix: liveness and readiness probes of the orchestrator.
+app.include_router(health.router, tags=["Health"])
@@ -0,0 +1,161 @@
+# /app/services/auth_cache.py
+
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional, Set, Tuple
+
+from app.core import security
+from app.core.config import settings
+from app.db import models
+
+# Columns copied out of the ORM object. The cache never hands out a shared,
+# session-bound instance: each request gets its own transient models.User.
+_USER_FIELDS = ("id", "username", "email", "hashed_password", "is_active", "is_admin")
+
+
+class TTLCache:
+    """
+    Thread-safe LRU cache whose entries also expire after a deadline.
+    """
+
+    def __init__(self, max_entries: int):
+        """
+        Args:
+            max_entries (int): Entries kept before the least recently used is dropped.
+        """
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at <= time.time():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def put(self, key: Hashable, value: Any, expires_at: float) -> None:
+        with self._lock:
+            self._entries[key] = (expires_at, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def __contains__(self, key: Hashable) -> bool:
+        with self._lock:
+            entry = self._entries.get(key)
+            return entry is not None and entry[0] > time.time()
+
+    def pop(self, key: Hashable) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+class AuthCache:
+    """
+    Keeps the authentication dependency in memory on the hot path.
+
+    - Verified tokens: the JWT signature check and claim parsing are done once
+      per token; later requests only compare its 'exp' against the clock.
+    - Resolved users: keyed by (username, token id), valid for a short TTL
+      and dropped explicitly when the user is modified through the API.
+    """
+
+    def __init__(
+        self,
+        ttl: float = settings.AUTH_CACHE_TTL_SECONDS,
+        max_entries: int = settings.AUTH_CACHE_MAX_ENTRIES,
+    ):
+        """
+        Args:
+            ttl (float): Seconds a resolved user is trusted without a DB lookup.
+            max_entries (int): Size bound of each of the two caches.
+        """
+        self.ttl = ttl
+        self._tokens = TTLCache(max_entries)
+        self._users = TTLCache(max_entries)
+        self._keys_by_username: Dict[str, Set[Tuple[str, str]]] = {}
+        self._index_lock = threading.Lock()
+
+    def verify_token(self, token: str) -> Optional[Tuple[str, str]]:
+        """
+        Validates a JWT, skipping the signature check if this exact token was
+        already verified and has not expired.
+
+        Args:
+            token (str): The raw bearer token.
+
+        Returns:
+            Optional[Tuple[str, str]]: (username, token id), or None if invalid.
+        """
+        digest = hashlib.sha256(token.encode("utf-8")).digest()
+        cached = self._tokens.get(digest)
+        if cached is not None:
+            return cached
+
+        claims = security.decode_token_claims(token)
+        if not claims or not claims.get("sub"):
+            return None
+        # A stream ticket only opens the event stream (see services/stream_tickets.py).
+        if claims.get("scope") == security.STREAM_TICKET_SCOPE:
+            return None
+        # Tokens issued before 'jti' existed are identified by their digest.
+        token_id = claims.get("jti") or digest.hex()
+        result = (str(claims["sub"]), token_id)
+        expires_at = float(claims.get("exp", time.time() + self.ttl))
+        self._tokens.put(digest, result, expires_at)
+        return result
+
+    def get_user(self, username: str, token_id: str) -> Optional[models.User]:
+        """
+        Returns a fresh, transient copy of a cached user, or None on a miss.
+        """
+        snapshot = self._users.get((username, token_id))
+        return models.User(**snapshot) if snapshot is not None else None
+
+    def put_user(self, user: models.User, token_id: str) -> None:
+        """
+        Caches the columns of a user just loaded from the database.
+        """
+        key = (user.username, token_id)
+        self._users.put(key, {f: getattr(user, f) for f in _USER_FIELDS}, time.time() + self.ttl)
+        with self._index_lock:
+            # Forget keys that already expired or were evicted, so the index stays bounded.
+            keys = {k for k in self._keys_by_username.get(user.username, ()) if k in self._users}
+            keys.add(key)
+            self._keys_by_username[user.username] = keys
+
+    def invalidate_user(self, username: str) -> None:
+        """
+        Drops every cached entry for a user, whatever token it was resolved for.
+        Must be called whenever a user is updated or deactivated.
+
+        Args:
+            username (str): The user's username.
+        """
+        with self._index_lock:
+            keys = self._keys_by_username.pop(username, set())
+        for key in keys:
+            self._users.pop(key)
+
+    def clear(self) -> None:
+        """Empties both caches."""
+        self._tokens.clear()
+        self._users.clear()
+        with self._index_lock:
+            self._keys_by_username.clear()
+
+
+# A single instance is created (Singleton pattern) to be easily imported and used by other modules.
+auth_cache = AuthCache()
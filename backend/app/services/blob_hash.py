@@ -0,0 +1,129 @@
+# /app/services/blob_hash.py
+
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Optional, Tuple, Union
+
+from app.core.config import settings
+
+
+def git_blob_sha(data: bytes) -> str:
+    """
+    Computes the git blob id of some content, exactly as `git hash-object` would.
+
+    Args:
+        data (bytes): The raw file content.
+
+    Returns:
+        str: The 40-character hex SHA-1 of the blob.
+    """
+    header = f"blob {len(data)}\0".encode("ascii")
+    return hashlib.sha1(header + data).hexdigest()
+
+
+def git_blob_sha_of_file(full_path: Union[str, Path], size: int, chunk_size: int = 1024 * 1024) -> str:
+    """
+    Computes the git blob id of a file by hashing it in chunks, without
+    loading it into memory.
+
+    Args:
+        full_path (Union[str, Path]): The file to hash.
+        size (int): The file size from the `stat` the result will be keyed on.
+        chunk_size (int): Bytes read per call.
+
+    Raises:
+        OSError: If the file cannot be read or no longer has `size` bytes.
+
+    Returns:
+        str: The 40-character hex SHA-1 of the blob.
+    """
+    digest = hashlib.sha1(f"blob {size}\0".encode("ascii"))
+    read = 0
+    with open(full_path, "rb") as f:
+        while chunk := f.read(chunk_size):
+            digest.update(chunk)
+            read += len(chunk)
+    if read != size:
+        raise OSError(f"{full_path} changed while it was being hashed.")
+    return digest.hexdigest()
+
+
+def stat_key(st: os.stat_result) -> Tuple[int, int, int]:
+    """Identity of a file version as seen by the filesystem: (inode, size, mtime_ns)."""
+    return (st.st_ino, st.st_size, st.st_mtime_ns)
+
+
+class BlobHashCache:
+    """
+    Memoizes the git blob SHA of files keyed by (inode, size, mtime_ns), so
+    that validating a client's ETag costs a single `stat` instead of reading
+    and hashing the whole document.
+
+    For a tracked file with no local changes the value equals the blob id in
+    the repository; for modified or untracked files it is the id the content
+    would get once committed. Either way it is a strong validator.
+    """
+
+    def __init__(self, max_entries: int = settings.BLOB_HASH_CACHE_ENTRIES):
+        """
+        Args:
+            max_entries (int): Number of files remembered before the least
+                               recently used entry is dropped.
+        """
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, Tuple[Tuple[int, int, int], str]]" = OrderedDict()
+
+    def lookup(self, full_path: Union[str, Path], st: os.stat_result) -> Optional[str]:
+        """
+        Returns the memoized blob SHA if the file has not changed since it was hashed.
+
+        Args:
+            full_path (Union[str, Path]): Absolute path of the file.
+            st (os.stat_result): A fresh `stat` of the file.
+        """
+        key = str(full_path)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] != stat_key(st):
+                return None
+            self._entries.move_to_end(key)
+            return entry[1]
+
+    def store(self, full_path: Union[str, Path], st: os.stat_result, data: bytes) -> str:
+        """
+        Hashes `data` (read after `st` was taken) and remembers it for that file version.
+
+        Returns:
+            str: The blob SHA of `data`.
+        """
+        return self._remember(full_path, st, git_blob_sha(data))
+
+    def store_file(self, full_path: Union[str, Path], st: os.stat_result) -> str:
+        """
+        Hashes a file in chunks (for documents too large to read at once) and
+        remembers the result for that file version.
+
+        Raises:
+            OSError: If the file cannot be read or changed size meanwhile.
+
+        Returns:
+            str: The blob SHA of the file.
+        """
+        return self._remember(full_path, st, git_blob_sha_of_file(full_path, st.st_size))
+
+    def _remember(self, full_path: Union[str, Path], st: os.stat_result, sha: str) -> str:
+        key = str(full_path)
+        with self._lock:
+            self._entries[key] = (stat_key(st), sha)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return sha
+
+
+# A single instance is shared by every component that needs document validators.
+blob_hashes = BlobHashCache()
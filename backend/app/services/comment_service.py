@@ -0,0 +1,121 @@
+# /app/services/comment_service.py
+
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import func, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+
+from app.core.pagination import decode_cursor, encode_cursor
+from app.db import models, schemas
+
+
+async def get_comments(
+    db: AsyncSession, document_path: str, limit: int = 50, cursor: Optional[str] = None
+) -> Tuple[List[models.Comment], Optional[str]]:
+    """
+    Retrieves a page of a document's comments, oldest first.
+
+    Pages are keyset-paginated on (created_at, id), so every page costs the
+    same regardless of depth. Owners are loaded in one batched query for the
+    whole page instead of one lazy load per comment.
+
+    Args:
+        db (AsyncSession): The database session.
+        document_path (str): The document the comments belong to.
+        limit (int): The maximum number of comments to return.
+        cursor (Optional[str]): `next_cursor` of the previous page.
+
+    Raises:
+        ValueError: If the cursor is malformed.
+
+    Returns:
+        Tuple[List[models.Comment], Optional[str]]: The comments and the
+        cursor of the next page (None on the last page).
+    """
+    query = (
+        select(models.Comment)
+        .where(models.Comment.document_path == document_path)
+        .options(selectinload(models.Comment.owner))
+        .order_by(models.Comment.created_at, models.Comment.id)
+        .limit(limit + 1)  # One extra row tells whether there is a next page.
+    )
+    if cursor:
+        created_at, comment_id = decode_cursor(cursor, 2)
+        try:
+            created_at, comment_id = datetime.fromisoformat(created_at), int(comment_id)
+        except (TypeError, ValueError) as e:
+            raise ValueError("Invalid cursor.") from e
+        query = query.where(tuple_(models.Comment.created_at, models.Comment.id) > (created_at, comment_id))
+
+    comments = list((await db.execute(query)).scalars().all())
+    if len(comments) <= limit:
+        return comments, None
+    comments = comments[:limit]
+    return comments, encode_cursor(comments[-1].created_at.isoformat(), comments[-1].id)
+
+
+async def get_comment(db: AsyncSession, comment_id: int) -> Optional[models.Comment]:
+    """
+    Retrieves a comment, with its owner, by its ID.
+
+    Args:
+        db (AsyncSession): The database session.
+        comment_id (int): The ID of the comment.
+
+    Returns:
+        Optional[models.Comment]: The comment if found, otherwise None.
+    """
+    result = await db.execute(
+        select(models.Comment)
+        .where(models.Comment.id == comment_id)
+        .options(selectinload(models.Comment.owner))
+    )
+    return result.scalars().first()
+
+
+async def create_comment(db: AsyncSession, comment_in: schemas.CommentCreate, owner_id: int) -> models.Comment:
+    """
+    Creates a comment on a document.
+
+    Args:
+        db (AsyncSession): The database session.
+        comment_in (schemas.CommentCreate): The document path and content.
+        owner_id (int): The ID of the user writing the comment.
+
+    Returns:
+        models.Comment: The new comment, with its owner loaded.
+    """
+    db_comment = models.Comment(
+        document_path=comment_in.document_path,
+        content=comment_in.content,
+        owner_id=owner_id,
+        # Set here rather than by the server default so the stored value keeps
+        # microseconds everywhere and compares exactly against page cursors.
+        created_at=datetime.now(timezone.utc),
+    )
+    db.add(db_comment)
+    await db.commit()
+    return await get_comment(db, db_comment.id)
+
+
+async def count_comments(db: AsyncSession, paths: Optional[List[str]] = None) -> Dict[str, int]:
+    """
+    Counts comments per document in a single GROUP BY query.
+
+    Args:
+        db (AsyncSession): The database session.
+        paths (Optional[List[str]]): Documents to count; all documents if None.
+
+    Returns:
+        Dict[str, int]: Comment count per document path. Documents without
+        comments are omitted.
+    """
+    query = select(models.Comment.document_path, func.count()).group_by(models.Comment.document_path)
+    if paths is not None:
+        if not paths:
+            return {}
+        query = query.where(models.Comment.document_path.in_(set(paths)))
+    result = await db.execute(query)
+    return {path: count for path, count in result.all()}
@@ -0,0 +1,317 @@
+# /app/services/commit_pipeline.py
+
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+import git
+from git.objects.commit import Commit
+
+from app.core.config import settings
+from app.core.metrics import COMMIT_BATCH_SIZE, GIT_OPERATION_DURATION, time_with_outcome
+from app.services.content_cache import content_cache
+from app.services.repo_lock import RepositoryWriteLock
+
+COMMITTER = git.Actor("DocuHub", "docuhub@localhost")
+
+
+# Receives the document's current content (None if it does not exist) and
+# returns the content to save, or raises to reject just that save.
+ContentTransform = Callable[[Optional[str]], str]
+
+# Called on the writer thread after each commit with the commit and the paths it changed.
+CommitListener = Callable[[Commit, List[str]], None]
+
+
+class _PendingSave:
+    __slots__ = ("full_path", "relative_path", "content", "transform", "author", "future")
+
+    def __init__(
+        self,
+        full_path: Path,
+        relative_path: str,
+        content: Optional[str],
+        author: git.Actor,
+        transform: Optional[ContentTransform] = None,
+    ):
+        self.full_path = full_path
+        self.relative_path = relative_path
+        self.content = content
+        self.transform = transform
+        self.author = author
+        self.future: Future = Future()
+
+
+class CommitPipeline:
+    """
+    Serializes every write to the documents repository through one writer thread
+    and groups saves that arrive within a short window into a single commit.
+
+    Blobs, the tree and the commit are written in-process through GitPython's
+    object database and index (no `git add`/`git commit` subprocesses), so a
+    batch costs one index write and one commit regardless of its size. When a
+    batch spans several authors, the first one is the commit author and the
+    rest are recorded as `Co-authored-by` trailers.
+
+    With several worker processes, each one has its own pipeline: a batch is
+    resolved, written and committed while holding the repository's
+    cross-process write lock, on top of whatever HEAD is at that moment.
+    """
+
+    def __init__(
+        self,
+        repo: git.Repo,
+        window: float = settings.GROUP_COMMIT_WINDOW,
+        max_batch: int = settings.GROUP_COMMIT_MAX_BATCH,
+        write_lock: Optional[RepositoryWriteLock] = None,
+    ):
+        """
+        Args:
+            repo (git.Repo): The documents repository.
+            window (float): Seconds the writer waits for more saves after the
+                            first one of a batch arrives.
+            max_batch (int): Maximum number of saves folded into one commit.
+            write_lock (Optional[RepositoryWriteLock]): The lock shared with
+                other writers of the repository; the repository's own lock
+                file by default.
+        """
+        self.repo = repo
+        self.write_lock = write_lock or RepositoryWriteLock.for_repo(repo)
+        self.window = window
+        self.max_batch = max_batch
+        self._queue: "queue.Queue[_PendingSave]" = queue.Queue()
+        self._lock = threading.Lock()
+        self._writer: Optional[threading.Thread] = None
+        self._started_at = time.monotonic()
+        self._saves = 0
+        self._commits = 0
+        self._listeners: List[CommitListener] = []
+
+    def add_commit_listener(self, listener: CommitListener) -> None:
+        """
+        Registers a callback run on the writer thread after every commit,
+        before the saves of that commit are reported as done.
+
+        Args:
+            listener (CommitListener): Receives the new commit and the
+                                       relative paths it changed.
+        """
+        self._listeners.append(listener)
+
+    def submit(
+        self,
+        full_path: Path,
+        relative_path: str,
+        content: Optional[str],
+        author: git.Actor,
+        transform: Optional[ContentTransform] = None,
+    ) -> Future:
+        """
+        Queues a save. The writer thread writes the file and commits it.
+
+        Args:
+            full_path (Path): Validated absolute path of the document.
+            relative_path (str): Path relative to the repository root.
+            content (Optional[str]): The new content of the file.
+            author (git.Actor): The user making the change.
+            transform (Optional[ContentTransform]): Instead of `content`, a
+                function computing the new content from the current one. It
+                runs on the writer thread, so no other save can interleave
+                between reading the base and writing the result.
+
+        Returns:
+            Future: Resolves to the saved content once the change is committed
+                    (or was a no-op), or raises the error that rejected the
+                    save or made the batch fail.
+        """
+        pending = _PendingSave(full_path, relative_path, content, author, transform)
+        with self._lock:
+            if self._writer is None or not self._writer.is_alive():
+                self._writer = threading.Thread(target=self._run, name="git-writer", daemon=True)
+                self._writer.start()
+        self._queue.put(pending)
+        return pending.future
+
+    def stats(self) -> Dict[str, float]:
+        """
+        Returns throughput counters for the pipeline.
+
+        Returns:
+            Dict[str, float]: Total 'saves' and 'commits', the average
+                              'saves_per_commit' and 'saves_per_second'
+                              since the pipeline was created.
+        """
+        with self._lock:
+            elapsed = max(time.monotonic() - self._started_at, 1e-9)
+            return {
+                "saves": self._saves,
+                "commits": self._commits,
+                "saves_per_commit": self._saves / self._commits if self._commits else 0.0,
+                "saves_per_second": self._saves / elapsed,
+            }
+
+    def _run(self) -> None:
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self.window
+            while len(batch) < self.max_batch:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+
+            try:
+                # Transforms read the current content: they must see other processes' writes.
+                with self.write_lock.hold():
+                    batch = self._resolve_contents(batch)
+                    if not batch:
+                        continue
+                    try:
+                        with time_with_outcome(GIT_OPERATION_DURATION, "commit"):
+                            commit = self._commit_batch(batch)
+                    except Exception as e:
+                        print(f"Error committing batch of {len(batch)} document(s): {e}")
+                        self._rollback(batch)
+                        self._fail(batch, e)
+                        continue
+            except Exception as e:
+                # Nothing was written yet (the lock was not acquired, or could not
+                # even be opened): the whole batch can simply be retried by its
+                # clients, and the writer keeps serving the queue.
+                print(f"Error committing batch of {len(batch)} document(s): {e}")
+                self._fail(batch, e)
+                continue
+
+            with self._lock:
+                self._saves += len(batch)
+                self._commits += int(commit is not None)
+            COMMIT_BATCH_SIZE.observe(len(batch))
+            if commit is not None:
+                self._notify(commit, list(dict.fromkeys(p.relative_path for p in batch)))
+            for pending in batch:
+                pending.future.set_result(pending.content)
+
+    @staticmethod
+    def _fail(batch: List[_PendingSave], error: BaseException) -> None:
+        # Saves already rejected by their own transform keep that error.
+        for pending in batch:
+            if not pending.future.done():
+                pending.future.set_exception(error)
+
+    def _resolve_contents(self, batch: List[_PendingSave]) -> List[_PendingSave]:
+        """
+        Runs the transforms of a batch in arrival order, each one seeing the
+        result of earlier saves of the same path. Saves whose transform raises
+        are failed individually and dropped from the batch.
+        """
+        accepted: List[_PendingSave] = []
+        current: Dict[str, Optional[str]] = {}
+        for pending in batch:
+            if pending.transform is not None:
+                try:
+                    if pending.relative_path in current:
+                        base = current[pending.relative_path]
+                    else:
+                        base = self._read_current(pending.full_path)
+                    pending.content = pending.transform(base)
+                except Exception as e:
+                    pending.future.set_exception(e)
+                    continue
+            current[pending.relative_path] = pending.content
+            accepted.append(pending)
+        return accepted
+
+    @staticmethod
+    def _read_current(full_path: Path) -> Optional[str]:
+        try:
+            # Raw bytes, no newline translation: the result is hashed against the client's base.
+            return full_path.read_bytes().decode("utf-8")
+        except FileNotFoundError:
+            return None
+
+    def _commit_batch(self, batch: List[_PendingSave]) -> Optional[Commit]:
+        """
+        Writes, stages and commits a batch. Returns the new commit, or None
+        when the resulting tree is identical to HEAD's and no commit was needed.
+        """
+        # Later saves of the same path win, exactly as if applied in order.
+        latest: Dict[str, _PendingSave] = {}
+        for pending in batch:
+            pending.full_path.parent.mkdir(parents=True, exist_ok=True)
+            data = pending.content.encode("utf-8")
+            pending.full_path.write_bytes(data)
+            # Write-through: the next read of this document is served from memory.
+            content_cache.put(pending.full_path, pending.full_path.stat(), data)
+            latest[pending.relative_path] = pending
+
+        index = self.repo.index
+        index.add(list(latest))
+        tree = index.write_tree()
+
+        head = self.repo.head.commit if self.repo.head.is_valid() else None
+        if head is not None and head.tree.binsha == tree.binsha:
+            return None
+
+        return Commit.create_from_tree(
+            self.repo,
+            tree,
+            self._message(batch),
+            parent_commits=[head] if head is not None else [],
+            head=True,
+            author=batch[0].author,
+            committer=COMMITTER,
+        )
+
+    def _notify(self, commit: Commit, paths: List[str]) -> None:
+        for listener in self._listeners:
+            try:
+                listener(commit, paths)
+            except Exception as e:
+                print(f"Error in commit listener {listener!r}: {e}")
+
+    @staticmethod
+    def _message(batch: List[_PendingSave]) -> str:
+        if len(batch) == 1:
+            return f"Doc '{batch[0].relative_path}' updated by {batch[0].author.name}"
+
+        authors: Dict[str, git.Actor] = {}
+        for pending in batch:
+            authors.setdefault(pending.author.name, pending.author)
+        lines = [
+            f"{len(batch)} docs updated by {', '.join(authors)}",
+            "",
+            *(f"Doc '{p.relative_path}' updated by {p.author.name}" for p in batch),
+        ]
+        co_authors = list(authors.values())[1:]
+        if co_authors:
+            lines.append("")
+            lines.extend(f"Co-authored-by: {a.name} <{a.email}>" for a in co_authors)
+        return "\n".join(lines)
+
+    def _rollback(self, batch: List[_PendingSave]) -> None:
+        """
+        Restores the batch's files and index entries to HEAD, so a failed
+        save does not linger uncommitted in the working tree.
+        """
+        try:
+            head = self.repo.head.commit if self.repo.head.is_valid() else None
+            paths = {p.relative_path: p.full_path for p in batch}
+            for relative_path, full_path in paths.items():
+                try:
+                    blob = head.tree / relative_path if head is not None else None
+                except KeyError:
+                    blob = None
+                if blob is not None:
+                    full_path.write_bytes(blob.data_stream.read())
+                else:
+                    full_path.unlink(missing_ok=True)
+            if head is not None:
+                self.repo.index.reset(commit=head, paths=list(paths))
+        except Exception as e:
+            print(f"Error rolling back failed batch: {e}")
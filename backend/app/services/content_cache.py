@@ -0,0 +1,147 @@
+# /app/services/content_cache.py
+
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Optional, Tuple, Union
+
+from prometheus_client.core import GaugeMetricFamily
+
+from app.core.config import settings
+from app.core.metrics import DOCUMENT_CACHE_EVICTIONS, DOCUMENT_CACHE_REQUESTS, register_collector
+from app.services.blob_hash import blob_hashes, stat_key
+
+
+class DocumentContentCache:
+    """
+    Read-through LRU cache of document contents with a byte budget, shared by
+    the 'documents' and 'project_docs' routers.
+
+    Entries are keyed by path and validated against the file's (inode, size,
+    mtime_ns), so a file changed behind the application's back (git checkout,
+    manual edit) is simply a miss. The save paths write through with `put()`
+    right after writing, so a document that was just saved is served from
+    memory on the next read.
+    """
+
+    def __init__(
+        self,
+        max_bytes: int = settings.DOCUMENT_CACHE_MAX_BYTES,
+        max_entry_bytes: int = settings.DOCUMENT_CACHE_MAX_ENTRY_BYTES,
+    ):
+        """
+        Args:
+            max_bytes (int): Total size of cached contents; the least recently
+                             used documents are evicted beyond it. 0 disables the cache.
+            max_entry_bytes (int): Larger documents are never cached, so a few
+                                   big files cannot flush all the popular ones.
+        """
+        self.max_bytes = max_bytes
+        self.max_entry_bytes = min(max_entry_bytes, max_bytes)
+        self._lock = threading.Lock()
+        # path -> (stat key, content, blob SHA)
+        self._entries: "OrderedDict[str, Tuple[Tuple[int, int, int], bytes, str]]" = OrderedDict()
+        self._bytes = 0
+
+    def get(self, full_path: Union[str, Path], st: os.stat_result) -> Optional[Tuple[bytes, str]]:
+        """
+        Returns the cached content if the file has not changed since it was cached.
+
+        Args:
+            full_path (Union[str, Path]): Absolute path of the document.
+            st (os.stat_result): A fresh `stat` of the file.
+
+        Returns:
+            Optional[Tuple[bytes, str]]: (content, blob SHA), or None on a miss.
+        """
+        key = str(full_path)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == stat_key(st):
+                self._entries.move_to_end(key)
+                DOCUMENT_CACHE_REQUESTS.labels("hit").inc()
+                return entry[1], entry[2]
+            if entry is not None:
+                self._discard(key)
+        DOCUMENT_CACHE_REQUESTS.labels("miss").inc()
+        return None
+
+    def put(self, full_path: Union[str, Path], st: os.stat_result, data: bytes) -> str:
+        """
+        Caches a document's content (read or written after `st` was taken)
+        and records its blob SHA as the file's validator.
+
+        Returns:
+            str: The blob SHA of `data`.
+        """
+        blob_sha = blob_hashes.store(full_path, st, data)
+        key = str(full_path)
+        with self._lock:
+            if key in self._entries:
+                self._discard(key)
+            if len(data) > self.max_entry_bytes:
+                return blob_sha
+            self._entries[key] = (stat_key(st), data, blob_sha)
+            self._bytes += len(data)
+            while self._bytes > self.max_bytes:
+                self._discard(next(iter(self._entries)))
+                DOCUMENT_CACHE_EVICTIONS.inc()
+        return blob_sha
+
+    def read(self, full_path: Union[str, Path]) -> Tuple[bytes, str]:
+        """
+        Returns a document's content, from memory when the cached copy is
+        still current, otherwise from disk (and caches it).
+
+        Args:
+            full_path (Union[str, Path]): Absolute path of the document.
+
+        Raises:
+            OSError: If the file cannot be read.
+
+        Returns:
+            Tuple[bytes, str]: (content, blob SHA).
+        """
+        st = os.stat(full_path)
+        cached = self.get(full_path, st)
+        if cached is not None:
+            return cached
+        with open(full_path, "rb") as f:
+            data = f.read()
+        return data, self.put(full_path, st, data)
+
+    def invalidate(self, full_path: Union[str, Path]) -> None:
+        """Drops a document from the cache (e.g. after it was deleted)."""
+        with self._lock:
+            if str(full_path) in self._entries:
+                self._discard(str(full_path))
+
+    def stats(self) -> Dict[str, int]:
+        """Returns the number of cached documents and their total size in bytes."""
+        with self._lock:
+            return {"entries": len(self._entries), "bytes": self._bytes}
+
+    def _discard(self, key: str) -> None:
+        # Must be called with the lock held.
+        _, data, _ = self._entries.pop(key)
+        self._bytes -= len(data)
+
+
+# A single instance is created (Singleton pattern) to be easily imported and used by other modules.
+content_cache = DocumentContentCache()
+
+register_collector(
+    lambda: [
+        GaugeMetricFamily(
+            "docuhub_document_cache_bytes",
+            "Bytes of document content held by the content cache.",
+            value=content_cache.stats()["bytes"],
+        ),
+        GaugeMetricFamily(
+            "docuhub_document_cache_entries",
+            "Documents held by the content cache.",
+            value=content_cache.stats()["entries"],
+        ),
+    ]
+)
@@ -1,10 +1,28 @@
 import os
+import stat
+import subprocess
+import tempfile
+import threading
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
 
 import git
 
 from app.core.config import settings
+from app.core.metrics import GIT_OPERATION_DURATION, time_with_outcome
+from app.core.pagination import decode_cursor, encode_cursor
+from app.core.responses import EncodedJSON
+from app.db import schemas
+from app.services.blob_hash import blob_hashes, git_blob_sha
+from app.services.commit_pipeline import CommitPipeline
+from app.services.content_cache import content_cache
+from app.services.event_bus import event_bus
+from app.services.history_service import HistoryIndex, RevisionNotFoundError
+from app.services.patching import make_patch_transform
+from app.services.repo_lock import RepositoryBusyError, RepositoryWriteLock
+from app.services.search_service import search_index
+from app.services.tree_index import tree_index
+from app.services.worker_signals import worker_signals
 
 
 class DocumentService:
@@ -16,26 +34,82 @@ class DocumentService:
 
     def __init__(self, docs_path: str = settings.DOCS_DIRECTORY):
         """
-        Initializes the service, ensuring the documents directory
-        and the Git repository exist. If the repo doesn't exist, it's initialized.
+        Creates the service without touching the filesystem: the documents
+        directory and the Git repository are opened (or initialized) by
+        `initialize()`, called at application startup or on first use.
 
         Args:
             docs_path (str): The root path for the documents directory.
         """
         self.docs_path = Path(docs_path)
-        if not self.docs_path.exists():
-            self.docs_path.mkdir(parents=True)
+        self._init_lock = threading.Lock()
+        self._local = threading.local()
+        self._repo: Optional[git.Repo] = None
+        self._pipeline: Optional[CommitPipeline] = None
+        self._history: Optional[HistoryIndex] = None
+        worker_signals.subscribe("documents.committed", self._apply_remote_commit)
 
-        try:
-            self.repo = git.Repo(self.docs_path)
-        except git.InvalidGitRepositoryError:
-            self.repo = git.Repo.init(self.docs_path)
+    def initialize(self) -> None:
+        """
+        Ensures the documents directory and the Git repository exist, creating
+        the repository if needed, and sets up the commit pipeline and the
+        history index. Thread-safe; later calls are no-ops.
+        """
+        if self._repo is not None:
+            return
+        with self._init_lock:
+            if self._repo is not None:
+                return
+            if not self.docs_path.exists():
+                self.docs_path.mkdir(parents=True)
+
+            try:
+                repo = git.Repo(self.docs_path)
+            except git.InvalidGitRepositoryError:
+                repo = git.Repo.init(self.docs_path)
+
+            # GitPython reads objects through long-lived `git cat-file` processes that must
+            # not be shared between threads: the writer thread, the history index (behind
+            # its own lock) and every other thread (see `repo`) each get their own handle.
+            self._pipeline = CommitPipeline(repo)
+            self._history = HistoryIndex(git.Repo(self.docs_path))
+            self._pipeline.add_commit_listener(self._history.record)
+            self._pipeline.add_commit_listener(self._announce_commit)
+            # Assigned last: other threads only skip the lock once everything is set up.
+            self._repo = repo
+
+    @property
+    def repo(self) -> git.Repo:
+        """The documents repository (opened on first use), as a handle private to the calling thread."""
+        self.initialize()
+        repo = getattr(self._local, "repo", None)
+        if repo is None:
+            repo = self._local.repo = git.Repo(self.docs_path)
+        return repo
+
+    @property
+    def history(self) -> HistoryIndex:
+        """The per-document revision index (created on first use)."""
+        self.initialize()
+        return self._history
+
+    @property
+    def commit_pipeline(self) -> CommitPipeline:
+        """The single-writer commit queue (created on first use)."""
+        self.initialize()
+        return self._pipeline
+
+    @property
+    def write_lock(self) -> RepositoryWriteLock:
+        """The cross-process lock serializing writes to the documents directory."""
+        return self.commit_pipeline.write_lock
 
     def _get_full_path(self, relative_path: str) -> Path:
         """
         Builds and validates a full, secure path for a file.
         Prevents path traversal attacks by ensuring the resolved path
-        is within the configured documents directory.
+        is within the configured documents directory, and outside the
+        repository metadata (`.git`), which is never read or written as a document.
 
         Args:
             relative_path (str): The user-provided relative path.
@@ -46,43 +120,183 @@ class DocumentService:
         Returns:
             Path: A resolved, secure Path object.
         """
+        docs_root = self.docs_path.resolve()
         full_path = (self.docs_path / relative_path).resolve()
-        if not full_path.is_relative_to(self.docs_path.resolve()):
+        if not full_path.is_relative_to(docs_root):
             raise ValueError("Path traversal attempt detected.")
+        if ".git" in full_path.relative_to(docs_root).parts:
+            raise ValueError("Access to the repository metadata is not allowed.")
+        return full_path
+
+    def document_file(self, relative_path: str) -> Optional[Path]:
+        """
+        Locates an existing document file, applying the same path validation
+        as every other document operation.
+
+        Args:
+            relative_path (str): The user-provided relative path.
+
+        Returns:
+            Optional[Path]: The resolved absolute path, or None if the path is
+            invalid or is not a regular file in the documents directory.
+        """
+        try:
+            full_path = self._get_full_path(relative_path)
+        except ValueError:
+            return None
+        if not full_path.is_file():
+            return None
         return full_path
 
+    def repo_path(self, relative_path: str) -> str:
+        """
+        Validates a user-provided path and returns it relative to the
+        repository root, in POSIX form ('' for the root itself).
+
+        Raises:
+            ValueError: If the path is outside the documents directory.
+        """
+        repo_path = self._get_full_path(relative_path).relative_to(self.docs_path.resolve()).as_posix()
+        return "" if repo_path == "." else repo_path
+
+    @staticmethod
+    def _announce_commit(commit: git.Commit, paths: List[str]) -> None:
+        """
+        Publishes a change event per document written by a commit, and signals
+        the commit to the other worker processes together with those events.
+        """
+        parent_tree = commit.parents[0].tree if commit.parents else None
+        events = []
+        for path in paths:
+            try:
+                blob_sha = (commit.tree / path).hexsha
+            except KeyError:
+                blob_sha = None
+            try:
+                previous_sha = (parent_tree / path).hexsha if parent_tree is not None else None
+            except KeyError:
+                previous_sha = None
+            if previous_sha == blob_sha:
+                continue  # Saved without changes.
+            if blob_sha is None:
+                event_type = "document.deleted"
+            else:
+                event_type = "document.saved" if previous_sha else "document.created"
+            event = {"path": path, "revision": blob_sha, "commit": commit.hexsha, "author": commit.author.name}
+            event_bus.publish(event_type, **event)
+            events.append([event_type, event])
+        worker_signals.publish("documents.committed", paths=paths, events=events)
+
+    @staticmethod
+    def _apply_remote_commit(data: Dict[str, Any]) -> None:
+        """
+        Brings this process's caches up to date with a commit made by another
+        worker and relays its change events to this process's subscribers.
+        Does not touch the repository: GitPython's object readers are not
+        thread-safe, and the history index catches up with HEAD by itself.
+        """
+        for path in data.get("paths", []):
+            tree_index.invalidate(path)
+            search_index.update_document(path)
+        for event_type, event in data.get("events", []):
+            event_bus.publish(event_type, **event)
+
     def list_documents(self) -> List[Dict[str, Any]]:
         """
         Lists all documents and directories recursively to build a file tree.
+        Served from the shared in-memory tree index, not from the filesystem.
 
         Returns:
             List[Dict[str, Any]]: A hierarchical list of dictionaries
                                   representing the file and directory structure.
         """
+        return tree_index.tree()
+
+    def list_directory(
+        self, relative_dir: str = "", depth: int = 1, limit: int = 200, cursor: Optional[str] = None
+    ) -> Optional[Tuple[List[Dict[str, Any]], Optional[str]]]:
+        """
+        Lists one directory level (or a few) at a time, with child counts,
+        from the shared tree index. See `DocumentTreeIndex.list_directory()`.
 
-        def build_tree(current_path: Path):
-            tree = []
-            for item in sorted(current_path.iterdir()):
-                if item.name.startswith(".") or item.name == "mkdocs.yml":
-                    continue
-
-                relative_path = item.relative_to(self.docs_path).as_posix()
-                if item.is_dir():
-                    tree.append(
-                        {
-                            "name": item.name,
-                            "type": "directory",
-                            "path": relative_path,
-                            "children": build_tree(item),
-                        }
-                    )
-                elif item.is_file() and item.suffix == ".md":
-                    tree.append(
-                        {"name": item.name, "type": "file", "path": relative_path}
-                    )
-            return tree
-
-        return build_tree(self.docs_path)
+        Raises:
+            ValueError: If the cursor is malformed.
+
+        Returns:
+            Optional[Tuple[List[Dict[str, Any]], Optional[str]]]: The nodes and
+            the cursor of the next page, or None if the directory does not exist.
+        """
+        return tree_index.list_directory(relative_dir, depth=depth, limit=limit, cursor=cursor)
+
+    def list_documents_json(self) -> EncodedJSON:
+        """
+        Same tree as `list_documents()`, already serialized to JSON (and
+        cached until the tree changes), for large trees.
+
+        Returns:
+            EncodedJSON: The serialized tree with its compressed variants.
+        """
+        return tree_index.tree_json()
+
+    def peek_document_sha(self, relative_path: str) -> Optional[str]:
+        """
+        Returns the blob SHA of a document without reading it, if it is already
+        known for the file's current (inode, size, mtime). Used to answer
+        conditional requests with a single `stat`.
+
+        Args:
+            relative_path (str): The relative path of the file.
+
+        Returns:
+            Optional[str]: The blob SHA, or None if unknown or not found.
+        """
+        try:
+            full_path = self._get_full_path(relative_path)
+            return blob_hashes.lookup(full_path, full_path.stat())
+        except (OSError, ValueError):
+            return None
+
+    def read_document(self, relative_path: str) -> Optional[Tuple[str, str]]:
+        """
+        Reads a Markdown file together with the git blob SHA of its content.
+        Served from the shared content cache while the file is unchanged.
+
+        Args:
+            relative_path (str): The relative path of the file to read.
+
+        Returns:
+            Optional[Tuple[str, str]]: (content, blob SHA), or None if not found.
+        """
+        try:
+            data, blob_sha = content_cache.read(self._get_full_path(relative_path))
+            return data.decode("utf-8"), blob_sha
+        except (OSError, ValueError):
+            return None
+
+    def warm_content_cache(self, limit: int = settings.STARTUP_WARMUP_DOCUMENTS) -> int:
+        """
+        Loads the most recently committed documents into the content cache,
+        on the assumption that they are the ones about to be read and edited.
+
+        Args:
+            limit (int): Maximum number of documents to load.
+
+        Returns:
+            int: The number of documents loaded.
+        """
+        if limit <= 0 or not self.repo.head.is_valid():
+            return 0
+        # Each commit changes at least one document, so `limit` commits are always enough.
+        with time_with_outcome(GIT_OPERATION_DURATION, "log"):
+            output = self.repo.git.log(f"-{limit}", "-z", "--name-only", "--format=", "--", "*.md")
+        loaded = 0
+        for relative_path in list(dict.fromkeys(path for path in output.split("\0") if path.strip()))[:limit]:
+            try:
+                content_cache.read(self._get_full_path(relative_path))
+                loaded += 1
+            except (OSError, ValueError):
+                continue  # Deleted since it was committed.
+        return loaded
 
     def get_document_content(self, relative_path: str) -> Optional[str]:
         """
@@ -94,76 +308,369 @@ class DocumentService:
         Returns:
             Optional[str]: The content of the file as a string, or None if not found.
         """
-        try:
-            full_path = self._get_full_path(relative_path)
-            return full_path.read_text(encoding="utf-8")
-        except (FileNotFoundError, ValueError):
-            return None
+        document = self.read_document(relative_path)
+        return document[0] if document else None
 
     def save_document_content(
-        self, relative_path: str, content: str, author_name: str
+        self, relative_path: str, content: str, author_name: str, author_email: Optional[str] = None
     ) -> bool:
         """
         Saves a document's content and creates a Git commit.
-        This is an atomic operation: it writes and then versions.
+        The write goes through the commit pipeline, which serializes all
+        repository writes and may group it with other concurrent saves into
+        a single commit. This call blocks until that commit exists, for at
+        most GROUP_COMMIT_SAVE_TIMEOUT seconds (then the save is reported as failed).
 
         Args:
             relative_path (str): The file path relative to the documents directory.
             content (str): The new content of the file.
             author_name (str): The user making the change, for the commit message.
+            author_email (Optional[str]): The user's email, for commit attribution.
+
+        Raises:
+            RepositoryBusyError: If the repository stayed locked by another writer.
 
         Returns:
             bool: True if the operation was successful, False otherwise.
         """
         try:
             full_path = self._get_full_path(relative_path)
-            full_path.parent.mkdir(parents=True, exist_ok=True)
-            full_path.write_text(content, encoding="utf-8")
-
-            self.repo.git.add(str(full_path))
-            if self.repo.is_dirty(path=str(full_path)):
-                self.repo.git.commit(
-                    "-m", f"Doc '{relative_path}' updated by {author_name}"
-                )
+            repo_path = full_path.relative_to(self.docs_path.resolve()).as_posix()
+            author = git.Actor(author_name, author_email or f"{author_name}@docuhub.local")
+            self.commit_pipeline.submit(full_path, repo_path, content, author).result(
+                timeout=settings.GROUP_COMMIT_SAVE_TIMEOUT
+            )
+
+            tree_index.invalidate(repo_path)
+            search_index.update_document(repo_path, content)
             return True
+        except RepositoryBusyError:
+            raise
         except Exception as e:
             print(f"Error saving document {relative_path}: {e}")
-            # Simple rollback logic on failure
-            try:
-                self.repo.git.reset("--hard", "HEAD")
-            except git.GitCommandError:
-                pass
             return False
 
+    def patch_document(
+        self,
+        relative_path: str,
+        base_revision: str,
+        operations: Sequence[schemas.LinePatchOperation],
+        author_name: str,
+        author_email: Optional[str] = None,
+    ) -> str:
+        """
+        Applies a line-range patch to a document and commits the result.
+        The base revision check and the write happen on the commit pipeline's
+        writer thread, so no other save can slip in between them.
+
+        Args:
+            relative_path (str): The file path relative to the documents directory.
+            base_revision (str): Blob SHA (or ETag) the patch was computed against.
+            operations (Sequence[schemas.LinePatchOperation]): The line-range edits.
+            author_name (str): The user making the change, for the commit message.
+            author_email (Optional[str]): The user's email, for commit attribution.
+
+        Raises:
+            ValueError: If the path is outside the documents directory.
+            PatchConflictError: If the document changed since `base_revision`.
+            InvalidPatchError: If the operations do not fit the base content.
+            RepositoryBusyError: If the repository stayed locked by another writer.
+            TimeoutError: If the commit did not complete within GROUP_COMMIT_SAVE_TIMEOUT.
+
+        Returns:
+            str: The blob SHA of the new content.
+        """
+        full_path = self._get_full_path(relative_path)
+        repo_path = full_path.relative_to(self.docs_path.resolve()).as_posix()
+        author = git.Actor(author_name, author_email or f"{author_name}@docuhub.local")
+        transform = make_patch_transform(base_revision, operations)
+        content = self.commit_pipeline.submit(full_path, repo_path, None, author, transform).result(
+            timeout=settings.GROUP_COMMIT_SAVE_TIMEOUT
+        )
+
+        tree_index.invalidate(repo_path)
+        search_index.update_document(repo_path, content)
+        return git_blob_sha(content.encode("utf-8"))
+
+    def get_history(
+        self, relative_path: str, limit: int = 50, cursor: Optional[str] = None
+    ) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """
+        Returns a page of the commits that changed a document, newest first.
+        Served from the persisted history index instead of walking the log.
+
+        Args:
+            relative_path (str): The file path relative to the documents directory.
+            limit (int): The maximum number of revisions to return.
+            cursor (Optional[str]): `next_cursor` of the previous page.
+
+        Raises:
+            ValueError: If the path or the cursor is invalid.
+
+        Returns:
+            Tuple[List[Dict[str, Any]], Optional[str]]: The revisions and the
+            cursor of the next page (None on the last page).
+        """
+        repo_path = self.repo_path(relative_path)
+        before = None
+        if cursor:
+            (before,) = decode_cursor(cursor, 1)
+            if not isinstance(before, int):
+                raise ValueError("Invalid cursor.")
+        entries, next_before = self.history.history(repo_path, limit=limit, before=before)
+        revisions = [
+            {
+                "revision": commit_sha,
+                "blob": blob_sha,
+                "author_name": author_name,
+                "author_email": author_email,
+                "authored_at": authored_at,
+                "message": message,
+                "deleted": blob_sha is None,
+            }
+            for commit_sha, blob_sha, (author_name, author_email, authored_at, message) in entries
+        ]
+        return revisions, (encode_cursor(next_before) if next_before is not None else None)
+
+    def _resolve_revision(self, revision: str) -> git.Commit:
+        try:
+            return self.repo.commit(revision)
+        except Exception as e:
+            raise RevisionNotFoundError(revision) from e
+
+    @staticmethod
+    def _blob_at(commit: git.Commit, repo_path: str, revision: str) -> git.Blob:
+        """Looks up a document in a commit; directories (and submodules) are not documents."""
+        try:
+            blob = commit.tree / repo_path
+        except KeyError as e:
+            raise RevisionNotFoundError(revision) from e
+        if blob.type != "blob":
+            raise RevisionNotFoundError(revision)
+        return blob
+
+    def get_content_at(self, relative_path: str, revision: str) -> Tuple[str, str, str]:
+        """
+        Reads a document as it was at a given revision, from the git object store.
+
+        Args:
+            relative_path (str): The file path relative to the documents directory.
+            revision (str): A commit SHA (or any git revision, e.g. 'HEAD~2').
+
+        Raises:
+            ValueError: If the path is invalid.
+            RevisionNotFoundError: If the revision or the document in it does not
+                                   exist, or the path is a directory.
+
+        Returns:
+            Tuple[str, str, str]: (content, commit SHA, blob SHA).
+        """
+        repo_path = self.repo_path(relative_path)
+        commit = self._resolve_revision(revision)
+        with time_with_outcome(GIT_OPERATION_DURATION, "read_blob"):
+            blob = self._blob_at(commit, repo_path, revision)
+            return blob.data_stream.read().decode("utf-8"), commit.hexsha, blob.hexsha
+
+    def open_document(self, relative_path: str) -> Optional[Tuple[Path, os.stat_result, str]]:
+        """
+        Locates a document for streaming without reading it into memory.
+        The blob SHA comes from the validator cache, or is computed by
+        hashing the file in chunks.
+
+        Args:
+            relative_path (str): The file path relative to the documents directory.
+
+        Returns:
+            Optional[Tuple[Path, os.stat_result, str]]: (full path, stat, blob SHA),
+            or None if the document does not exist.
+        """
+        try:
+            full_path = self._get_full_path(relative_path)
+            st = full_path.stat()
+            if not stat.S_ISREG(st.st_mode):
+                return None
+            return full_path, st, blob_hashes.lookup(full_path, st) or blob_hashes.store_file(full_path, st)
+        except (OSError, ValueError):
+            return None
+
+    def get_blob_at(self, relative_path: str, revision: str) -> Tuple[str, str, int]:
+        """
+        Resolves a document at a revision without reading its content.
+
+        Args:
+            relative_path (str): The file path relative to the documents directory.
+            revision (str): A commit SHA (or any git revision).
+
+        Raises:
+            ValueError: If the path is invalid.
+            RevisionNotFoundError: If the revision or the document in it does not
+                                   exist, or the path is a directory.
+
+        Returns:
+            Tuple[str, str, int]: (commit SHA, blob SHA, size in bytes).
+        """
+        repo_path = self.repo_path(relative_path)
+        commit = self._resolve_revision(revision)
+        blob = self._blob_at(commit, repo_path, revision)
+        return commit.hexsha, blob.hexsha, blob.size
+
+    def _stream_git(self, args: Sequence[str], start: int = 0, length: Optional[int] = None) -> Iterator[bytes]:
+        """
+        Streams the output of a git command run in the documents repository,
+        in chunks of at most 64 KiB. The process only starts when the first
+        chunk is requested, and is killed as soon as the consumer stops (e.g.
+        the client disconnected). Callers validate their arguments first: once
+        a response has started, a failing command can only truncate it, so
+        the failure is logged.
+
+        Args:
+            args (Sequence[str]): The git subcommand and its arguments.
+            start (int): Offset of the first byte to send.
+            length (Optional[int]): Number of bytes to send; the rest of the output if None.
+
+        Returns:
+            Iterator[bytes]: The command's standard output.
+        """
+        def stream() -> Iterator[bytes]:
+            remaining = length
+            # Not a pipe: git must never block on stderr while we only read stdout.
+            errors = tempfile.TemporaryFile()
+            process = subprocess.Popen(
+                ["git", *args],
+                cwd=self.docs_path,
+                stdout=subprocess.PIPE,
+                stderr=errors,
+                env={**os.environ, "GIT_OPTIONAL_LOCKS": "0"},
+            )
+            finished = False
+            try:
+                to_skip = start
+                while to_skip and (chunk := process.stdout.read(min(to_skip, 64 * 1024))):
+                    to_skip -= len(chunk)
+                while remaining is None or remaining > 0:
+                    chunk = process.stdout.read(64 * 1024 if remaining is None else min(remaining, 64 * 1024))
+                    if not chunk:
+                        break
+                    if remaining is not None:
+                        remaining -= len(chunk)
+                    yield chunk
+                finished = remaining is None
+            finally:
+                if not finished:
+                    process.kill()
+                if process.wait() != 0 and finished:
+                    errors.seek(0)
+                    print(f"Error streaming 'git {args[0]}': {errors.read(4096).decode('utf-8', errors='replace').strip()}")
+                process.stdout.close()
+                errors.close()
+
+        return stream()
+
+    def stream_blob(self, blob_sha: str, start: int = 0, length: Optional[int] = None) -> Iterator[bytes]:
+        """
+        Streams (a byte range of) a blob from the git object store. A
+        dedicated `git cat-file` process is used per stream, so a slow client
+        never holds up GitPython's shared object reader.
+
+        Args:
+            blob_sha (str): The blob to read (see `get_blob_at()`).
+            start (int): Offset of the first byte to send.
+            length (Optional[int]): Number of bytes to send; the rest of the blob if None.
+
+        Returns:
+            Iterator[bytes]: The content, in chunks of at most 64 KiB.
+        """
+        return self._stream_git(["cat-file", "blob", blob_sha], start=start, length=length)
+
+    def diff_revisions(self, relative_path: str, from_revision: str, to_revision: str = "HEAD") -> Iterator[bytes]:
+        """
+        Streams the unified diff of a document between two revisions.
+        Both revisions are resolved before returning, so errors surface
+        before the first chunk is sent.
+
+        Args:
+            relative_path (str): The file path relative to the documents directory.
+            from_revision (str): The old revision.
+            to_revision (str): The new revision.
+
+        Raises:
+            ValueError: If the path is invalid.
+            RevisionNotFoundError: If either revision does not exist.
+
+        Returns:
+            Iterator[bytes]: Chunks of `git diff` output.
+        """
+        repo_path = self.repo_path(relative_path)
+        old = self._resolve_revision(from_revision).hexsha
+        new = self._resolve_revision(to_revision).hexsha
+        return self._stream_git(["diff", "--no-color", "--no-ext-diff", old, new, "--", repo_path])
+
+    def export_archive(
+        self, relative_dir: str = "", revision: str = "HEAD", archive_format: str = "zip"
+    ) -> Tuple[str, str, Iterator[bytes]]:
+        """
+        Streams a zip or tar.gz of a directory (or of the whole repository) as
+        it was at a revision, written by `git archive` straight from the object
+        store: nothing is staged on disk and memory use does not depend on the
+        archive's size. Entries keep their repository paths, so importing the
+        archive at the root restores the same layout. The directory and the
+        revision are resolved before returning, so errors surface before the
+        first chunk is sent.
+
+        Args:
+            relative_dir (str): Directory relative to the documents directory ('' for all of it).
+            revision (str): A commit SHA (or any git revision).
+            archive_format (str): 'zip' or 'tar.gz'.
+
+        Raises:
+            ValueError: If the path or the format is invalid.
+            RevisionNotFoundError: If the revision or the directory in it does not exist.
+
+        Returns:
+            Tuple[str, str, Iterator[bytes]]: (commit SHA, repository path of
+            the directory, chunks of the archive).
+        """
+        if archive_format not in ("zip", "tar.gz"):
+            raise ValueError(f"Unsupported archive format: {archive_format}")
+        repo_path = ""
+        if relative_dir.strip("/"):
+            repo_path = self.repo_path(relative_dir)
+        commit = self._resolve_revision(revision)
+        if repo_path:
+            try:
+                if (commit.tree / repo_path).type != "tree":
+                    raise RevisionNotFoundError(revision)
+            except KeyError as e:
+                raise RevisionNotFoundError(revision) from e
+        args = ["archive", f"--format={archive_format}", commit.hexsha]
+        if repo_path:
+            args += ["--", repo_path]
+        return commit.hexsha, repo_path, self._stream_git(args)
+
     def generate_mkdocs_nav(self) -> List[Dict[str, Any]]:
         """
         Generates the hierarchical navigation structure for the mkdocs.yml file.
         This allows MkDocs to build a site with a nested menu that mirrors
-        the directory structure.
+        the directory structure. Built from the in-memory tree index.
 
         Returns:
             List[Dict[str, Any]]: A list formatted for the 'nav' key in mkdocs.yml.
         """
 
-        def build_nav(current_path: Path):
+        def build_nav(nodes: List[Dict[str, Any]]):
             nav_items = []
-            for item in sorted(current_path.iterdir()):
-                if item.name.startswith(".") or item.name == "mkdocs.yml":
-                    continue
-
-                relative_path = item.relative_to(self.docs_path).as_posix()
-
-                if item.is_dir():
-                    dir_name = item.name.replace("_", " ").title()
-                    children_nav = build_nav(item)
+            for node in nodes:
+                if node["type"] == "directory":
+                    dir_name = node["name"].replace("_", " ").title()
+                    children_nav = build_nav(node["children"])
                     if children_nav:
                         nav_items.append({dir_name: children_nav})
-                elif item.is_file() and item.suffix == ".md":
-                    file_name = item.stem.replace("_", " ").title()
-                    nav_items.append({file_name: relative_path})
+                else:
+                    file_name = Path(node["name"]).stem.replace("_", " ").title()
+                    nav_items.append({file_name: node["path"]})
             return nav_items
 
-        return build_nav(self.docs_path)
+        return build_nav(tree_index.tree())
 
 
 # A single instance is created (Singleton pattern) to be easily imported and used by other modules.
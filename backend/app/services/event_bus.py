@@ -0,0 +1,171 @@
+# /app/services/event_bus.py
+
+import asyncio
+import itertools
+import threading
+import time
+import uuid
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional, Set, Tuple
+
+from app.core.config import settings
+from prometheus_client.core import GaugeMetricFamily
+
+from app.core.metrics import register_collector
+
+# Sent to a subscriber whose buffer overflowed: it missed events and must re-fetch.
+RESYNC_EVENT = "resync"
+
+
+class Subscription:
+    """
+    One client's view of the event stream: a bounded buffer living on the
+    subscriber's event loop. When the client falls behind and the buffer
+    fills up, pending events are dropped and replaced by a single
+    `resync` event, so a slow client never makes the publisher wait or grow
+    memory without bound.
+    """
+
+    def __init__(self, loop: asyncio.AbstractEventLoop, max_pending: int):
+        self._loop = loop
+        self._queue: "asyncio.Queue[Dict[str, Any]]" = asyncio.Queue(maxsize=max_pending)
+
+    def _deliver(self, event: Dict[str, Any]) -> None:
+        # Runs on the subscriber's loop.
+        try:
+            self._queue.put_nowait(event)
+        except asyncio.QueueFull:
+            while not self._queue.empty():
+                self._queue.get_nowait()
+            self._queue.put_nowait({"id": event["id"], "type": RESYNC_EVENT, "time": event["time"]})
+
+    async def get(self, timeout: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        """
+        Waits for the next event.
+
+        Args:
+            timeout (Optional[float]): Seconds to wait before giving up.
+
+        Returns:
+            Optional[Dict[str, Any]]: The event, or None on timeout.
+        """
+        try:
+            return await asyncio.wait_for(self._queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+
+class EventBus:
+    """
+    In-process publish/subscribe hub for change notifications (saves, locks,
+    publishes). Publishing is thread-safe and never blocks: it can be called
+    from the git writer thread, threadpool endpoints or the event loop, and
+    each event is handed to every subscriber's loop with `call_soon_threadsafe`.
+
+    The most recent events are kept so a reconnecting client can resume from
+    the last event id it saw. Event ids are '<stream>-<sequence>', where the
+    stream identifies this process: with several workers (or after a
+    restart) a client may reconnect to a process that never issued its last
+    id, and then it gets a `resync` instead of a replay of unrelated events.
+    """
+
+    def __init__(
+        self,
+        max_pending: int = settings.EVENT_SUBSCRIBER_BUFFER,
+        history_size: int = settings.EVENT_HISTORY_SIZE,
+    ):
+        """
+        Args:
+            max_pending (int): Events buffered per subscriber before it is
+                               told to resync.
+            history_size (int): Recent events kept for resuming streams.
+        """
+        self.max_pending = max_pending
+        self._lock = threading.Lock()
+        self._subscribers: Set[Subscription] = set()
+        self.stream_id = uuid.uuid4().hex[:12]
+        self._sequence = itertools.count(1)
+        # (sequence, event), oldest first
+        self._history: Deque[Tuple[int, Dict[str, Any]]] = deque(maxlen=history_size)
+
+    def publish(self, event_type: str, **data: Any) -> None:
+        """
+        Broadcasts an event to all current subscribers.
+
+        Args:
+            event_type (str): The event name, e.g. 'document.saved'.
+            **data (Any): JSON-serializable event fields (path, revision, author...).
+        """
+        with self._lock:
+            sequence = next(self._sequence)
+            event = {"id": f"{self.stream_id}-{sequence}", "type": event_type, "time": time.time(), **data}
+            self._history.append((sequence, event))
+            subscribers = list(self._subscribers)
+        for subscription in subscribers:
+            try:
+                subscription._loop.call_soon_threadsafe(subscription._deliver, event)
+            except RuntimeError:
+                # The subscriber's loop is closed; it will never unsubscribe itself.
+                self.unsubscribe(subscription)
+
+    def _sequence_of(self, event_id: str) -> Optional[int]:
+        """Returns the sequence number of an id issued by this process, or None."""
+        stream_id, _, sequence = event_id.rpartition("-")
+        if stream_id != self.stream_id or not sequence.isdigit():
+            return None
+        return int(sequence)
+
+    def subscribe(self, last_event_id: Optional[str] = None) -> Subscription:
+        """
+        Registers a subscriber on the running event loop.
+
+        Args:
+            last_event_id (Optional[str]): Id of the last event the client
+                received; newer events still in memory are replayed first.
+                If some of them were already discarded, or the id was not
+                issued by this process, a `resync` is sent.
+
+        Returns:
+            Subscription: The subscriber's buffer. Call `unsubscribe()` when done.
+        """
+        subscription = Subscription(asyncio.get_running_loop(), self.max_pending)
+        with self._lock:
+            self._subscribers.add(subscription)
+            if last_event_id is not None:
+                last = self._sequence_of(last_event_id)
+                oldest = self._history[0][0] if self._history else 1
+                newest = self._history[-1][0] if self._history else 0
+                # Another worker (or this one before a restart) issued the id, or events were discarded.
+                if last is None or oldest > last + 1 or last > newest:
+                    missed: List[Dict[str, Any]] = [
+                        {"id": f"{self.stream_id}-{newest}", "type": RESYNC_EVENT, "time": time.time()}
+                    ]
+                else:
+                    missed = [event for sequence, event in self._history if sequence > last]
+                for event in missed:
+                    subscription._deliver(event)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        """Removes a subscriber."""
+        with self._lock:
+            self._subscribers.discard(subscription)
+
+    def subscriber_count(self) -> int:
+        """Returns the number of connected subscribers."""
+        with self._lock:
+            return len(self._subscribers)
+
+
+# A single instance is created (Singleton pattern) to be easily imported and used by other modules.
+event_bus = EventBus()
+
+register_collector(
+    lambda: [
+        GaugeMetricFamily(
+            "docuhub_event_subscribers",
+            "Clients connected to the event stream.",
+            value=event_bus.subscriber_count(),
+        )
+    ]
+)
@@ -0,0 +1,266 @@
+# /app/services/history_service.py
+
+import os
+import pickle
+import subprocess
+import threading
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import git
+from git.objects.commit import Commit
+
+from app.core.config import settings
+from app.core.metrics import GIT_OPERATION_DURATION, time_with_outcome
+
+# Bump when the on-disk layout changes so stale files are rebuilt, not misread.
+_INDEX_FORMAT_VERSION = 1
+
+# Fields of one commit in `git log` output: sha, author name, author email, author time, subject.
+_LOG_FORMAT = "%x01%H%x1f%an%x1f%ae%x1f%at%x1f%s"
+
+# (author name, author email, authored unix time, subject)
+CommitInfo = Tuple[str, str, int, str]
+# (commit sha, blob sha of the document at that commit, or None if it was deleted)
+PathChange = Tuple[str, Optional[str]]
+
+
+class RevisionNotFoundError(LookupError):
+    """Raised when a revision does not exist or does not contain the document."""
+
+
+class HistoryIndex:
+    """
+    Persisted path -> commits index of the documents repository, so a
+    document's history is a dictionary lookup instead of a `git log -- path`
+    walk of the whole commit graph.
+
+    Commits made through the commit pipeline are appended as they happen
+    (see `record()`). Any other movement of HEAD (commits made outside the
+    API, a restart) is caught up on the next read by indexing only the
+    commits between the last indexed one and HEAD, with a single `git log`.
+    """
+
+    def __init__(
+        self,
+        repo: git.Repo,
+        index_path: str = os.path.join(settings.CACHE_DIRECTORY, "history_index.pickle"),
+        flush_interval: float = settings.HISTORY_INDEX_FLUSH_INTERVAL,
+    ):
+        """
+        Args:
+            repo (git.Repo): The documents repository.
+            index_path (str): Where the index is persisted between restarts.
+            flush_interval (float): Seconds between background flushes of a
+                                    modified index to disk.
+        """
+        self.repo = repo
+        self.index_path = index_path
+        self.flush_interval = flush_interval
+        self._lock = threading.RLock()
+        # Serializes flushes, so an older snapshot never replaces a newer one on disk.
+        self._flush_lock = threading.Lock()
+        self._loaded = False
+        self._dirty = False
+        self._flusher: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+        self._head: Optional[str] = None
+        self._commits: Dict[str, CommitInfo] = {}
+        # Oldest first; entries are only ever appended, so positions are stable cursors.
+        self._paths: Dict[str, List[PathChange]] = {}
+
+    # --- Indexing ---
+
+    def record(self, commit: Commit, paths: List[str]) -> None:
+        """
+        Appends a commit made through the commit pipeline. Ignored (and left
+        to the catch-up on the next read) unless it directly follows the last
+        indexed commit.
+
+        Args:
+            commit (Commit): The new commit.
+            paths (List[str]): The relative paths it changed.
+        """
+        with self._lock:
+            if not self._loaded:
+                return
+            parent = commit.parents[0].hexsha if commit.parents else None
+            if parent != self._head:
+                return
+            changes = []
+            for path in paths:
+                try:
+                    changes.append((path, (commit.tree / path).hexsha))
+                except KeyError:
+                    changes.append((path, None))
+            self._add_commit(
+                commit.hexsha,
+                (commit.author.name, commit.author.email, commit.authored_date, commit.summary),
+                changes,
+            )
+
+    def _add_commit(self, sha: str, info: CommitInfo, changes: List[Tuple[str, Optional[str]]]) -> None:
+        added = False
+        for path, blob in changes:
+            entries = self._paths.setdefault(path, [])
+            if entries and entries[-1][1] == blob:
+                continue  # Saved without changes in this commit.
+            entries.append((sha, blob))
+            added = True
+        if added:
+            self._commits[sha] = info
+        self._head = sha
+        self._dirty = True
+
+    def _current_head(self) -> Optional[str]:
+        return self.repo.head.commit.hexsha if self.repo.head.is_valid() else None
+
+    def _catch_up(self) -> None:
+        head = self._current_head()
+        if head == self._head:
+            return
+        if self._head is not None and not self._is_ancestor(self._head, head):
+            # History was rewritten: the indexed commits may no longer exist.
+            print("Document history diverged from the index; rebuilding it.")
+            self._head, self._commits, self._paths = None, {}, {}
+        if head is None:
+            return
+        rev_range = f"{self._head}..{head}" if self._head else head
+        for sha, info, changes in self._log(rev_range):
+            self._add_commit(sha, info, changes)
+        self._head = head
+        self._dirty = True
+
+    def _is_ancestor(self, ancestor: str, head: Optional[str]) -> bool:
+        if head is None:
+            return False
+        try:
+            self.repo.git.merge_base("--is-ancestor", ancestor, head)
+            return True
+        except git.GitCommandError:
+            return False
+
+    def _log(self, rev_range: str) -> Iterator[Tuple[str, CommitInfo, List[Tuple[str, Optional[str]]]]]:
+        """Yields (sha, info, [(path, blob sha or None)]) for each first-parent commit, oldest first."""
+        with time_with_outcome(GIT_OPERATION_DURATION, "log"):
+            output = subprocess.run(
+                [
+                    "git", "log", "--reverse", "--first-parent", "-m", "--raw", "--no-renames",
+                    "--no-abbrev", "-z", f"--format={_LOG_FORMAT}", rev_range, "--",
+                ],
+                cwd=self.repo.working_tree_dir,
+                capture_output=True,
+                check=True,
+                env={**os.environ, "GIT_OPTIONAL_LOCKS": "0"},
+            ).stdout.decode("utf-8", errors="replace")
+
+        for chunk in output.split("\x01")[1:]:
+            header, _, raw = chunk.partition("\0")
+            sha, author, email, authored, subject = header.split("\x1f", 4)
+            tokens = raw.lstrip("\n").split("\0")
+            changes = []
+            # Raw entries: ":<old mode> <new mode> <old sha> <new sha> <status>", then the path.
+            for meta, path in zip(tokens[0::2], tokens[1::2]):
+                if not meta.startswith(":"):
+                    continue
+                fields = meta[1:].split()
+                changes.append((path, None if fields[4] == "D" else fields[3]))
+            yield sha, (author, email, int(authored), subject), changes
+
+    def _ensure_current(self) -> None:
+        with self._lock:
+            if not self._loaded:
+                self._load()
+                self._loaded = True
+                self._start_flusher()
+            self._catch_up()
+
+    def warm_up(self) -> None:
+        """Loads the persisted index and indexes new commits now, instead of on the first history request."""
+        self._ensure_current()
+
+    # --- Querying ---
+
+    def history(
+        self, relative_path: str, limit: int = 50, before: Optional[int] = None
+    ) -> Tuple[List[Tuple[str, Optional[str], CommitInfo]], Optional[int]]:
+        """
+        Returns a page of a document's revisions, newest first.
+
+        Args:
+            relative_path (str): The path relative to the repository root.
+            limit (int): The maximum number of revisions to return.
+            before (Optional[int]): Position returned as the next page marker
+                                    by the previous call.
+
+        Returns:
+            Tuple[List[Tuple[str, Optional[str], CommitInfo]], Optional[int]]:
+            (commit sha, blob sha or None if deleted, commit info) for each
+            revision, and the marker of the next page (None on the last page).
+        """
+        self._ensure_current()
+        with self._lock:
+            entries = self._paths.get(relative_path, [])
+            end = len(entries) if before is None else max(0, min(before, len(entries)))
+            start = max(0, end - limit)
+            page = [(sha, blob, self._commits[sha]) for sha, blob in reversed(entries[start:end])]
+        return page, (start if start > 0 else None)
+
+    # --- Persistence ---
+
+    def _load(self) -> None:
+        try:
+            with open(self.index_path, "rb") as f:
+                data = pickle.load(f)
+        except FileNotFoundError:
+            return
+        except Exception as e:
+            print(f"Discarding unreadable history index {self.index_path}: {e}")
+            return
+        if data.get("version") != _INDEX_FORMAT_VERSION or data.get("repo") != self.repo.working_tree_dir:
+            return
+        self._head = data["head"]
+        self._commits = data["commits"]
+        self._paths = data["paths"]
+
+    def flush(self) -> None:
+        """
+        Atomically writes the index to disk if it changed since the last flush.
+        Only the serialization runs under the index lock; the file is written
+        after releasing it, so reads and updates never wait for the disk.
+        """
+        with self._flush_lock:
+            with self._lock:
+                if not self._dirty:
+                    return
+                data = {
+                    "version": _INDEX_FORMAT_VERSION,
+                    "repo": self.repo.working_tree_dir,
+                    "head": self._head,
+                    "commits": self._commits,
+                    "paths": self._paths,
+                }
+                payload = pickle.dumps(data, protocol=pickle.HIGHEST_PROTOCOL)
+                self._dirty = False
+            try:
+                os.makedirs(os.path.dirname(self.index_path), exist_ok=True)
+                # Per process: several workers may flush the same index at once.
+                tmp_path = f"{self.index_path}.{os.getpid()}.tmp"
+                with open(tmp_path, "wb") as f:
+                    f.write(payload)
+                os.replace(tmp_path, self.index_path)
+            except OSError as e:
+                print(f"Error persisting history index: {e}")
+                with self._lock:
+                    self._dirty = True
+
+    def _start_flusher(self) -> None:
+        if self.flush_interval <= 0 or self._flusher is not None:
+            return
+
+        def loop():
+            while not self._stop.wait(self.flush_interval):
+                self.flush()
+
+        self._flusher = threading.Thread(target=loop, name="history-index-flusher", daemon=True)
+        self._flusher.start()
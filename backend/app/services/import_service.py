@@ -0,0 +1,433 @@
+# /app/services/import_service.py
+
+import codecs
+import os
+import shutil
+import stat
+import subprocess
+import tarfile
+import tempfile
+import zipfile
+import zlib
+from pathlib import Path
+from typing import IO, Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from app.core.config import settings
+from app.core.metrics import GIT_OPERATION_DURATION, time_with_outcome
+from app.db import models
+from app.services.commit_pipeline import COMMITTER
+from app.services.document_service import document_service
+from app.services.event_bus import event_bus
+from app.services.lock_service import document_locks
+from app.services.search_service import search_index
+from app.services.tree_index import tree_index
+from app.services.worker_signals import worker_signals
+
+_CHUNK_SIZE = 1024 * 1024
+
+# Problems listed in an InvalidArchiveError; validation stops once this many were found.
+MAX_REPORTED_PROBLEMS = 20
+
+# (name, kind, declared size, opener): kind is 'file', 'dir', 'link', 'encrypted' or 'other'.
+_ArchiveEntry = Tuple[str, str, int, Callable[[], IO[bytes]]]
+
+
+class InvalidArchiveError(ValueError):
+    """
+    Raised when an archive cannot be imported: it is unreadable, or some of its
+    entries are unsafe or conflict with the documents directory. Nothing is written.
+
+    Attributes:
+        problems (List[str]): One message per rejected entry.
+    """
+
+    def __init__(self, problems: List[str]):
+        super().__init__("; ".join(problems))
+        self.problems = problems
+
+
+class ArchiveTooLargeError(ValueError):
+    """Raised when an archive exceeds the import limits (number of files, or bytes per file or in total)."""
+
+
+class ImportService:
+    """
+    Imports zip or tar archives (optionally gzip/bzip2/xz compressed) into the
+    documents repository as a single commit.
+
+    The upload is spooled to disk and its entries are extracted and validated
+    into a staging directory first, without holding any lock: paths follow
+    the same rules as the rest of the API, links and special files are
+    rejected, and Markdown must be valid UTF-8. Only then, under the
+    repository write lock, are the changed files renamed into place, staged
+    with a single `git update-index` and committed with `git commit-tree`, so
+    the lock is held for roughly the time of one git invocation regardless
+    of the archive's compression. If anything fails at that point, the
+    previous files and index are put back.
+    """
+
+    def __init__(
+        self,
+        spool_dir: str = os.path.join(settings.CACHE_DIRECTORY, "imports"),
+        max_files: int = settings.IMPORT_MAX_FILES,
+        max_file_bytes: int = settings.IMPORT_MAX_FILE_BYTES,
+        max_total_bytes: int = settings.IMPORT_MAX_TOTAL_BYTES,
+    ):
+        """
+        Args:
+            spool_dir (str): Where uploads are written while they are received.
+            max_files (int): Maximum number of files in an archive.
+            max_file_bytes (int): Maximum uncompressed size of a single file.
+            max_total_bytes (int): Maximum uncompressed size of the whole archive.
+        """
+        self.spool_dir = spool_dir
+        self.max_files = max_files
+        self.max_file_bytes = max_file_bytes
+        self.max_total_bytes = max_total_bytes
+        worker_signals.subscribe("documents.imported", self._apply_remote_import)
+
+    def spool_file(self) -> IO[bytes]:
+        """Returns a temporary file, deleted on close, to receive an upload into."""
+        os.makedirs(self.spool_dir, exist_ok=True)
+        return tempfile.NamedTemporaryFile(dir=self.spool_dir, prefix="import-", suffix=".upload")
+
+    def import_archive(
+        self, archive_path: Path, user: models.User, target_dir: str = "", strip_components: int = 0
+    ) -> Dict[str, Any]:
+        """
+        Writes every file of an archive into the documents directory and
+        commits them together.
+
+        Args:
+            archive_path (Path): The spooled archive.
+            user (models.User): The user importing it; the commit author.
+            target_dir (str): Directory, relative to the documents directory,
+                              the archive is extracted into ('' for the root).
+            strip_components (int): Leading path components removed from each
+                                    entry, as in `tar --strip-components`.
+
+        Raises:
+            ValueError: If `target_dir` is not a valid directory path.
+            InvalidArchiveError: If the archive is unreadable or has invalid entries.
+            ArchiveTooLargeError: If the archive exceeds the import limits.
+            LockHeldError: If another user holds the edit lock of a document it overwrites.
+            RepositoryBusyError: If the repository stayed locked by another writer.
+
+        Returns:
+            Dict[str, Any]: 'path', 'revision' (the new commit, or None if
+            nothing changed), and the number of 'files', 'created', 'updated'
+            and 'unchanged' documents.
+        """
+        target_dir = self._relative_path(target_dir, 0) or ""
+        if target_dir:
+            target_dir = document_service.repo_path(target_dir)
+
+        staging = Path(tempfile.mkdtemp(prefix="docuhub-import-", dir=document_service.repo.git_dir))
+        try:
+            paths = self._stage(archive_path, staging / "files", target_dir, strip_components)
+            for repo_path in paths:
+                document_locks.ensure_writable(repo_path, user)
+
+            author_email = user.email or f"{user.username}@docuhub.local"
+            with document_service.write_lock.hold(), time_with_outcome(GIT_OPERATION_DURATION, "import"):
+                commit, created, updated = self._apply(staging, paths, user.username, author_email, target_dir)
+        finally:
+            shutil.rmtree(staging, ignore_errors=True)
+
+        changed = created + updated
+        result = {
+            "path": target_dir,
+            "revision": commit,
+            "files": len(paths),
+            "created": len(created),
+            "updated": len(updated),
+            "unchanged": len(paths) - len(changed),
+        }
+        if commit is not None:
+            tree_index.refresh()
+            documents = [path for path in changed if path.lower().endswith(".md")]
+            for path in documents:
+                search_index.update_document(path)
+            event = {"path": target_dir, "commit": commit, "author": user.username,
+                     "created": len(created), "updated": len(updated)}
+            event_bus.publish("documents.imported", **event)
+            worker_signals.publish("documents.imported", paths=documents, event=event)
+        return result
+
+    # --- Validation and staging ---
+
+    @staticmethod
+    def _relative_path(name: str, strip_components: int) -> Optional[str]:
+        """
+        Normalizes an archive entry name to a relative POSIX path.
+
+        Raises:
+            ValueError: If the name is absolute, goes up a directory or enters a `.git` directory.
+
+        Returns:
+            Optional[str]: The path, or None if nothing is left after stripping components.
+        """
+        name = name.replace("\\", "/")
+        if "\0" in name or name.startswith("/") or (len(name) > 1 and name[1] == ":"):
+            raise ValueError("absolute or malformed path")
+        parts = [part for part in name.split("/") if part not in ("", ".")]
+        if ".." in parts:
+            raise ValueError("path goes up a directory")
+        parts = parts[strip_components:]
+        if any(part.lower() == ".git" for part in parts):
+            raise ValueError("path inside a .git directory")
+        return "/".join(parts) or None
+
+    def _entries(self, archive_path: Path) -> Iterator[_ArchiveEntry]:
+        with open(archive_path, "rb") as f:
+            is_zip = f.read(4) in (b"PK\x03\x04", b"PK\x05\x06")
+        if is_zip:
+            with zipfile.ZipFile(archive_path) as archive:
+                for info in archive.infolist():
+                    if info.is_dir():
+                        kind = "dir"
+                    elif stat.S_ISLNK(info.external_attr >> 16):
+                        kind = "link"
+                    elif info.flag_bits & 0x1:
+                        kind = "encrypted"
+                    else:
+                        kind = "file"
+                    yield info.filename, kind, info.file_size, lambda info=info: archive.open(info)
+            return
+
+        try:
+            archive = tarfile.open(archive_path, mode="r:*")
+        except tarfile.TarError:
+            raise InvalidArchiveError(["Not a zip or tar archive."])
+        with archive:
+            for member in archive:
+                if member.isfile():
+                    kind = "file"
+                elif member.isdir():
+                    kind = "dir"
+                elif member.issym() or member.islnk():
+                    kind = "link"
+                else:
+                    kind = "other"
+                yield member.name, kind, member.size, lambda member=member: archive.extractfile(member)
+
+    def _stage(self, archive_path: Path, files_dir: Path, target_dir: str, strip_components: int) -> List[str]:
+        """
+        Extracts the archive's files under `files_dir`, at their repository paths.
+
+        Returns:
+            List[str]: The repository paths of the files, in archive order.
+        """
+        paths: Dict[str, None] = {}
+        problems: List[str] = []
+        total_bytes = 0
+        # Entry names are already relative and free of '..', so only symlinks in the documents
+        # directory could lead outside it: the traversal check is done once per directory.
+        checked_dirs: Dict[str, str] = {}
+        try:
+            for name, kind, size, open_entry in self._entries(archive_path):
+                if len(problems) >= MAX_REPORTED_PROBLEMS:
+                    break
+                if kind == "dir":
+                    continue
+                try:
+                    relative_path = self._relative_path(name, strip_components)
+                    if relative_path is None:
+                        continue
+                    if kind != "file":
+                        raise ValueError("links, special and encrypted files are not supported")
+                    repo_path = f"{target_dir}/{relative_path}" if target_dir else relative_path
+                    parent, _, file_name = repo_path.rpartition("/")
+                    if parent not in checked_dirs:
+                        checked_dirs[parent] = (
+                            document_service.repo_path(parent) if parent else ""
+                        )
+                        os.makedirs(files_dir / checked_dirs[parent], exist_ok=True)
+                    repo_path = f"{checked_dirs[parent]}/{file_name}" if checked_dirs[parent] else file_name
+                except ValueError as e:
+                    problems.append(f"{name}: {e}")
+                    continue
+
+                paths[repo_path] = None
+                if len(paths) > self.max_files:
+                    raise ArchiveTooLargeError(f"The archive has more than {self.max_files} files.")
+                if size > self.max_file_bytes:
+                    raise ArchiveTooLargeError(f"{name} is larger than {self.max_file_bytes} bytes.")
+                with open_entry() as source, open(os.path.join(files_dir, repo_path), "wb") as target:
+                    try:
+                        total_bytes += self._copy(source, target, repo_path.lower().endswith(".md"), total_bytes)
+                    except UnicodeDecodeError:
+                        problems.append(f"{name}: Markdown file is not valid UTF-8")
+        except (tarfile.TarError, zipfile.BadZipFile, zlib.error, EOFError) as e:
+            raise InvalidArchiveError([f"Unreadable archive: {e}"])
+
+        if not problems:
+            problems = self._conflicts(list(paths))
+        if problems:
+            raise InvalidArchiveError(problems[:MAX_REPORTED_PROBLEMS])
+        if not paths:
+            raise InvalidArchiveError(["The archive contains no files."])
+        return list(paths)
+
+    def _copy(self, source: IO[bytes], target: IO[bytes], is_markdown: bool, total_bytes: int) -> int:
+        # Sizes declared in archive headers are not trusted: the limits are enforced on the bytes read.
+        decoder = codecs.getincrementaldecoder("utf-8")() if is_markdown else None
+        written = 0
+        while chunk := source.read(_CHUNK_SIZE):
+            written += len(chunk)
+            if written > self.max_file_bytes:
+                raise ArchiveTooLargeError(f"A file is larger than {self.max_file_bytes} bytes.")
+            if total_bytes + written > self.max_total_bytes:
+                raise ArchiveTooLargeError(f"The archive expands to more than {self.max_total_bytes} bytes.")
+            if decoder is not None:
+                decoder.decode(chunk)
+            target.write(chunk)
+        if decoder is not None:
+            decoder.decode(b"", final=True)
+        return written
+
+    @staticmethod
+    def _conflicts(paths: List[str]) -> List[str]:
+        """Finds files that would have to replace a directory, or be created under a file."""
+        docs_root = document_service.docs_path.resolve()
+        problems = []
+        files = set(paths)
+        checked_dirs = set()
+        for repo_path in paths:
+            if (docs_root / repo_path).is_dir():
+                problems.append(f"{repo_path}: a directory with this name already exists")
+            parent = os.path.dirname(repo_path)
+            while parent and parent not in checked_dirs:
+                checked_dirs.add(parent)
+                if parent in files or (docs_root / parent).is_file():
+                    problems.append(f"{repo_path}: {parent} is a file, not a directory")
+                parent = os.path.dirname(parent)
+            if len(problems) >= MAX_REPORTED_PROBLEMS:
+                break
+        return problems
+
+    # --- Commit ---
+
+    def _git(self, *args: str, input: Optional[bytes] = None, env: Optional[Dict[str, str]] = None) -> str:
+        return subprocess.run(
+            ["git", *args],
+            cwd=document_service.docs_path,
+            input=input,
+            capture_output=True,
+            check=True,
+            env={**os.environ, **(env or {})},
+        ).stdout.decode("utf-8").strip()
+
+    def _head(self) -> Optional[str]:
+        try:
+            return self._git("rev-parse", "--verify", "-q", "HEAD")
+        except subprocess.CalledProcessError:
+            return None  # Empty repository.
+
+    @staticmethod
+    def _same_content(a: Path, b: Path) -> bool:
+        if a.stat().st_size != b.stat().st_size:
+            return False
+        with open(a, "rb") as fa, open(b, "rb") as fb:
+            while True:
+                chunk = fa.read(_CHUNK_SIZE)
+                if chunk != fb.read(_CHUNK_SIZE):
+                    return False
+                if not chunk:
+                    return True
+
+    def _apply(
+        self, staging: Path, paths: List[str], author_name: str, author_email: str, target_dir: str
+    ) -> Tuple[Optional[str], List[str], List[str]]:
+        """
+        Moves the staged files into the documents directory and commits them.
+        Must be called with the repository write lock held.
+
+        Returns:
+            Tuple[Optional[str], List[str], List[str]]: The new commit (None if
+            nothing changed), and the created and updated paths.
+        """
+        docs_root = document_service.docs_path.resolve()
+        index_path = Path(document_service.repo.git_dir) / "index"
+        index_backup = staging / "index"
+        if index_path.exists():
+            shutil.copy2(index_path, index_backup)
+
+        created: List[str] = []
+        updated: List[str] = []
+        # (target, previous file moved aside or None), to undo a failed import.
+        moved: List[Tuple[Path, Optional[Path]]] = []
+        created_dirs = set()
+        try:
+            for repo_path in paths:
+                staged = staging / "files" / repo_path
+                target = docs_root / repo_path
+                previous = None
+                if target.exists():
+                    if self._same_content(staged, target):
+                        continue
+                    previous = staging / "previous" / repo_path
+                    previous.parent.mkdir(parents=True, exist_ok=True)
+                    os.replace(target, previous)
+                elif target.parent not in created_dirs:
+                    target.parent.mkdir(parents=True, exist_ok=True)
+                    created_dirs.add(target.parent)
+                os.replace(staged, target)
+                moved.append((target, previous))
+                (updated if previous is not None else created).append(repo_path)
+
+            changed = created + updated
+            if not changed:
+                return None, [], []
+            self._git("update-index", "--add", "-z", "--stdin", input="\0".join(changed).encode("utf-8"))
+            tree = self._git("write-tree")
+            head = self._head()
+            if head is not None and self._git("rev-parse", f"{head}^{{tree}}") == tree:
+                return None, [], []
+
+            summary = f"{len(changed)} docs imported into '{target_dir}' by {author_name}" if target_dir \
+                else f"{len(changed)} docs imported by {author_name}"
+            commit = self._git(
+                "commit-tree", tree, *(["-p", head] if head else []),
+                input=summary.encode("utf-8"),
+                env={
+                    "GIT_AUTHOR_NAME": author_name,
+                    "GIT_AUTHOR_EMAIL": author_email,
+                    "GIT_COMMITTER_NAME": COMMITTER.name,
+                    "GIT_COMMITTER_EMAIL": COMMITTER.email,
+                },
+            )
+            # Only moves HEAD if it is still the commit the import was based on.
+            self._git("update-ref", "-m", f"commit: {summary}", "HEAD", commit, head or "")
+            return commit, created, updated
+        except BaseException:
+            self._rollback(moved, index_path, index_backup)
+            raise
+
+    @staticmethod
+    def _rollback(moved: List[Tuple[Path, Optional[Path]]], index_path: Path, index_backup: Path) -> None:
+        """Puts back the files replaced by a failed import and the previous index."""
+        try:
+            for target, previous in reversed(moved):
+                if previous is not None:
+                    os.replace(previous, target)
+                else:
+                    target.unlink(missing_ok=True)
+            if index_backup.exists():
+                os.replace(index_backup, index_path)
+            else:
+                index_path.unlink(missing_ok=True)
+        except Exception as e:
+            print(f"Error rolling back failed import: {e}")
+
+    @staticmethod
+    def _apply_remote_import(data: Dict[str, Any]) -> None:
+        """Brings this process's caches up to date with an import made by another worker."""
+        tree_index.refresh()
+        for path in data.get("paths", []):
+            search_index.update_document(path)
+        event_bus.publish("documents.imported", **data.get("event", {}))
+
+
+# A single instance is created (Singleton pattern) to be easily imported and used by other modules.
+import_service = ImportService()
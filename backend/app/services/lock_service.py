@@ -0,0 +1,297 @@
+# /app/services/lock_service.py
+
+import asyncio
+import posixpath
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Iterable, List, Optional
+
+from sqlalchemy import delete, or_, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.db import models, schemas
+from app.db.database import AsyncSessionLocal, async_engine
+from app.services.event_bus import event_bus
+from app.services.worker_signals import worker_signals
+
+# INSERT constructs with ON CONFLICT support, per database dialect.
+_UPSERT_INSERTS = {"postgresql": postgresql.insert, "sqlite": sqlite.insert}
+
+
+class LockHeldError(Exception):
+    """Raised when the document is locked by another user."""
+
+    def __init__(self, lease: Optional[schemas.DocumentLock] = None):
+        super().__init__("Document is locked by another user.")
+        self.lease = lease
+
+
+class LockNotHeldError(Exception):
+    """Raised when renewing or releasing a lease the user does not hold."""
+
+
+def normalize_lock_path(path: str) -> str:
+    """
+    Canonical form of a document path used as the lock key, so that
+    'a/b.md', '/a/b.md' and 'a/./b.md' refer to the same lock.
+
+    Raises:
+        ValueError: If the path is empty or escapes the documents directory.
+    """
+    normalized = posixpath.normpath(path.replace("\\", "/").strip("/"))
+    if normalized in ("", ".") or normalized == ".." or normalized.startswith("../"):
+        raise ValueError("Invalid document path.")
+    return normalized
+
+
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+class DocumentLockService:
+    """
+    Lease-based edit locks. A lease lasts `ttl` seconds and is extended by
+    heartbeats (renewals); an expired lease can be taken by anyone.
+
+    Leases are served from an in-process table. Every change is written
+    through to `document_locks` with a single statement: acquisition is an
+    INSERT ... ON CONFLICT DO UPDATE that only takes over the row when it is
+    free, expired or already owned by the same user, so the database stays
+    the arbiter even if two requests race for the same document. Changes are
+    also signalled to the other worker processes, which mirror them in their
+    own tables.
+    """
+
+    def __init__(self, ttl: float = settings.DOCUMENT_LOCK_TTL_SECONDS):
+        """
+        Args:
+            ttl (float): Seconds a lease stays valid after its last heartbeat.
+        """
+        self.ttl = timedelta(seconds=ttl)
+        self._leases: Dict[str, schemas.DocumentLock] = {}
+        self._loaded = False
+        self._load_lock = asyncio.Lock()
+        worker_signals.subscribe("lock.changed", self._apply_remote)
+
+    async def load(self) -> None:
+        """
+        Fills the lease table with the unexpired locks stored in the database,
+        so leases survive a restart. Runs once; later calls are no-ops.
+        """
+        async with self._load_lock:
+            if self._loaded:
+                return
+            cutoff = _utcnow() - self.ttl
+            async with AsyncSessionLocal() as db:
+                rows = await db.execute(
+                    select(models.DocumentLock, models.User)
+                    .join(models.User, models.User.id == models.DocumentLock.locked_by_user_id)
+                    .where(models.DocumentLock.locked_at > cutoff)
+                )
+                for lock, user in rows:
+                    locked_at = lock.locked_at
+                    if locked_at.tzinfo is None:  # SQLite drops the offset; values are stored in UTC.
+                        locked_at = locked_at.replace(tzinfo=timezone.utc)
+                    self._leases[lock.document_path] = self._lease(lock.document_path, locked_at, user)
+            self._loaded = True
+
+    def holder(self, path: str) -> Optional[schemas.DocumentLock]:
+        """
+        Returns the active lease on a document, or None if it is not locked.
+
+        Args:
+            path (str): The document path.
+        """
+        return self._active(normalize_lock_path(path), _utcnow())
+
+    def ensure_writable(self, path: str, user: models.User) -> None:
+        """
+        Checks that `user` may save the document: it is unlocked or locked by them.
+
+        Raises:
+            LockHeldError: If another user holds an active lease on it.
+        """
+        lease = self.holder(path)
+        if lease is not None and lease.locked_by.id != user.id:
+            raise LockHeldError(lease)
+
+    def status(self, paths: Iterable[str]) -> List[schemas.DocumentLock]:
+        """
+        Returns the active leases among `paths`, answered from memory.
+
+        Args:
+            paths (Iterable[str]): Document paths; invalid ones are ignored.
+
+        Returns:
+            List[schemas.DocumentLock]: One entry per locked document.
+        """
+        now = _utcnow()
+        leases = []
+        for path in paths:
+            try:
+                lease = self._active(normalize_lock_path(path), now)
+            except ValueError:
+                continue
+            if lease is not None:
+                leases.append(lease)
+        return leases
+
+    async def acquire(self, db: AsyncSession, path: str, user: models.User) -> schemas.DocumentLock:
+        """
+        Acquires the lock on a document, or extends it if the user already holds it.
+
+        Args:
+            db (AsyncSession): The database session.
+            path (str): The document path.
+            user (models.User): The user taking the lock.
+
+        Raises:
+            LockHeldError: If another user holds an active lease on it.
+            ValueError: If the path is invalid.
+
+        Returns:
+            schemas.DocumentLock: The new lease.
+        """
+        path = normalize_lock_path(path)
+        now = _utcnow()
+        current = self._active(path, now)
+        if current is not None and current.locked_by.id != user.id:
+            raise LockHeldError(current)
+
+        table = models.DocumentLock
+        insert = _UPSERT_INSERTS[async_engine.dialect.name]
+        stmt = insert(table).values(document_path=path, locked_at=now, locked_by_user_id=user.id)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[table.document_path],
+            set_={"locked_at": stmt.excluded.locked_at, "locked_by_user_id": stmt.excluded.locked_by_user_id},
+            where=or_(table.locked_by_user_id == user.id, table.locked_at <= now - self.ttl),
+        ).returning(table.document_path)
+        acquired = (await db.execute(stmt)).first() is not None
+        await db.commit()
+        if not acquired:
+            # Held through a lease this process has not seen (e.g. taken by another worker).
+            raise LockHeldError(None)
+
+        lease = self._lease(path, now, user)
+        self._leases[path] = lease
+        if current is None:
+            event = {"path": path, "author": user.username, "expires_at": lease.expires_at.isoformat()}
+            event_bus.publish("lock.acquired", **event)
+            self._signal(path, lease, "lock.acquired", event)
+        else:
+            self._signal(path, lease)
+        return lease
+
+    async def renew(self, db: AsyncSession, path: str, user: models.User) -> schemas.DocumentLock:
+        """
+        Heartbeat: extends a lease the user currently holds.
+
+        Args:
+            db (AsyncSession): The database session.
+            path (str): The document path.
+            user (models.User): The lease holder.
+
+        Raises:
+            LockNotHeldError: If the user holds no active lease on the document.
+            ValueError: If the path is invalid.
+
+        Returns:
+            schemas.DocumentLock: The extended lease.
+        """
+        path = normalize_lock_path(path)
+        now = _utcnow()
+        current = self._active(path, now)
+        if current is None or current.locked_by.id != user.id:
+            raise LockNotHeldError()
+
+        table = models.DocumentLock
+        result = await db.execute(
+            update(table)
+            .where(table.document_path == path, table.locked_by_user_id == user.id)
+            .values(locked_at=now)
+        )
+        await db.commit()
+        if result.rowcount == 0:
+            self._leases.pop(path, None)
+            raise LockNotHeldError()
+
+        lease = self._lease(path, now, user)
+        self._leases[path] = lease
+        self._signal(path, lease)
+        return lease
+
+    async def release(self, db: AsyncSession, path: str, user: models.User) -> None:
+        """
+        Releases a lock. Administrators may release locks held by anyone.
+
+        Args:
+            db (AsyncSession): The database session.
+            path (str): The document path.
+            user (models.User): The user releasing the lock.
+
+        Raises:
+            LockNotHeldError: If the lock is held by another user (or not at all).
+            ValueError: If the path is invalid.
+        """
+        path = normalize_lock_path(path)
+        table = models.DocumentLock
+        stmt = delete(table).where(table.document_path == path)
+        if not user.is_admin:
+            stmt = stmt.where(table.locked_by_user_id == user.id)
+        result = await db.execute(stmt)
+        await db.commit()
+
+        lease = self._leases.get(path)
+        if lease is not None and (user.is_admin or lease.locked_by.id == user.id):
+            del self._leases[path]
+        if result.rowcount == 0:
+            raise LockNotHeldError()
+        event_bus.publish("lock.released", path=path, author=user.username)
+        self._signal(path, None, "lock.released", {"path": path, "author": user.username})
+
+    @staticmethod
+    def _signal(
+        path: str,
+        lease: Optional[schemas.DocumentLock],
+        event_type: Optional[str] = None,
+        event: Optional[Dict[str, Any]] = None,
+    ) -> None:
+        """Tells the other worker processes about a lease change and the event it produced."""
+        worker_signals.publish(
+            "lock.changed",
+            path=path,
+            lease=lease.model_dump(mode="json") if lease is not None else None,
+            event_type=event_type,
+            event=event,
+        )
+
+    def _apply_remote(self, data: Dict[str, Any]) -> None:
+        """Mirrors a lease change made through another worker (runs on the signal thread)."""
+        if data.get("lease") is None:
+            self._leases.pop(data["path"], None)
+        else:
+            self._leases[data["path"]] = schemas.DocumentLock.model_validate(data["lease"])
+        if data.get("event_type"):
+            event_bus.publish(data["event_type"], **data["event"])
+
+    def _active(self, path: str, now: datetime) -> Optional[schemas.DocumentLock]:
+        lease = self._leases.get(path)
+        if lease is None:
+            return None
+        if lease.expires_at <= now:
+            self._leases.pop(path, None)
+            return None
+        return lease
+
+    def _lease(self, path: str, locked_at: datetime, user: models.User) -> schemas.DocumentLock:
+        return schemas.DocumentLock(
+            document_path=path,
+            locked_at=locked_at,
+            expires_at=locked_at + self.ttl,
+            locked_by=schemas.User.model_validate(user, from_attributes=True),
+        )
+
+
+# A single instance is created (Singleton pattern) to be easily imported and used by other modules.
+document_locks = DocumentLockService()
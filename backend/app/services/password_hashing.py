@@ -0,0 +1,95 @@
+# /app/services/password_hashing.py
+
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Optional, Tuple, TypeVar
+
+from app.core import security
+from app.core.config import settings
+from app.core.metrics import PASSWORD_HASH_QUEUE_WAIT, PASSWORD_HASH_REJECTED
+
+T = TypeVar("T")
+
+
+class HashingSaturatedError(Exception):
+    """Raised when the password hashing queue is full."""
+
+
+class PasswordHashingPool:
+    """
+    Runs bcrypt hashing and verification on a dedicated, fixed-size thread
+    pool, away from the anyio threadpool that serves regular sync endpoints.
+    A burst of logins therefore queues here instead of stalling document reads,
+    and once `max_pending` operations are waiting new ones are rejected.
+    """
+
+    def __init__(
+        self,
+        workers: int = settings.PASSWORD_HASH_WORKERS,
+        max_pending: int = settings.PASSWORD_HASH_MAX_PENDING,
+    ):
+        """
+        Args:
+            workers (int): Number of concurrent bcrypt operations.
+            max_pending (int): Operations allowed in flight (running or queued)
+                               before new ones are rejected.
+        """
+        self.max_pending = max_pending
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="bcrypt")
+        self._lock = threading.Lock()
+        self._pending = 0
+
+    async def _submit(self, fn: Callable[..., T], *args) -> T:
+        with self._lock:
+            if self._pending >= self.max_pending:
+                PASSWORD_HASH_REJECTED.inc()
+                raise HashingSaturatedError()
+            self._pending += 1
+
+        queued_at = time.perf_counter()
+
+        def run() -> T:
+            PASSWORD_HASH_QUEUE_WAIT.observe(time.perf_counter() - queued_at)
+            return fn(*args)
+
+        try:
+            future = self._executor.submit(run)
+        except BaseException:
+            self._release()
+            raise
+        # The slot is freed when the job really ends (or is cancelled while still
+        # queued), not when a caller that gave up stops waiting for it.
+        future.add_done_callback(lambda _: self._release())
+        return await asyncio.wrap_future(future)
+
+    def _release(self) -> None:
+        with self._lock:
+            self._pending -= 1
+
+    async def verify_and_update(self, plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+        """
+        Verifies a password and, if the stored hash uses outdated parameters,
+        returns a replacement hash computed with the current ones.
+
+        Raises:
+            HashingSaturatedError: If the queue is full.
+
+        Returns:
+            Tuple[bool, Optional[str]]: (matches, new hash or None).
+        """
+        return await self._submit(security.verify_and_update_password, plain_password, hashed_password)
+
+    async def hash(self, password: str) -> str:
+        """
+        Hashes a password off the event loop.
+
+        Raises:
+            HashingSaturatedError: If the queue is full.
+        """
+        return await self._submit(security.get_password_hash, password)
+
+
+# A single instance is created (Singleton pattern) to be easily imported and used by other modules.
+password_hashing = PasswordHashingPool()
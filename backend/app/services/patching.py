@@ -0,0 +1,100 @@
+# /app/services/patching.py
+
+from typing import List, Optional, Sequence
+
+from app.db import schemas
+from app.services.blob_hash import git_blob_sha
+
+
+class PatchConflictError(Exception):
+    """
+    Raised when a patch's base revision is not the document's current revision.
+
+    Attributes:
+        current_sha (Optional[str]): Blob SHA of the current content, or None
+                                     if the document no longer exists.
+    """
+
+    def __init__(self, current_sha: Optional[str]):
+        super().__init__("The document changed since the patch base revision.")
+        self.current_sha = current_sha
+
+
+class InvalidPatchError(ValueError):
+    """Raised when a patch's operations are out of range or overlap."""
+
+
+def normalize_revision(revision: str) -> str:
+    """
+    Accepts a revision either as a bare blob SHA or as an ETag header value.
+
+    Args:
+        revision (str): e.g. 'fa7f9f...' or '"fa7f9f..."' or 'W/"fa7f9f..."'.
+
+    Returns:
+        str: The bare blob SHA.
+    """
+    revision = revision.strip()
+    if revision.startswith("W/"):
+        revision = revision[2:]
+    return revision.strip('"')
+
+
+def apply_line_patch(content: str, operations: Sequence[schemas.LinePatchOperation]) -> str:
+    """
+    Applies line-range replacements to a document.
+
+    Lines are the result of splitting on '\\n', so the operation is lossless:
+    a document ending in a newline has an empty last line. All ranges refer
+    to the base content and must not overlap.
+
+    Args:
+        content (str): The base content.
+        operations (Sequence[schemas.LinePatchOperation]): Replacements of the
+            half-open line range [start, end) by `lines`.
+
+    Raises:
+        InvalidPatchError: If a range is out of bounds or ranges overlap.
+
+    Returns:
+        str: The patched content.
+    """
+    lines: List[str] = content.split("\n")
+    ordered = sorted(operations, key=lambda op: (op.start, op.end))
+    previous_end = 0
+    for op in ordered:
+        if op.end < op.start or op.end > len(lines):
+            raise InvalidPatchError(f"Rango de líneas inválido: [{op.start}, {op.end}).")
+        if op.start < previous_end:
+            raise InvalidPatchError("Las operaciones del parche se solapan.")
+        previous_end = op.end
+
+    # Apply from the bottom up so earlier ranges keep their base coordinates.
+    for op in reversed(ordered):
+        lines[op.start:op.end] = op.lines
+    return "\n".join(lines)
+
+
+def make_patch_transform(base_revision: str, operations: Sequence[schemas.LinePatchOperation]):
+    """
+    Builds a content transform for the commit pipeline that checks the base
+    revision against the current content and then applies the patch.
+
+    Args:
+        base_revision (str): Blob SHA (or ETag) the client's edits are based on.
+        operations (Sequence[schemas.LinePatchOperation]): The edits.
+
+    Returns:
+        Callable[[Optional[str]], str]: The transform.
+    """
+    base_sha = normalize_revision(base_revision)
+
+    def transform(current: Optional[str]) -> str:
+        if current is None:
+            raise PatchConflictError(None)
+        current_sha = git_blob_sha(current.encode("utf-8"))
+        if current_sha != base_sha:
+            raise PatchConflictError(current_sha)
+        return apply_line_patch(current, operations)
+
+    return transform
@@ -0,0 +1,209 @@
+# /app/services/pdf_service.py
+
+import asyncio
+import hashlib
+import json
+import os
+import subprocess
+import tempfile
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from typing import BinaryIO, Dict, List, Optional
+
+from app.core.config import settings
+from app.core.metrics import PANDOC_RENDER_DURATION, PDF_CACHE_REQUESTS
+from app.services.blob_hash import git_blob_sha
+
+
+class RenderQueueFullError(Exception):
+    """Raised when too many PDF renders are already in flight."""
+
+
+class PdfRenderService:
+    """
+    Renders Markdown documents to PDF with Pandoc, backed by a content-addressed
+    disk cache.
+
+    Cache entries are keyed by the document's git blob SHA plus the render
+    options, so an unchanged document is served straight from disk. Misses go
+    through a fixed-size worker pool (each worker drives one pandoc process)
+    with a bounded queue and a per-render timeout, and concurrent requests for
+    the same key share a single render. The cache is bounded in bytes and
+    evicts least recently used entries.
+    """
+
+    def __init__(
+        self,
+        cache_dir: str = os.path.join(settings.CACHE_DIRECTORY, "pdf"),
+        max_cache_bytes: int = settings.PDF_CACHE_MAX_BYTES,
+        workers: int = settings.PDF_RENDER_WORKERS,
+        max_queue: int = settings.PDF_RENDER_MAX_QUEUE,
+        timeout: float = settings.PDF_RENDER_TIMEOUT,
+    ):
+        """
+        Args:
+            cache_dir (str): Directory holding the cached PDFs.
+            max_cache_bytes (int): Total size the cache may grow to before eviction.
+            workers (int): Maximum number of concurrent pandoc processes.
+            max_queue (int): Maximum number of distinct renders in flight
+                             (running or waiting for a worker).
+            timeout (float): Seconds before a pandoc process is killed.
+        """
+        self.cache_dir = Path(cache_dir)
+        self.max_cache_bytes = max_cache_bytes
+        self.max_queue = max_queue
+        self.timeout = timeout
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="pandoc")
+        self._lock = threading.Lock()
+        self._inflight: Dict[str, Future] = {}
+        self._cache_bytes = None  # Computed lazily on first store.
+
+    @staticmethod
+    def _pandoc_options(header_title: str) -> List[str]:
+        return [
+            "--pdf-engine=xelatex",
+            "-V", "documentclass=article",
+            "-V", "mainfont=Calibri",
+            "-V", "fontsize=11pt",
+            "-V", "geometry:margin=2.5cm",
+            "-V", r"header-includes=\usepackage{fancyhdr}\pagestyle{fancy}\fancyhf{}\rhead{" + header_title + r"}\cfoot{\thepage}",
+        ]
+
+    def _cache_path(self, blob_sha: str, options: List[str]) -> Path:
+        key = hashlib.sha256((blob_sha + json.dumps(options)).encode("utf-8")).hexdigest()
+        return self.cache_dir / key[:2] / f"{key}.pdf"
+
+    async def render(self, source_path: Path, header_title: str) -> BinaryIO:
+        """
+        Returns a PDF rendering of `source_path`, rendering it only if no
+        cached copy exists for its current content.
+
+        The PDF is returned as an open file rather than a path: an open file
+        stays readable even if the cache entry is evicted by another render
+        before the response has been sent.
+
+        Args:
+            source_path (Path): Absolute path of the Markdown file.
+            header_title (str): Text shown in the page header.
+
+        Raises:
+            RenderQueueFullError: If the render queue is saturated.
+            subprocess.CalledProcessError: If pandoc fails.
+            subprocess.TimeoutExpired: If pandoc exceeds the timeout.
+
+        Returns:
+            BinaryIO: The cached PDF, opened for reading; the caller closes it.
+        """
+        data = await asyncio.to_thread(source_path.read_bytes)
+        options = self._pandoc_options(header_title)
+        cached = self._cache_path(git_blob_sha(data), options)
+
+        pdf = await asyncio.to_thread(self._open_cached, cached)
+        if pdf is not None:
+            PDF_CACHE_REQUESTS.labels("hit").inc()
+            return pdf
+
+        PDF_CACHE_REQUESTS.labels("miss").inc()
+        key = cached.name
+        while True:
+            with self._lock:
+                future = self._inflight.get(key)
+                if future is None:
+                    if len(self._inflight) >= self.max_queue:
+                        raise RenderQueueFullError()
+                    future = self._executor.submit(
+                        self._render_to_cache, data, options, source_path.parent, cached
+                    )
+                    self._inflight[key] = future
+                    future.add_done_callback(lambda _: self._forget(key))
+            # Shielded: a client that disconnects must not cancel the render other requests are waiting for.
+            await asyncio.shield(asyncio.wrap_future(future))
+            pdf = await asyncio.to_thread(self._open_cached, cached)
+            if pdf is not None:
+                return pdf
+            # Evicted by another render between this one finishing and the file being opened.
+
+    @staticmethod
+    def _open_cached(cached: Path) -> Optional[BinaryIO]:
+        try:
+            pdf = open(cached, "rb")
+        except FileNotFoundError:
+            return None
+        try:
+            os.utime(cached)  # Mark as recently used for LRU eviction.
+        except FileNotFoundError:
+            pass  # Evicted after opening: the open file is still complete.
+        return pdf
+
+    def _forget(self, key: str) -> None:
+        with self._lock:
+            self._inflight.pop(key, None)
+
+    def _render_to_cache(
+        self, data: bytes, options: List[str], resource_dir: Path, cached: Path
+    ) -> Path:
+        cached.parent.mkdir(parents=True, exist_ok=True)
+        # Render inside the cache directory so the final rename is atomic and
+        # readers never see a partial file.
+        with tempfile.TemporaryDirectory(dir=self.cache_dir) as tmp_dir:
+            source = Path(tmp_dir) / "source.md"
+            source.write_bytes(data)
+            output = Path(tmp_dir) / "output.pdf"
+            started = time.perf_counter()
+            outcome = "error"
+            try:
+                subprocess.run(
+                    # Render the exact bytes that were hashed, resolving images
+                    # relative to the document's real directory.
+                    ["pandoc", str(source), "-o", str(output), "--resource-path", str(resource_dir), *options],
+                    check=True, capture_output=True, text=True, timeout=self.timeout,
+                )
+                outcome = "success"
+            except subprocess.TimeoutExpired:
+                outcome = "timeout"
+                raise
+            finally:
+                PANDOC_RENDER_DURATION.labels(outcome).observe(time.perf_counter() - started)
+            os.replace(output, cached)
+        self._account(cached)
+        return cached
+
+    def _account(self, added: Path) -> None:
+        """
+        Tracks the cache size and evicts least recently used PDFs over budget.
+        The PDF just added is never evicted by its own accounting pass, so
+        the requests waiting for it can still open it.
+        """
+        with self._lock:
+            if self._cache_bytes is None:
+                self._cache_bytes = sum(p.stat().st_size for p in self.cache_dir.glob("??/*.pdf"))
+            else:
+                self._cache_bytes += added.stat().st_size
+            if self._cache_bytes <= self.max_cache_bytes:
+                return
+            entries = []
+            for p in self.cache_dir.glob("??/*.pdf"):
+                try:
+                    st = p.stat()
+                except FileNotFoundError:
+                    continue
+                entries.append((st.st_mtime, st.st_size, p))
+            entries.sort()
+            total = sum(size for _, size, _ in entries)
+            for _, size, p in entries:
+                if total <= self.max_cache_bytes:
+                    break
+                if p == added:
+                    continue
+                try:
+                    p.unlink()
+                    total -= size
+                except FileNotFoundError:
+                    pass
+            self._cache_bytes = total
+
+
+# A single instance is created (Singleton pattern) to be easily imported and used by other modules.
+pdf_service = PdfRenderService()
@@ -0,0 +1,319 @@
+# /app/services/publish_service.py
+
+import hashlib
+import json
+import os
+import queue
+import subprocess
+import threading
+import uuid
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterator, Optional
+
+import yaml
+
+from app.core.config import settings
+from app.core.metrics import GIT_OPERATION_DURATION, MKDOCS_BUILD_DURATION, time_with_outcome
+from app.services.document_service import document_service
+from app.services.event_bus import event_bus
+from app.services.repo_lock import InterProcessLock
+from app.services.worker_signals import worker_signals
+
+# How many finished jobs are kept in the job table for the status endpoint.
+_MAX_JOB_HISTORY = 50
+# The job table lock is only held while the small JSON file is read and rewritten.
+_JOBS_LOCK_TIMEOUT = 10.0
+_ACTIVE_STATUSES = ("queued", "running")
+
+
+def _utcnow() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+def _worker_id(pid: int) -> str:
+    """Identifies a process by its pid and start time, so a reused pid is not mistaken for it."""
+    try:
+        with open(f"/proc/{pid}/stat", "rb") as f:
+            # Field 22 of /proc/<pid>/stat, counted after the parenthesized command name.
+            started = f.read().rsplit(b")", 1)[1].split()[19].decode()
+    except (OSError, IndexError):
+        started = ""
+    return f"{pid}:{started}"
+
+
+def _worker_alive(worker_id: str) -> bool:
+    pid = int(worker_id.split(":", 1)[0])
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return _worker_id(pid) == worker_id
+
+
+class PublishService:
+    """
+    Runs MkDocs site builds as background jobs on a single worker thread.
+
+    - Publish requests that arrive while a job is still queued are coalesced
+      into that job, so a burst of clicks produces a single build.
+    - If the repository HEAD, the working tree and the generated configuration
+      are all unchanged since the last successful build, the build is skipped.
+    - If only page contents changed (same navigation and configuration), MkDocs
+      runs with `--dirty`, which re-renders only pages whose source is newer
+      than their output. Structural changes trigger a full `--clean` build.
+    - With several worker processes, the job table is a JSON file shared by
+      all of them, so any worker answers status requests and coalesces into
+      any queued job, and builds are serialized by a flock on the site, so two
+      workers never run MkDocs into the same site directory at once.
+    """
+
+    def __init__(
+        self,
+        site_dir: str = settings.SITE_DIRECTORY,
+        state_dir: str = settings.CACHE_DIRECTORY,
+        site_lock_timeout: float = settings.PUBLISH_SITE_LOCK_TIMEOUT,
+    ):
+        """
+        Args:
+            site_dir (str): Where MkDocs writes the generated site.
+            state_dir (str): Where the MkDocs configuration, the last
+                             successful build state and the job table are
+                             stored. Must be shared by every worker process.
+            site_lock_timeout (float): Maximum wait, in seconds, for another
+                                       worker's build to finish.
+        """
+        self.site_dir = Path(site_dir)
+        self.state_dir = Path(state_dir)
+        self.config_path = self.state_dir / "mkdocs.yml"
+        self.state_path = self.state_dir / "publish_state.json"
+        self.jobs_path = self.state_dir / "publish_jobs.json"
+        self._jobs_lock = InterProcessLock(
+            str(self.state_dir / "publish_jobs.lock"), _JOBS_LOCK_TIMEOUT, "publish job table lock"
+        )
+        self._site_lock = InterProcessLock(
+            str(self.state_dir / "publish_site.lock"), site_lock_timeout, "publish site lock"
+        )
+        self._lock = threading.Lock()
+        self._queue: "queue.Queue[str]" = queue.Queue()
+        self._worker: Optional[threading.Thread] = None
+        worker_signals.subscribe("publish.changed", self._apply_remote)
+
+    # --- Job management ---
+
+    def submit(self, requested_by: str) -> Dict[str, Any]:
+        """
+        Enqueues a publish job, or returns the one already waiting in the queue.
+
+        Args:
+            requested_by (str): Username of the admin requesting the publish.
+
+        Returns:
+            Dict[str, Any]: A snapshot of the (new or coalesced) job.
+
+        Raises:
+            LockBusyError: If the job table lock could not be acquired in time.
+        """
+        with self._job_table() as table:
+            jobs = table["jobs"]
+            pending = jobs.get(table["pending"]) if table["pending"] else None
+            if pending is not None and not _worker_alive(pending["worker"]):
+                # The worker that queued it exited before running it.
+                pending.update(status="failed", finished_at=_utcnow(), detail="El worker que tenía el trabajo terminó.")
+                pending = None
+            if pending is not None:
+                return dict(pending)
+
+            job_id = uuid.uuid4().hex
+            job = {
+                "id": job_id,
+                "status": "queued",
+                "requested_by": requested_by,
+                "created_at": _utcnow(),
+                "started_at": None,
+                "finished_at": None,
+                "revision": None,
+                "mode": None,
+                "detail": None,
+                "worker": _worker_id(os.getpid()),
+            }
+            jobs[job_id] = job
+            while len(jobs) > _MAX_JOB_HISTORY:
+                oldest_id = next(iter(jobs))
+                if jobs[oldest_id]["status"] in _ACTIVE_STATUSES:
+                    break
+                del jobs[oldest_id]
+            table["pending"] = job_id
+            job = dict(job)
+
+        with self._lock:
+            self._ensure_worker()
+        self._queue.put(job_id)
+        self._announce(job)
+        return job
+
+    def get_job(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Returns a snapshot of a job's status, or None if unknown.
+
+        Args:
+            job_id (str): The id returned by `submit()`, on any worker.
+        """
+        # The table is replaced atomically, so reading it needs no lock.
+        job = self._load_jobs()["jobs"].get(job_id)
+        if job is not None and job["status"] in _ACTIVE_STATUSES and not _worker_alive(job["worker"]):
+            job = dict(job, status="failed", detail="El worker que tenía el trabajo terminó.")
+        return job
+
+    @contextmanager
+    def _job_table(self) -> Iterator[Dict[str, Any]]:
+        """Loads the shared job table under its lock and saves it when the block ends."""
+        with self._jobs_lock.hold():
+            table = self._load_jobs()
+            yield table
+            self._write_json(self.jobs_path, table)
+
+    def _load_jobs(self) -> Dict[str, Any]:
+        try:
+            return json.loads(self.jobs_path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return {"pending": None, "jobs": {}}
+
+    def _update(self, job_id: str, **fields: Any) -> None:
+        try:
+            with self._job_table() as table:
+                job = table["jobs"].get(job_id)
+                if job is None:
+                    return
+                job.update(fields)
+                if table["pending"] == job_id and job["status"] != "queued":
+                    # From now on, new requests must queue a fresh job: this one
+                    # may already have read the repository state.
+                    table["pending"] = None
+                job = dict(job)
+        except (TimeoutError, OSError) as e:
+            print(f"Error updating publish job {job_id}: {e}")
+            return
+        if "status" in fields:
+            self._announce(job)
+
+    @classmethod
+    def _announce(cls, job: Dict[str, Any]) -> None:
+        cls._notify(job)
+        worker_signals.publish("publish.changed", job=job)
+
+    @staticmethod
+    def _notify(job: Dict[str, Any]) -> None:
+        event_bus.publish(
+            f"publish.{job['status']}",
+            job_id=job["id"],
+            author=job["requested_by"],
+            revision=job["revision"],
+            mode=job["mode"],
+        )
+
+    def _apply_remote(self, data: Dict[str, Any]) -> None:
+        """Forwards a job change made by another worker to this worker's event stream."""
+        self._notify(data["job"])
+
+    def _ensure_worker(self) -> None:
+        if self._worker is None or not self._worker.is_alive():
+            self._worker = threading.Thread(target=self._run, name="publish-worker", daemon=True)
+            self._worker.start()
+
+    def _run(self) -> None:
+        while True:
+            job_id = self._queue.get()
+            try:
+                # While another worker builds, this job stays queued and keeps
+                # absorbing new requests.
+                with self._site_lock.hold():
+                    self._update(job_id, status="running", started_at=_utcnow())
+                    fields = {"status": "succeeded", **self._build()}
+            except subprocess.CalledProcessError as e:
+                fields = {"status": "failed", "detail": (e.stderr or str(e))[-2000:]}
+            except Exception as e:
+                fields = {"status": "failed", "detail": str(e)}
+            self._update(job_id, finished_at=_utcnow(), **fields)
+
+    # --- Build ---
+
+    def _mkdocs_config(self) -> Dict[str, Any]:
+        return {
+            "site_name": "Documentación de Proyectos DATAZUCAR",
+            "docs_dir": str(document_service.docs_path.resolve()),
+            "site_dir": str(self.site_dir),
+            "theme": {
+                "name": "material",
+                "features": ["navigation.tabs", "navigation.sections", "navigation.expand"],
+            },
+            "nav": document_service.generate_mkdocs_nav(),
+        }
+
+    def _load_state(self) -> Dict[str, Any]:
+        try:
+            return json.loads(self.state_path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return {}
+
+    def _save_state(self, state: Dict[str, Any]) -> None:
+        self._write_json(self.state_path, state)
+
+    @staticmethod
+    def _write_json(path: Path, data: Dict[str, Any]) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+        tmp_path.write_text(json.dumps(data), encoding="utf-8")
+        os.replace(tmp_path, path)
+
+    def _build(self) -> Dict[str, Any]:
+        """
+        Decides between skipping, an incremental or a full build, and runs it.
+
+        Returns:
+            Dict[str, Any]: 'revision', 'mode' and 'detail' for the job record.
+        """
+        repo = document_service.repo
+        revision = repo.head.commit.hexsha if repo.head.is_valid() else None
+        # No optional locks: 'git status' must never contend with the commit pipeline for index.lock.
+        with time_with_outcome(GIT_OPERATION_DURATION, "status"):
+            worktree_dirty = bool(repo.git.status("--porcelain", env={"GIT_OPTIONAL_LOCKS": "0"}))
+
+        config = self._mkdocs_config()
+        config_text = yaml.dump(config, allow_unicode=True, default_flow_style=False)
+        config_hash = hashlib.sha256(config_text.encode("utf-8")).hexdigest()
+
+        last = self._load_state()
+        site_exists = self.site_dir.is_dir()
+        same_structure = site_exists and last.get("config_hash") == config_hash
+
+        if same_structure and not worktree_dirty and revision and last.get("revision") == revision:
+            return {"revision": revision, "mode": "skipped", "detail": "Sin cambios desde la última publicación."}
+
+        self.state_dir.mkdir(parents=True, exist_ok=True)
+        self.config_path.write_text(config_text, encoding="utf-8")
+
+        mode = "incremental" if same_structure else "full"
+        with time_with_outcome(MKDOCS_BUILD_DURATION, mode):
+            subprocess.run(
+                ["mkdocs", "build", "-f", str(self.config_path), "--dirty" if same_structure else "--clean"],
+                cwd=str(self.state_dir),
+                check=True,
+                capture_output=True,
+                text=True,
+            )
+
+        # A dirty working tree has no single revision to remember, so the
+        # next publish will not be skipped.
+        self._save_state({
+            "revision": None if worktree_dirty else revision,
+            "config_hash": config_hash,
+        })
+        return {"revision": revision, "mode": mode, "detail": "Sitio publicado con éxito."}
+
+
+# A single instance is created (Singleton pattern) to be easily imported and used by other modules.
+publish_service = PublishService()
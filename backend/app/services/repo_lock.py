@@ -0,0 +1,131 @@
+# /app/services/repo_lock.py
+
+import fcntl
+import os
+import random
+import threading
+import time
+from contextlib import contextmanager
+from typing import Iterator, Optional
+
+import git
+
+from app.core.config import settings
+from app.core.metrics import REPO_WRITE_LOCK_TIMEOUTS, REPO_WRITE_LOCK_WAIT
+
+LOCK_FILE_NAME = "docuhub-write.lock"
+
+
+class LockBusyError(TimeoutError):
+    """Raised when an inter-process lock could not be acquired in time."""
+
+
+class RepositoryBusyError(LockBusyError):
+    """Raised when the repository write lock could not be acquired in time."""
+
+
+class InterProcessLock:
+    """
+    Exclusive lock shared by every process of a deployment (e.g.
+    `uvicorn --workers N`) and by the threads within each of them.
+
+    Based on flock(2) on a lock file, so it needs no database and is released
+    by the kernel if its holder dies. A waiter polls with a short, jittered
+    backoff and gives up after `timeout` seconds instead of queueing forever
+    behind a stuck holder.
+    """
+
+    busy_error = LockBusyError
+    description = "lock"
+
+    def __init__(self, path: str, timeout: float, description: Optional[str] = None):
+        """
+        Args:
+            path (str): The lock file; created if missing.
+            timeout (float): Default maximum wait, in seconds.
+            description (Optional[str]): Names the lock in timeout errors.
+        """
+        self.path = path
+        self.timeout = timeout
+        if description is not None:
+            self.description = description
+        # flock is held per open file: threads of one process need their own mutual exclusion.
+        self._thread_lock = threading.Lock()
+        self._fd: Optional[int] = None
+
+    @contextmanager
+    def hold(self, timeout: Optional[float] = None) -> Iterator[None]:
+        """
+        Holds the lock for the duration of the `with` block.
+
+        Args:
+            timeout (Optional[float]): Maximum wait in seconds; defaults to `self.timeout`.
+
+        Raises:
+            LockBusyError: If the lock is still held by someone else after `timeout`.
+        """
+        timeout = self.timeout if timeout is None else timeout
+        started = time.monotonic()
+        deadline = started + timeout
+        if not self._thread_lock.acquire(timeout=max(timeout, 0)):
+            raise self._timed_out(timeout)
+        try:
+            self._acquire_file_lock(deadline, timeout)
+            self._waited(time.monotonic() - started)
+            try:
+                yield
+            finally:
+                fcntl.flock(self._fd, fcntl.LOCK_UN)
+        finally:
+            self._thread_lock.release()
+
+    def _acquire_file_lock(self, deadline: float, timeout: float) -> None:
+        # Must be called with the thread lock held.
+        if self._fd is None:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            self._fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        delay = 0.001
+        while True:
+            try:
+                fcntl.flock(self._fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                return
+            except BlockingIOError:
+                pass
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise self._timed_out(timeout)
+            # Jitter keeps waiting processes from retrying in lockstep.
+            time.sleep(min(delay * random.uniform(0.5, 1.5), remaining))
+            delay = min(delay * 2, 0.02)
+
+    def _waited(self, seconds: float) -> None:
+        """Hook called with the time spent acquiring the lock."""
+
+    def _timed_out(self, timeout: float) -> LockBusyError:
+        return self.busy_error(f"Timed out after {timeout:.1f}s waiting for the {self.description}.")
+
+
+class RepositoryWriteLock(InterProcessLock):
+    """
+    Exclusive lock on writes to the documents repository. The lock file lives
+    inside the `.git` directory, so it applies to whatever process writes
+    that repository.
+    """
+
+    busy_error = RepositoryBusyError
+    description = "repository write lock"
+
+    def __init__(self, path: str, timeout: float = settings.REPO_WRITE_LOCK_TIMEOUT):
+        super().__init__(path, timeout)
+
+    @classmethod
+    def for_repo(cls, repo: git.Repo) -> "RepositoryWriteLock":
+        """Returns the write lock of a repository."""
+        return cls(os.path.join(repo.git_dir, LOCK_FILE_NAME))
+
+    def _waited(self, seconds: float) -> None:
+        REPO_WRITE_LOCK_WAIT.observe(seconds)
+
+    def _timed_out(self, timeout: float) -> LockBusyError:
+        REPO_WRITE_LOCK_TIMEOUTS.inc()
+        return super()._timed_out(timeout)
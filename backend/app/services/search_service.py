@@ -0,0 +1,441 @@
+# /app/services/search_service.py
+
+import heapq
+import html
+import math
+import os
+import pickle
+import re
+import threading
+import unicodedata
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from app.core.config import settings
+from app.services.content_cache import content_cache
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+_PHRASE_RE = re.compile(r'"([^"]+)"')
+
+# Bump when the on-disk layout changes so stale files are rebuilt, not misread.
+_INDEX_FORMAT_VERSION = 1
+
+# BM25 parameters (standard values).
+_BM25_K1 = 1.2
+_BM25_B = 0.75
+
+
+@lru_cache(maxsize=200_000)
+def _fold(token: str) -> str:
+    """Strips diacritics so that 'publicación' and 'publicacion' match."""
+    if token.isascii():
+        return token
+    decomposed = unicodedata.normalize("NFKD", token)
+    return "".join(c for c in decomposed if not unicodedata.combining(c))
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    Splits text into normalized (lowercased, accent-folded) word tokens.
+
+    Args:
+        text (str): The text to tokenize.
+
+    Returns:
+        List[str]: The tokens, in document order.
+    """
+    return [_fold(t) for t in _TOKEN_RE.findall(text.lower())]
+
+
+class SearchIndex:
+    """
+    In-memory inverted index over the Markdown corpus with positional
+    postings and BM25 ranking.
+
+    The index is persisted to disk and, on startup, reconciled against the
+    corpus by comparing each file's size and mtime, so only files changed
+    while the process was down are re-tokenized. Saves made through the API
+    update it incrementally via `update_document()`.
+
+    Flushes serialize a copy-on-write snapshot: while one is being written,
+    an update copies the postings of a term before changing them, so the
+    snapshot stays consistent without holding the index lock.
+    """
+
+    def __init__(
+        self,
+        docs_path: str = settings.DOCS_DIRECTORY,
+        index_path: str = os.path.join(settings.CACHE_DIRECTORY, "search_index.pickle"),
+        flush_interval: float = settings.SEARCH_INDEX_FLUSH_INTERVAL,
+    ):
+        """
+        Args:
+            docs_path (str): The root path for the documents directory.
+            index_path (str): Where the index is persisted between restarts.
+            flush_interval (float): Seconds between background flushes of a
+                                    modified index to disk.
+        """
+        self.docs_path = os.path.normpath(docs_path)
+        # Snippets read documents through the shared content cache, keyed by resolved path.
+        self._content_root = os.path.realpath(docs_path)
+        self.index_path = index_path
+        self.flush_interval = flush_interval
+        self._lock = threading.RLock()
+        # Serializes flushes, so an older snapshot never replaces a newer one on disk.
+        self._flush_lock = threading.Lock()
+        self._loaded = False
+        self._dirty = False
+        self._flusher: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+        # doc id -> relative path / token count / (mtime_ns, size)
+        self._paths: Dict[int, str] = {}
+        self._lengths: Dict[int, int] = {}
+        self._stats: Dict[int, Tuple[int, int]] = {}
+        self._ids: Dict[str, int] = {}
+        self._doc_terms: Dict[int, List[str]] = {}
+        self._next_id = 0
+        self._total_length = 0
+        # term -> {doc id -> positions}
+        self._postings: Dict[str, Dict[int, List[int]]] = {}
+        # doc id -> BM25 length normalization; rebuilt lazily after any change.
+        self._norms: Optional[Dict[int, float]] = None
+        # While a flush serializes a snapshot: the terms whose postings were
+        # already copied since it was taken (None when no flush is running).
+        self._copied_terms: Optional[Set[str]] = None
+
+    # --- Indexing ---
+
+    @staticmethod
+    def _normalize_path(relative_path: str) -> str:
+        return os.path.normpath(relative_path).replace(os.sep, "/")
+
+    def _remove(self, doc_id: int) -> None:
+        path = self._paths.pop(doc_id)
+        del self._ids[path]
+        self._stats.pop(doc_id, None)
+        self._total_length -= self._lengths.pop(doc_id)
+        self._norms = None
+        for term in self._doc_terms.pop(doc_id):
+            postings = self._writable_postings(term)
+            del postings[doc_id]
+            if not postings:
+                del self._postings[term]
+
+    def _add(self, relative_path: str, content: str, stat: Tuple[int, int]) -> None:
+        doc_id = self._next_id
+        self._next_id += 1
+        tokens = tokenize(content)
+        positions: Dict[str, List[int]] = {}
+        for pos, term in enumerate(tokens):
+            positions.setdefault(term, []).append(pos)
+        for term, plist in positions.items():
+            self._writable_postings(term)[doc_id] = plist
+        self._paths[doc_id] = relative_path
+        self._ids[relative_path] = doc_id
+        self._lengths[doc_id] = len(tokens)
+        self._doc_terms[doc_id] = list(positions)
+        self._stats[doc_id] = stat
+        self._total_length += len(tokens)
+        self._norms = None
+
+    def _writable_postings(self, term: str) -> Dict[int, List[int]]:
+        """Returns a term's postings for modification, copying them first if a flush snapshot shares them."""
+        postings = self._postings.get(term)
+        if postings is None:
+            postings = self._postings[term] = {}
+        elif self._copied_terms is not None and term not in self._copied_terms:
+            postings = self._postings[term] = dict(postings)
+        if self._copied_terms is not None:
+            self._copied_terms.add(term)
+        return postings
+
+    def _file_stat(self, relative_path: str) -> Optional[Tuple[int, int]]:
+        try:
+            st = os.stat(os.path.join(self.docs_path, relative_path))
+        except OSError:
+            return None
+        return (st.st_mtime_ns, st.st_size)
+
+    def update_document(self, relative_path: str, content: Optional[str] = None) -> None:
+        """
+        Indexes (or re-indexes) a single document. Called by the save paths
+        right after the file has been written.
+
+        Args:
+            relative_path (str): The path relative to the documents directory.
+            content (Optional[str]): The new content. Read from disk if omitted.
+        """
+        relative_path = self._normalize_path(relative_path)
+        stat = self._file_stat(relative_path)
+        if content is None and stat is not None:
+            try:
+                with open(os.path.join(self.docs_path, relative_path), encoding="utf-8") as f:
+                    content = f.read()
+            except (OSError, UnicodeDecodeError):
+                content = None
+        with self._lock:
+            if not self._loaded:
+                # The startup reconciliation will pick this file up.
+                return
+            old_id = self._ids.get(relative_path)
+            if old_id is not None:
+                self._remove(old_id)
+            if content is not None and stat is not None:
+                self._add(relative_path, content, stat)
+            self._dirty = True
+
+    def remove_document(self, relative_path: str) -> None:
+        """
+        Removes a document from the index.
+
+        Args:
+            relative_path (str): The path relative to the documents directory.
+        """
+        relative_path = self._normalize_path(relative_path)
+        with self._lock:
+            doc_id = self._ids.get(relative_path)
+            if doc_id is not None:
+                self._remove(doc_id)
+                self._dirty = True
+
+    def _scan_corpus(self) -> Dict[str, Tuple[int, int]]:
+        """Returns {relative path: (mtime_ns, size)} for every Markdown file."""
+        found: Dict[str, Tuple[int, int]] = {}
+        stack = [""]
+        while stack:
+            rel_dir = stack.pop()
+            try:
+                with os.scandir(os.path.join(self.docs_path, rel_dir)) as it:
+                    for entry in it:
+                        if entry.name.startswith("."):
+                            continue
+                        rel = f"{rel_dir}/{entry.name}" if rel_dir else entry.name
+                        if entry.is_dir():
+                            stack.append(rel)
+                        elif entry.is_file() and entry.name.lower().endswith(".md"):
+                            st = entry.stat()
+                            found[rel] = (st.st_mtime_ns, st.st_size)
+            except OSError:
+                continue
+        return found
+
+    def _ensure_loaded(self) -> None:
+        if self._loaded:
+            return
+        with self._lock:
+            if self._loaded:
+                return
+            self._load()
+            on_disk = self._scan_corpus()
+            for path, doc_id in list(self._ids.items()):
+                if path not in on_disk or on_disk[path] != self._stats.get(doc_id):
+                    self._remove(doc_id)
+                    self._dirty = True
+            for path, stat in on_disk.items():
+                if path in self._ids:
+                    continue
+                try:
+                    with open(os.path.join(self.docs_path, path), encoding="utf-8") as f:
+                        self._add(path, f.read(), stat)
+                except (OSError, UnicodeDecodeError) as e:
+                    print(f"Error indexing document {path}: {e}")
+                self._dirty = True
+            self._loaded = True
+            self.flush()
+            self._start_flusher()
+
+    def warm_up(self) -> None:
+        """Loads the persisted index and reconciles it with the corpus now, instead of on the first search."""
+        self._ensure_loaded()
+
+    # --- Persistence ---
+
+    def _load(self) -> None:
+        try:
+            with open(self.index_path, "rb") as f:
+                data = pickle.load(f)
+        except FileNotFoundError:
+            return
+        except Exception as e:
+            print(f"Discarding unreadable search index {self.index_path}: {e}")
+            return
+        if data.get("version") != _INDEX_FORMAT_VERSION or data.get("docs_path") != self.docs_path:
+            return
+        self._paths = data["paths"]
+        self._lengths = data["lengths"]
+        self._stats = data["stats"]
+        self._postings = data["postings"]
+        self._doc_terms = data["doc_terms"]
+        self._ids = {path: doc_id for doc_id, path in self._paths.items()}
+        self._next_id = max(self._paths, default=-1) + 1
+        self._total_length = sum(self._lengths.values())
+
+    def flush(self) -> None:
+        """
+        Atomically writes the index to disk if it changed since the last flush.
+        Only a shallow copy of the index is taken under the index lock; it is
+        serialized and written after releasing it, so reads and updates never
+        wait for the pickling or the disk.
+        """
+        with self._flush_lock:
+            with self._lock:
+                if not self._dirty:
+                    return
+                # Document entries are replaced, never changed in place; postings
+                # are copied on their next change while _copied_terms is set.
+                data = {
+                    "version": _INDEX_FORMAT_VERSION,
+                    "docs_path": self.docs_path,
+                    "paths": dict(self._paths),
+                    "lengths": dict(self._lengths),
+                    "stats": dict(self._stats),
+                    "doc_terms": dict(self._doc_terms),
+                    "postings": dict(self._postings),
+                }
+                self._copied_terms = set()
+                self._dirty = False
+            try:
+                payload = pickle.dumps(data, protocol=pickle.HIGHEST_PROTOCOL)
+            except Exception:
+                with self._lock:
+                    self._dirty = True
+                raise
+            finally:
+                with self._lock:
+                    self._copied_terms = None
+            try:
+                os.makedirs(os.path.dirname(self.index_path), exist_ok=True)
+                # Per process: several workers may flush the same index at once.
+                tmp_path = f"{self.index_path}.{os.getpid()}.tmp"
+                with open(tmp_path, "wb") as f:
+                    f.write(payload)
+                os.replace(tmp_path, self.index_path)
+            except OSError as e:
+                print(f"Error persisting search index: {e}")
+                with self._lock:
+                    self._dirty = True
+
+    def _start_flusher(self) -> None:
+        if self.flush_interval <= 0 or self._flusher is not None:
+            return
+
+        def loop():
+            while not self._stop.wait(self.flush_interval):
+                self.flush()
+
+        self._flusher = threading.Thread(target=loop, name="search-index-flusher", daemon=True)
+        self._flusher.start()
+
+    # --- Querying ---
+
+    def _phrase_docs(self, terms: List[str]) -> Set[int]:
+        """Returns the documents where `terms` occur as consecutive tokens."""
+        postings = [self._postings.get(t) for t in terms]
+        if not all(postings):
+            return set()
+        candidates = postings[0].keys()
+        for p in postings[1:]:
+            candidates = candidates & p.keys()
+        matches = set()
+        for doc_id in candidates:
+            starts = set(postings[0][doc_id])
+            for offset, plist in enumerate(postings[1:], start=1):
+                starts &= {pos - offset for pos in plist[doc_id]}
+                if not starts:
+                    break
+            if starts:
+                matches.add(doc_id)
+        return matches
+
+    def search(self, query: str, limit: int = 20, offset: int = 0) -> Dict[str, Any]:
+        """
+        Runs a BM25-ranked query. Words in double quotes must appear as an
+        exact phrase; every other word contributes to the score.
+
+        Args:
+            query (str): The user's query string.
+            limit (int): Maximum number of results to return.
+            offset (int): Number of top-ranked results to skip.
+
+        Returns:
+            Dict[str, Any]: 'total' matches and the ranked 'results', each
+                            with 'path', 'score' and an HTML 'snippet'.
+        """
+        self._ensure_loaded()
+        phrases = [tokenize(p) for p in _PHRASE_RE.findall(query)]
+        terms = list(dict.fromkeys(tokenize(query)))
+        if not terms:
+            return {"total": 0, "results": []}
+
+        with self._lock:
+            allowed: Optional[Set[int]] = None
+            for phrase in phrases:
+                if len(phrase) > 1:
+                    matches = self._phrase_docs(phrase)
+                    allowed = matches if allowed is None else allowed & matches
+
+            norms = self._norms
+            if norms is None:
+                n_docs = len(self._paths)
+                avg_len = (self._total_length / n_docs if n_docs else 0.0) or 1.0
+                k = _BM25_K1 * (1 - _BM25_B)
+                kb = _BM25_K1 * _BM25_B / avg_len
+                norms = self._norms = {d: k + kb * n for d, n in self._lengths.items()}
+
+            n_docs = len(self._paths)
+            scores: Dict[int, float] = {}
+            for term in terms:
+                postings = self._postings.get(term)
+                if not postings:
+                    continue
+                df = len(postings)
+                weight = math.log(1 + (n_docs - df + 0.5) / (df + 0.5)) * (_BM25_K1 + 1)
+                if allowed is not None:
+                    postings = {d: postings[d] for d in allowed if d in postings}
+                get = scores.get
+                for doc_id, positions in postings.items():
+                    tf = len(positions)
+                    scores[doc_id] = get(doc_id, 0.0) + weight * tf / (tf + norms[doc_id])
+
+            top = heapq.nlargest(offset + limit, scores.items(), key=lambda item: item[1])[offset:]
+            hits = [(self._paths[doc_id], score) for doc_id, score in top]
+
+        term_set = set(terms)
+        results = [
+            {"path": path, "score": round(score, 4), "snippet": self._snippet(path, term_set)}
+            for path, score in hits
+        ]
+        return {"total": len(scores), "results": results}
+
+    def _snippet(self, relative_path: str, terms: Set[str], width: int = 160) -> str:
+        """Builds an HTML-escaped excerpt around the first match, with <mark> highlights."""
+        try:
+            content = content_cache.read(os.path.join(self._content_root, relative_path))[0].decode("utf-8")
+        except (OSError, UnicodeDecodeError):
+            return ""
+
+        matches = [m for m in _TOKEN_RE.finditer(content) if _fold(m.group().lower()) in terms]
+        if not matches:
+            return html.escape(content[:width])
+        start = max(0, matches[0].start() - width // 3)
+        end = min(len(content), start + width)
+
+        parts = ["…" if start > 0 else ""]
+        cursor = start
+        for m in matches:
+            if m.start() < start:
+                continue
+            if m.end() > end:
+                break
+            parts.append(html.escape(content[cursor:m.start()]))
+            parts.append(f"<mark>{html.escape(m.group())}</mark>")
+            cursor = m.end()
+        parts.append(html.escape(content[cursor:end]))
+        if end < len(content):
+            parts.append("…")
+        return "".join(parts).replace("\n", " ")
+
+
+# A single instance is created (Singleton pattern) to be easily imported and used by other modules.
+search_index = SearchIndex()
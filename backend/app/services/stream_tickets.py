@@ -0,0 +1,95 @@
+# /app/services/stream_tickets.py
+
+import os
+import time
+from typing import Optional
+
+from app.core import security
+from app.core.config import settings
+
+
+class StreamTicketService:
+    """
+    Issues and redeems the tickets that open the event stream.
+
+    EventSource cannot send an Authorization header, so the browser trades its
+    access token for a ticket (an authenticated POST) and puts the ticket in
+    the stream URL instead. A ticket is a JWT that expires within seconds, is
+    scoped to the stream (no other endpoint accepts it) and can be redeemed
+    once: its id is claimed by creating a marker file with O_EXCL, which is
+    atomic across worker processes. A ticket that ends up in an access log
+    is therefore already spent.
+    """
+
+    def __init__(
+        self,
+        state_dir: str = settings.CACHE_DIRECTORY,
+        ttl: int = settings.STREAM_TICKET_EXPIRE_SECONDS,
+    ):
+        """
+        Args:
+            state_dir (str): Where the redeemed ticket markers are kept. Must
+                             be shared by every worker process.
+            ttl (int): Lifespan of a ticket, in seconds.
+        """
+        self.path = os.path.join(state_dir, "stream_tickets")
+        self.ttl = ttl
+        self._last_sweep = 0.0
+
+    def issue(self, username: str) -> str:
+        """
+        Returns a new single-use ticket for a user.
+
+        Args:
+            username (str): The authenticated user's name.
+        """
+        return security.create_stream_ticket(username, self.ttl)
+
+    def redeem(self, ticket: str) -> Optional[str]:
+        """
+        Validates a ticket and marks it as used.
+
+        Args:
+            ticket (str): The ticket from the stream URL.
+
+        Returns:
+            Optional[str]: The ticket's username, or None if it is invalid,
+                           expired or was already redeemed.
+        """
+        claims = security.decode_token_claims(ticket)
+        if not claims or claims.get("scope") != security.STREAM_TICKET_SCOPE:
+            return None
+        if not claims.get("sub") or not claims.get("jti"):
+            return None
+        self._sweep()
+        try:
+            os.makedirs(self.path, exist_ok=True)
+            fd = os.open(os.path.join(self.path, claims["jti"]), os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o644)
+        except FileExistsError:
+            return None
+        except OSError as e:
+            print(f"Error redeeming stream ticket: {e}")
+            return None
+        os.close(fd)
+        return str(claims["sub"])
+
+    def _sweep(self) -> None:
+        # A marker is only needed until its ticket expires; the margin covers clock skew.
+        now = time.time()
+        if now - self._last_sweep < self.ttl:
+            return
+        self._last_sweep = now
+        try:
+            with os.scandir(self.path) as entries:
+                for entry in entries:
+                    try:
+                        if entry.stat().st_mtime < now - 2 * self.ttl:
+                            os.unlink(entry.path)
+                    except FileNotFoundError:
+                        pass
+        except OSError:
+            pass
+
+
+# A single instance is created (Singleton pattern) to be easily imported and used by other modules.
+stream_tickets = StreamTicketService()
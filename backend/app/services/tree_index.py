@@ -0,0 +1,298 @@
+# /app/services/tree_index.py
+
+import bisect
+import os
+import threading
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from app.core.config import settings
+from app.core.pagination import decode_cursor, encode_cursor
+from app.core.responses import EncodedJSON, dumps
+
+
+class _DirectoryEntry:
+    """
+    Cached listing of a single directory: its visible subdirectories,
+    its Markdown files and the directory mtime observed when it was scanned.
+    """
+
+    __slots__ = ("mtime_ns", "dirs", "files", "names")
+
+    def __init__(self, mtime_ns: int, dirs: Set[str], files: Set[str]):
+        self.mtime_ns = mtime_ns
+        self.dirs = dirs
+        self.files = files
+        # Children in listing order, so pages are found by bisection.
+        self.names = sorted(dirs | files)
+
+
+class DocumentTreeIndex:
+    """
+    Process-wide, in-memory index of the documents directory tree.
+
+    The tree is scanned once and then kept current incrementally: a background
+    watcher polls only the mtime of the known directories (adding or removing
+    an entry always bumps its parent's mtime), and the save paths call
+    `invalidate()` so their own writes are visible immediately. Tree requests
+    are served from a cached snapshot without touching the filesystem.
+    """
+
+    def __init__(
+        self,
+        docs_path: str = settings.DOCS_DIRECTORY,
+        poll_interval: float = settings.TREE_INDEX_POLL_INTERVAL,
+    ):
+        """
+        Args:
+            docs_path (str): The root path for the documents directory.
+            poll_interval (float): Seconds between watcher passes. A value of
+                                   0 disables the watcher thread.
+        """
+        self.docs_path = os.path.normpath(docs_path)
+        self.poll_interval = poll_interval
+        self._lock = threading.RLock()
+        self._dirs: Dict[str, _DirectoryEntry] = {}
+        self._snapshot: Optional[List[Dict[str, Any]]] = None
+        # Serialized form of `_snapshot`, tagged with the snapshot it was built from.
+        self._encoded: Optional[Tuple[List[Dict[str, Any]], EncodedJSON]] = None
+        self._built = False
+        self._stop = threading.Event()
+        self._watcher: Optional[threading.Thread] = None
+
+    # --- Scanning ---
+
+    def _abs(self, relative_dir: str) -> str:
+        return os.path.join(self.docs_path, relative_dir) if relative_dir else self.docs_path
+
+    @staticmethod
+    def _join(parent: str, name: str) -> str:
+        return f"{parent}/{name}" if parent else name
+
+    def _scan_directory(self, relative_dir: str) -> None:
+        """
+        (Re)scans one directory, recursing only into subdirectories that
+        are new to the index and dropping those that disappeared.
+        Must be called with the lock held.
+        """
+        abs_dir = self._abs(relative_dir)
+        try:
+            mtime_ns = os.stat(abs_dir).st_mtime_ns
+            dirs: Set[str] = set()
+            files: Set[str] = set()
+            with os.scandir(abs_dir) as it:
+                for entry in it:
+                    if entry.name.startswith("."):
+                        continue
+                    if entry.is_dir():
+                        dirs.add(entry.name)
+                    elif entry.is_file() and entry.name.lower().endswith(".md"):
+                        files.add(entry.name)
+        except (FileNotFoundError, NotADirectoryError, PermissionError):
+            self._drop_directory(relative_dir)
+            return
+
+        previous = self._dirs.get(relative_dir)
+        self._dirs[relative_dir] = _DirectoryEntry(mtime_ns, dirs, files)
+        self._snapshot = None
+
+        old_dirs = previous.dirs if previous else set()
+        for name in old_dirs - dirs:
+            self._drop_directory(self._join(relative_dir, name))
+        for name in dirs:
+            child = self._join(relative_dir, name)
+            if child not in self._dirs:
+                self._scan_directory(child)
+
+    def _drop_directory(self, relative_dir: str) -> None:
+        """Removes a directory and all of its descendants from the index."""
+        entry = self._dirs.pop(relative_dir, None)
+        if entry is None:
+            return
+        self._snapshot = None
+        for name in entry.dirs:
+            self._drop_directory(self._join(relative_dir, name))
+
+    def _ensure_built(self) -> None:
+        if self._built:
+            return
+        with self._lock:
+            if not self._built:
+                self._scan_directory("")
+                self._built = True
+                self.start_watcher()
+
+    # --- Public API ---
+
+    def refresh(self) -> None:
+        """
+        Performs one watcher pass: stats every known directory and rescans
+        those whose mtime changed. Cost is O(directories), not O(files).
+        """
+        with self._lock:
+            for relative_dir in list(self._dirs):
+                entry = self._dirs.get(relative_dir)
+                if entry is None:
+                    continue  # Dropped earlier in this same pass.
+                try:
+                    mtime_ns = os.stat(self._abs(relative_dir)).st_mtime_ns
+                except OSError:
+                    self._drop_directory(relative_dir)
+                    continue
+                if mtime_ns != entry.mtime_ns:
+                    self._scan_directory(relative_dir)
+
+    def invalidate(self, relative_path: str) -> None:
+        """
+        Notifies the index that a file or directory was created, modified or
+        deleted. Rescans the nearest already-indexed ancestor directory.
+
+        Args:
+            relative_path (str): The path relative to the documents directory.
+        """
+        if not self._built:
+            return
+        parts = [p for p in relative_path.replace(os.sep, "/").split("/") if p]
+        with self._lock:
+            # Walk up from the parent directory until we find one we know about.
+            for depth in range(len(parts) - 1, -1, -1):
+                candidate = "/".join(parts[:depth])
+                if candidate in self._dirs:
+                    self._scan_directory(candidate)
+                    return
+            self._scan_directory("")
+
+    def tree(self) -> List[Dict[str, Any]]:
+        """
+        Returns the hierarchical tree of directories and Markdown files.
+
+        The returned structure is a shared, cached snapshot and must be
+        treated as read-only by callers.
+
+        Returns:
+            List[Dict[str, Any]]: Nodes with 'name', 'type', 'path' and,
+                                  for directories, 'children'.
+        """
+        self._ensure_built()
+        with self._lock:
+            if self._snapshot is None:
+                self._snapshot = self._build_nodes("")
+            return self._snapshot
+
+    def list_directory(
+        self, relative_dir: str = "", depth: int = 1, limit: int = 200, cursor: Optional[str] = None
+    ) -> Optional[Tuple[List[Dict[str, Any]], Optional[str]]]:
+        """
+        Returns one page of a directory's entries, optionally with a few
+        levels of descendants, so clients can expand folders on demand. The
+        response size depends on `depth` and `limit`, not on the corpus size.
+
+        Args:
+            relative_dir (str): The directory, relative to the documents root ('' for the root).
+            depth (int): Levels to include: 1 lists only the directory itself;
+                         each extra level adds the first `limit` children of
+                         every subdirectory listed.
+            limit (int): Maximum entries per directory.
+            cursor (Optional[str]): `next_cursor` of the previous page.
+
+        Raises:
+            ValueError: If the cursor is malformed.
+
+        Returns:
+            Optional[Tuple[List[Dict[str, Any]], Optional[str]]]: Nodes with
+            'name', 'type', 'path' and, for directories, 'child_count' (and
+            'children' when expanded), plus the cursor of the next page. None
+            if the directory is not in the index.
+        """
+        after = decode_cursor(cursor, 1)[0] if cursor else None
+        if after is not None and not isinstance(after, str):
+            raise ValueError("Invalid cursor.")
+        self._ensure_built()
+        relative_dir = "/".join(p for p in relative_dir.replace(os.sep, "/").split("/") if p)
+        with self._lock:
+            entry = self._dirs.get(relative_dir)
+            if entry is None:
+                return None
+            start = bisect.bisect_right(entry.names, after) if after is not None else 0
+            nodes = self._list_nodes(relative_dir, entry, start, depth, limit)
+            more = start + limit < len(entry.names)
+        return nodes, (encode_cursor(nodes[-1]["name"]) if more and nodes else None)
+
+    def _list_nodes(
+        self, relative_dir: str, entry: _DirectoryEntry, start: int, depth: int, limit: int
+    ) -> List[Dict[str, Any]]:
+        nodes = []
+        for name in entry.names[start:start + limit]:
+            path = self._join(relative_dir, name)
+            if name not in entry.dirs:
+                # Same shape as the FileNode model the tree used to be built from.
+                nodes.append({"name": name, "type": "file", "path": path, "children": None})
+                continue
+            child = self._dirs.get(path)
+            node = {"name": name, "type": "directory", "path": path, "child_count": len(child.names) if child else 0}
+            if depth > 1 and child is not None:
+                node["children"] = self._list_nodes(path, child, 0, depth - 1, limit)
+            nodes.append(node)
+        return nodes
+
+    def tree_json(self) -> EncodedJSON:
+        """
+        Returns the tree already serialized to JSON, with its compressed
+        variants built on demand. Serialization happens once per tree
+        version, not once per request.
+
+        Returns:
+            EncodedJSON: The JSON body of `tree()`.
+        """
+        snapshot = self.tree()
+        with self._lock:
+            if self._encoded is None or self._encoded[0] is not snapshot:
+                self._encoded = (snapshot, EncodedJSON(dumps(snapshot)))
+            return self._encoded[1]
+
+    def _build_nodes(self, relative_dir: str) -> List[Dict[str, Any]]:
+        entry = self._dirs.get(relative_dir)
+        if entry is None:
+            return []
+        nodes = []
+        for name in sorted(entry.dirs | entry.files):
+            path = self._join(relative_dir, name)
+            if name in entry.dirs:
+                nodes.append(
+                    {
+                        "name": name,
+                        "type": "directory",
+                        "path": path,
+                        "children": self._build_nodes(path),
+                    }
+                )
+            else:
+                # Same shape as the FileNode model the tree used to be built from.
+                nodes.append({"name": name, "type": "file", "path": path, "children": None})
+        return nodes
+
+    # --- Watcher ---
+
+    def start_watcher(self) -> None:
+        """Starts the background polling thread, if enabled and not running."""
+        if self.poll_interval <= 0 or (self._watcher and self._watcher.is_alive()):
+            return
+        self._stop.clear()
+        self._watcher = threading.Thread(
+            target=self._watch_loop, name="tree-index-watcher", daemon=True
+        )
+        self._watcher.start()
+
+    def stop_watcher(self) -> None:
+        """Signals the background polling thread to exit."""
+        self._stop.set()
+
+    def _watch_loop(self) -> None:
+        while not self._stop.wait(self.poll_interval):
+            try:
+                self.refresh()
+            except Exception as e:
+                print(f"Error refreshing document tree index: {e}")
+
+
+# A single instance is shared by the 'documents' and 'project_docs' routers.
+tree_index = DocumentTreeIndex()
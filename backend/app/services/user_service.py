@@ -1,84 +1,179 @@
 # /app/services/user_service.py
 
-from typing import List, Optional
+import time
+from typing import Any, List, Optional, Tuple
 
-from sqlalchemy.orm import Session
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core import security
+from app.core.config import settings
+from app.core.pagination import decode_cursor, encode_cursor
 from app.db import models, schemas
+from app.services.auth_cache import TTLCache, auth_cache
+from app.services.password_hashing import password_hashing
+from app.services.worker_signals import worker_signals
 
+# Cached user counts per combination of listing filters (see estimate_user_count).
+_user_counts = TTLCache(max_entries=1000)
 
-def get_user(db: Session, user_id: int) -> Optional[models.User]:
+
+def _apply_remote_user_change(data: dict) -> None:
+    """Drops this process's cached copies of a user modified through another worker."""
+    auth_cache.invalidate_user(data["username"])
+    _user_counts.clear()
+
+
+worker_signals.subscribe("user.changed", _apply_remote_user_change)
+
+
+async def get_user(db: AsyncSession, user_id: int) -> Optional[models.User]:
     """
     Retrieves a user by their ID.
 
     Args:
-        db (Session): The database session.
+        db (AsyncSession): The database session.
         user_id (int): The ID of the user to retrieve.
 
     Returns:
         Optional[models.User]: The user object if found, otherwise None.
     """
-    return db.query(models.User).filter(models.User.id == user_id).first()
+    return await db.get(models.User, user_id)
 
 
-def get_user_by_email(db: Session, email: str) -> Optional[models.User]:
+async def get_user_by_email(db: AsyncSession, email: str) -> Optional[models.User]:
     """
     Retrieves a user by their email address.
 
     Args:
-        db (Session): The database session.
+        db (AsyncSession): The database session.
         email (str): The email of the user to retrieve.
 
     Returns:
         Optional[models.User]: The user object if found, otherwise None.
     """
-    return db.query(models.User).filter(models.User.email == email).first()
+    result = await db.execute(select(models.User).where(models.User.email == email))
+    return result.scalars().first()
 
 
-def get_user_by_username(db: Session, username: str) -> Optional[models.User]:
+async def get_user_by_username(db: AsyncSession, username: str) -> Optional[models.User]:
     """
 
     Retrieves a user by their username.
 
     Args:
-        db (Session): The database session.
+        db (AsyncSession): The database session.
         username (str): The username of the user to retrieve.
 
     Returns:
         Optional[models.User]: The user object if found, otherwise None.
     """
-    return db.query(models.User).filter(models.User.username == username).first()
+    result = await db.execute(select(models.User).where(models.User.username == username))
+    return result.scalars().first()
+
+
+def _user_filters(
+    is_active: Optional[bool], is_admin: Optional[bool], username_prefix: Optional[str]
+) -> List[Any]:
+    conditions = []
+    if is_active is not None:
+        conditions.append(models.User.is_active == is_active)
+    if is_admin is not None:
+        conditions.append(models.User.is_admin == is_admin)
+    if username_prefix:
+        conditions.append(models.User.username.startswith(username_prefix, autoescape=True))
+    return conditions
+
+
+async def get_users(
+    db: AsyncSession,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    is_active: Optional[bool] = None,
+    is_admin: Optional[bool] = None,
+    username_prefix: Optional[str] = None,
+) -> Tuple[List[models.User], Optional[str]]:
+    """
+    Retrieves a page of users ordered by ID.
+    Pages are keyset-paginated on the ID, so they are stable under concurrent
+    inserts and cost the same regardless of depth.
 
+    Args:
+        db (AsyncSession): The database session.
+        limit (int): The maximum number of users to return.
+        cursor (Optional[str]): `next_cursor` of the previous page.
+        is_active (Optional[bool]): Only users with this active flag.
+        is_admin (Optional[bool]): Only users with this admin flag.
+        username_prefix (Optional[str]): Only usernames starting with this text.
+
+    Raises:
+        ValueError: If the cursor is malformed.
 
-def get_users(db: Session, skip: int = 0, limit: int = 100) -> List[models.User]:
+    Returns:
+        Tuple[List[models.User], Optional[str]]: The users and the cursor of
+        the next page (None on the last page).
+    """
+    query = (
+        select(models.User)
+        .where(*_user_filters(is_active, is_admin, username_prefix))
+        .order_by(models.User.id)
+        .limit(limit + 1)  # One extra row tells whether there is a next page.
+    )
+    if cursor:
+        (after_id,) = decode_cursor(cursor, 1)
+        if not isinstance(after_id, int):
+            raise ValueError("Invalid cursor.")
+        query = query.where(models.User.id > after_id)
+
+    users = list((await db.execute(query)).scalars().all())
+    if len(users) <= limit:
+        return users, None
+    users = users[:limit]
+    return users, encode_cursor(users[-1].id)
+
+
+async def estimate_user_count(
+    db: AsyncSession,
+    is_active: Optional[bool] = None,
+    is_admin: Optional[bool] = None,
+    username_prefix: Optional[str] = None,
+) -> int:
     """
-    Retrieves a paginated list of users.
+    Returns the number of users matching the filters. The COUNT runs at most
+    once per USER_COUNT_CACHE_TTL_SECONDS for each combination of filters,
+    so paging through the listing does not recount the table on every page.
 
     Args:
-        db (Session): The database session.
-        skip (int): The number of users to skip.
-        limit (int): The maximum number of users to return.
+        db (AsyncSession): The database session.
+        is_active (Optional[bool]): Only users with this active flag.
+        is_admin (Optional[bool]): Only users with this admin flag.
+        username_prefix (Optional[str]): Only usernames starting with this text.
 
     Returns:
-        List[models.User]: A list of user objects.
+        int: The (possibly slightly outdated) number of matching users.
     """
-    return db.query(models.User).offset(skip).limit(limit).all()
+    key = (is_active, is_admin, username_prefix or None)
+    cached = _user_counts.get(key)
+    if cached is not None:
+        return cached
+    query = select(func.count()).select_from(models.User).where(*_user_filters(*key))
+    count = (await db.execute(query)).scalar_one()
+    _user_counts.put(key, count, time.time() + settings.USER_COUNT_CACHE_TTL_SECONDS)
+    return count
 
 
-def create_user(db: Session, user_in: schemas.UserCreate) -> models.User:
+async def create_user(db: AsyncSession, user_in: schemas.UserCreate) -> models.User:
     """
     Creates a new user in the database.
-    Hashes the password before saving.
+    Hashes the password (on the dedicated hashing pool) before saving.
 
     Args:
-        db (Session): The database session.
+        db (AsyncSession): The database session.
         user_in (schemas.UserCreate): The user creation schema with plain password.
 
     Returns:
         models.User: The newly created user object.
     """
-    hashed_password = security.get_password_hash(user_in.password)
+    hashed_password = await password_hashing.hash(user_in.password)
     db_user = models.User(
         username=user_in.username,
         email=user_in.email,
@@ -86,29 +181,70 @@ def create_user(db: Session, user_in: schemas.UserCreate) -> models.User:
         is_active=user_in.is_active,
     )
     db.add(db_user)
-    db.commit()
-    db.refresh(db_user)
+    await db.commit()
+    await db.refresh(db_user)
+    _user_counts.clear()
+    return db_user
+
+
+async def update_user(db: AsyncSession, db_user: models.User, user_in: schemas.UserUpdate) -> models.User:
+    """
+    Updates a user's email, active flag and/or password.
+    Only the fields explicitly set in `user_in` are changed.
+
+    Args:
+        db (AsyncSession): The database session.
+        db_user (models.User): The user to update.
+        user_in (schemas.UserUpdate): The fields to change.
+
+    Returns:
+        models.User: The updated user object.
+    """
+    update_data = user_in.model_dump(exclude_unset=True)
+    password = update_data.pop("password", None)
+    if password:
+        db_user.hashed_password = await password_hashing.hash(password)
+    for field, value in update_data.items():
+        setattr(db_user, field, value)
+    db.add(db_user)
+    await db.commit()
+    await db.refresh(db_user)
+    # Cached sessions must not keep an outdated (e.g. still active) copy of this user.
+    auth_cache.invalidate_user(db_user.username)
+    _user_counts.clear()
+    worker_signals.publish("user.changed", username=db_user.username)
     return db_user
 
 
-def authenticate_user(
-    db: Session, username: str, password: str
+async def authenticate_user(
+    db: AsyncSession, username: str, password: str
 ) -> Optional[models.User]:
     """
 
     Authenticates a user by username and password.
+    bcrypt runs on the dedicated hashing pool. If the stored hash uses
+    outdated parameters, it is transparently replaced with one computed
+    with the current ones.
 
     Args:
-        db (Session): The database session.
+        db (AsyncSession): The database session.
         username (str): The user's username.
         password (str): The user's plain text password.
 
+    Raises:
+        HashingSaturatedError: If the password hashing queue is full.
+
     Returns:
         Optional[models.User]: The user object if authentication is successful, otherwise None.
     """
-    user = get_user_by_username(db, username=username)
+    user = await get_user_by_username(db, username=username)
     if not user:
         return None
-    if not security.verify_password(password, user.hashed_password):
+    valid, new_hash = await password_hashing.verify_and_update(password, user.hashed_password)
+    if not valid:
         return None
+    if new_hash:
+        user.hashed_password = new_hash
+        db.add(user)
+        await db.commit()
     return user
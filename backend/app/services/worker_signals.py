@@ -0,0 +1,199 @@
+# /app/services/worker_signals.py
+
+import fcntl
+import json
+import os
+import threading
+import time
+import uuid
+from typing import Any, BinaryIO, Callable, Dict, List, Optional
+
+from app.core.config import settings
+from app.core.metrics import WORKER_SIGNALS
+
+# Receives the data of a signal published by another process.
+SignalHandler = Callable[[Dict[str, Any]], None]
+
+# Minimum seconds between two rotations of the journal. A reader only keeps a
+# descriptor on the journal it is reading, so it must have moved on to the
+# new journal before that one is rotated in turn.
+ROTATION_MIN_INTERVAL = 30.0
+
+
+class WorkerSignals:
+    """
+    Cache invalidation signals between the worker processes of a deployment.
+    Each process keeps its own in-memory caches (tree, search index, locks,
+    authenticated users); when one of them changes shared state it publishes
+    a signal, and the others apply the same change to their caches.
+
+    Signals are JSON lines appended to a journal file that every process
+    tails from a background thread. Each signal is a single O_APPEND write,
+    which the kernel keeps atomic for lines this small, so publishing takes
+    no lock. Once the journal exceeds `max_bytes` it is renamed aside and a
+    new one is started (at most every ROTATION_MIN_INTERVAL seconds); readers
+    finish the old file through their open descriptor, so no signal is lost
+    across a rotation.
+
+    The journal must be on a local filesystem shared by the workers (the
+    cache directory): O_APPEND is not atomic over network filesystems.
+    """
+
+    def __init__(
+        self,
+        path: str = os.path.join(settings.CACHE_DIRECTORY, "worker-signals.jsonl"),
+        poll_interval: float = settings.WORKER_SIGNAL_POLL_INTERVAL,
+        max_bytes: int = settings.WORKER_SIGNAL_JOURNAL_MAX_BYTES,
+    ):
+        """
+        Args:
+            path (str): The journal file.
+            poll_interval (float): Seconds between reads of the journal. 0
+                                   disables signals (single-process deployments).
+            max_bytes (int): Journal size that triggers a rotation.
+        """
+        self.path = path
+        self.poll_interval = poll_interval
+        self.max_bytes = max_bytes
+        # Identifies this process's own signals, which it has already applied.
+        self.origin = f"{os.getpid()}-{uuid.uuid4().hex[:12]}"
+        self._handlers: Dict[str, List[SignalHandler]] = {}
+        self._lock = threading.Lock()
+        self._file: Optional[BinaryIO] = None
+        self._rotated: Optional[BinaryIO] = None
+        self._partial = b""
+        self._follower: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+    @property
+    def enabled(self) -> bool:
+        return self.poll_interval > 0
+
+    def subscribe(self, kind: str, handler: SignalHandler) -> None:
+        """
+        Registers a handler for the signals of a kind published by other processes.
+        Handlers run on the follower thread and must be thread-safe.
+
+        Args:
+            kind (str): The signal kind, e.g. 'documents.committed'.
+            handler (SignalHandler): Receives the signal's data.
+        """
+        self._handlers.setdefault(kind, []).append(handler)
+
+    def publish(self, kind: str, **data: Any) -> None:
+        """
+        Notifies the other processes of a change. Errors are reported but not
+        raised: the change itself already happened, and every cache is also
+        refreshed by its own fallback (watcher, TTL or HEAD check).
+
+        Args:
+            kind (str): The signal kind.
+            **data: JSON-serializable payload for the handlers.
+        """
+        if not self.enabled:
+            return
+        line = json.dumps({"kind": kind, "origin": self.origin, "data": data}, separators=(",", ":"))
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+            try:
+                os.write(fd, line.encode("utf-8") + b"\n")
+                size = os.fstat(fd).st_size
+            finally:
+                os.close(fd)
+            WORKER_SIGNALS.labels("published").inc()
+            if size > self.max_bytes:
+                self._rotate()
+        except OSError as e:
+            print(f"Error publishing worker signal '{kind}': {e}")
+
+    def _rotate(self) -> None:
+        lock_path = self.path + ".lock"
+        with open(lock_path, "a") as lock_file:
+            # Serializes rotations; the lock file's mtime records the last one.
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                last_rotation = os.fstat(lock_file.fileno()).st_mtime
+                if os.path.exists(self.path + ".1") and time.time() - last_rotation < ROTATION_MIN_INTERVAL:
+                    return
+                if os.stat(self.path).st_size > self.max_bytes:
+                    os.replace(self.path, self.path + ".1")
+                    os.utime(lock_path)
+            except FileNotFoundError:
+                pass
+
+    # --- Following ---
+
+    def start(self) -> None:
+        """Starts following the journal from its current end, if enabled and not running."""
+        if not self.enabled or (self._follower and self._follower.is_alive()):
+            return
+        with self._lock:
+            if self._file is None:
+                self._file = self._open_journal()
+                self._file.seek(0, os.SEEK_END)
+        self._stop.clear()
+        self._follower = threading.Thread(target=self._follow_loop, name="worker-signals", daemon=True)
+        self._follower.start()
+
+    def stop(self) -> None:
+        """Signals the follower thread to exit."""
+        self._stop.set()
+
+    def _open_journal(self) -> BinaryIO:
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        return open(os.open(self.path, os.O_RDONLY | os.O_CREAT, 0o644), "rb")
+
+    def _follow_loop(self) -> None:
+        while not self._stop.wait(self.poll_interval):
+            try:
+                self.poll()
+            except Exception as e:
+                print(f"Error reading worker signals: {e}")
+
+    def poll(self) -> None:
+        """Reads the signals appended since the last call and runs their handlers."""
+        with self._lock:
+            if self._file is None:
+                return
+            data = b""
+            if self._rotated is not None:
+                # A writer may still have appended to the old journal right after the rename.
+                data += self._rotated.read()
+                self._rotated.close()
+                self._rotated = None
+            data += self._file.read()
+            try:
+                current_inode = os.stat(self.path).st_ino
+            except FileNotFoundError:
+                current_inode = None
+            if current_inode != os.fstat(self._file.fileno()).st_ino:
+                data += self._file.read()
+                self._rotated = self._file
+                self._file = self._open_journal()
+                data += self._file.read()
+            lines = (self._partial + data).split(b"\n")
+            # A signal is only complete once its newline has been written.
+            self._partial = lines.pop()
+
+        for line in lines:
+            if line:
+                self._dispatch(line)
+
+    def _dispatch(self, line: bytes) -> None:
+        try:
+            signal = json.loads(line)
+        except ValueError:
+            return
+        if signal.get("origin") == self.origin:
+            return
+        WORKER_SIGNALS.labels("received").inc()
+        for handler in self._handlers.get(signal.get("kind"), ()):
+            try:
+                handler(signal.get("data") or {})
+            except Exception as e:
+                print(f"Error handling worker signal '{signal.get('kind')}': {e}")
+
+
+# A single instance is created (Singleton pattern) to be easily imported and used by other modules.
+worker_signals = WorkerSignals()
@@ -0,0 +1,17 @@
+# /tests/conftest.py
+
+import os
+import sys
+import tempfile
+
+# The settings and the service singletons are created on import: point them at a
+# scratch directory before any test module imports the application.
+_STATE_DIR = tempfile.mkdtemp(prefix="docuhub-tests-")
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{_STATE_DIR}/docuhub.db")
+os.environ.setdefault("SECRET_KEY", "test-secret-key")
+os.environ.setdefault("DOCS_DIRECTORY", os.path.join(_STATE_DIR, "docs"))
+os.environ.setdefault("CACHE_DIRECTORY", os.path.join(_STATE_DIR, "cache"))
+os.environ.setdefault("SITE_DIRECTORY", os.path.join(_STATE_DIR, "site"))
+os.environ.setdefault("WORKER_SIGNAL_POLL_INTERVAL", "0")
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,40 @@
+# /tests/test_commit_pipeline.py
+
+from contextlib import contextmanager
+
+import git
+import pytest
+
+from app.services.commit_pipeline import CommitPipeline
+from app.services.repo_lock import RepositoryWriteLock
+
+AUTHOR = git.Actor("test", "test@docuhub.local")
+
+
+class FlakyLock(RepositoryWriteLock):
+    """A write lock whose first acquisition fails as if the lock file could not be opened."""
+
+    def __init__(self, path: str):
+        super().__init__(path)
+        self.failures = 1
+
+    @contextmanager
+    def hold(self, timeout=None):
+        if self.failures:
+            self.failures -= 1
+            raise OSError("lock file unavailable")
+        with super().hold(timeout):
+            yield
+
+
+def test_writer_survives_an_unexpected_error(tmp_path):
+    repo = git.Repo.init(tmp_path)
+    pipeline = CommitPipeline(repo, window=0, write_lock=FlakyLock(str(tmp_path / ".git" / "test.lock")))
+
+    failed = pipeline.submit(tmp_path / "a.md", "a.md", "# A\n", AUTHOR)
+    with pytest.raises(OSError):
+        failed.result(timeout=5)
+
+    saved = pipeline.submit(tmp_path / "b.md", "b.md", "# B\n", AUTHOR)
+    assert saved.result(timeout=5) == "# B\n"
+    assert [item.path for item in repo.head.commit.tree] == ["b.md"]
@@ -0,0 +1,44 @@
+# /tests/test_document_service.py
+
+import git
+import pytest
+
+from app.services.document_service import DocumentService
+from app.services.history_service import RevisionNotFoundError
+
+
+@pytest.fixture
+def service(tmp_path):
+    """A DocumentService over a repository with one committed document in a 'guides' directory."""
+    repo = git.Repo.init(tmp_path)
+    (tmp_path / "guides").mkdir()
+    (tmp_path / "guides" / "intro.md").write_text("# Intro\n", encoding="utf-8")
+    repo.index.add(["guides/intro.md"])
+    repo.index.commit("Add intro", author=git.Actor("test", "test@docuhub.local"))
+    return DocumentService(str(tmp_path))
+
+
+def test_get_blob_at_resolves_a_document(service):
+    commit_sha, blob_sha, size = service.get_blob_at("guides/intro.md", "HEAD")
+
+    assert commit_sha == service.repo.head.commit.hexsha
+    assert size == len("# Intro\n")
+
+
+def test_get_blob_at_rejects_a_directory(service):
+    with pytest.raises(RevisionNotFoundError):
+        service.get_blob_at("guides", "HEAD")
+
+
+def test_get_content_at_rejects_a_directory(service):
+    with pytest.raises(RevisionNotFoundError):
+        service.get_content_at("guides", "HEAD")
+
+
+def test_repository_metadata_is_not_a_document(service):
+    config = service.docs_path / ".git" / "config"
+    original = config.read_text(encoding="utf-8")
+
+    assert service.read_document(".git/config") is None
+    assert service.save_document_content(".git/config", "[core]\n", "test") is False
+    assert config.read_text(encoding="utf-8") == original
@@ -0,0 +1,39 @@
+# /tests/test_event_bus.py
+
+import asyncio
+
+from app.services.event_bus import RESYNC_EVENT, EventBus
+
+
+def _replay(bus: EventBus, last_event_id: str):
+    async def first_event():
+        subscription = bus.subscribe(last_event_id=last_event_id)
+        try:
+            return await subscription.get(timeout=1)
+        finally:
+            bus.unsubscribe(subscription)
+
+    return asyncio.run(first_event())
+
+
+def test_resume_replays_the_events_after_the_last_id():
+    bus = EventBus()
+    bus.publish("document.saved", path="a.md")
+    bus.publish("document.saved", path="b.md")
+
+    event = _replay(bus, f"{bus.stream_id}-1")
+
+    assert event["type"] == "document.saved"
+    assert event["path"] == "b.md"
+
+
+def test_resume_with_an_id_from_another_worker_resyncs():
+    this_worker, other_worker = EventBus(), EventBus()
+    this_worker.publish("document.saved", path="a.md")
+    other_worker.publish("document.saved", path="a.md")
+    other_worker.publish("document.saved", path="b.md")
+
+    event = _replay(this_worker, f"{other_worker.stream_id}-1")
+
+    assert event["type"] == RESYNC_EVENT
+    assert event["id"] == f"{this_worker.stream_id}-1"
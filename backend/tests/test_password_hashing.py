@@ -0,0 +1,35 @@
+# /tests/test_password_hashing.py
+
+import asyncio
+import threading
+
+import pytest
+
+from app.services.password_hashing import HashingSaturatedError, PasswordHashingPool
+
+
+def test_a_cancelled_caller_keeps_its_slot_until_the_job_ends():
+    pool = PasswordHashingPool(workers=1, max_pending=1)
+    started, release = threading.Event(), threading.Event()
+
+    def slow_hash():
+        started.set()
+        release.wait(5)
+        return "hash"
+
+    async def scenario():
+        caller = asyncio.ensure_future(pool._submit(slow_hash))
+        await asyncio.to_thread(started.wait, 5)
+        caller.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await caller
+
+        # The bcrypt job is still running: the pool is still full.
+        with pytest.raises(HashingSaturatedError):
+            await pool._submit(lambda: "other")
+
+        release.set()
+        await asyncio.sleep(0.1)
+        assert await pool._submit(lambda: "other") == "other"
+
+    asyncio.run(scenario())
@@ -0,0 +1,52 @@
+# /tests/test_search_service.py
+
+import pickle
+
+import pytest
+
+from app.services import search_service
+from app.services.search_service import SearchIndex
+
+
+@pytest.fixture
+def index(tmp_path):
+    """A loaded SearchIndex over two documents, persisted under a separate cache directory."""
+    docs = tmp_path / "docs"
+    docs.mkdir()
+    (docs / "alpha.md").write_text("# Alpha\nPublicación del sitio.\n", encoding="utf-8")
+    (docs / "beta.md").write_text("# Beta\nOtro documento.\n", encoding="utf-8")
+    search = SearchIndex(str(docs), str(tmp_path / "cache" / "search_index.pickle"), flush_interval=0)
+    search.warm_up()
+    return search
+
+
+def test_search_returns_a_highlighted_snippet(index):
+    result = index.search("publicacion")
+
+    assert result["total"] == 1
+    assert result["results"][0]["path"] == "alpha.md"
+    assert "<mark>Publicación</mark>" in result["results"][0]["snippet"]
+
+
+def test_flush_writes_the_snapshot_taken_before_a_concurrent_update(index, monkeypatch):
+    docs = index.docs_path
+    real_dumps = pickle.dumps
+
+    def dumps_with_update(data, protocol=None):
+        # An update that lands while the snapshot is being serialized.
+        with open(f"{docs}/alpha.md", "w", encoding="utf-8") as f:
+            f.write("# Alpha\nDocumento reescrito.\n")
+        index.update_document("alpha.md")
+        return real_dumps(data, protocol=protocol)
+
+    index.update_document("beta.md", "# Beta\nOtro documento del sitio.\n")
+    monkeypatch.setattr(search_service.pickle, "dumps", dumps_with_update)
+    index.flush()
+
+    with open(index.index_path, "rb") as f:
+        data = pickle.load(f)
+    alpha = next(doc_id for doc_id, path in data["paths"].items() if path == "alpha.md")
+    assert alpha in data["postings"]["sitio"]
+    assert "reescrito" not in data["postings"]
+    assert index.search("reescrito")["total"] == 1
+    assert index.search("sitio")["total"] == 1
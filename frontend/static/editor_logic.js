@@ -38,50 +38,99 @@ document.addEventListener('DOMContentLoaded', () => {
     let currentFilePath = null; // Esta será la ruta relativa al directorio DOCS_SOURCE_DIR
     let easyMDE;
 
-    function renderTree(nodes, container) {
-        const ul = document.createElement('ul');
-        nodes.forEach(node => {
+    // El árbol se carga por niveles: cada carpeta pide sus entradas al expandirse,
+    // así el tamaño de cada respuesta no depende del número total de documentos.
+    const LIST_PAGE_SIZE = 200;
+    const expandedDirs = new Set(); // Carpetas abiertas; se vuelven a abrir al recargar el árbol
+
+    function renderEntries(items, ul) {
+        items.forEach(node => {
             const li = document.createElement('li');
             if (node.type === 'directory') {
-                // Añadir un data-path a los directorios podría ser útil para expansiones futuras,
-                // pero para la funcionalidad actual no es estrictamente necesario.
-                li.innerHTML = `<span class="directory" data-path="${node.path}">📁 ${node.name.replace(/_/g, ' ')}</span>`;
-                if (node.children && node.children.length > 0) {
-                    renderTree(node.children, li); // Pasar los hijos para la recursión
-                }
+                li.innerHTML = `<span class="directory" data-path="${node.path}" title="${node.child_count} elementos">📁 ${node.name.replace(/_/g, ' ')}</span>`;
             } else if (node.type === 'file' && node.name.toLowerCase().endsWith('.md')) {
                 li.innerHTML = `<span class="file" data-path="${node.path}">📄 ${node.name}</span>`;
             }
-
-            // Solo añadir el LI si tiene contenido (evita LIs vacíos si un directorio no tiene .md o no es un .md)
+            // Solo añadir el LI si tiene contenido (evita LIs vacíos si no es un .md)
             if (li.innerHTML) {
                 ul.appendChild(li);
             }
         });
-        // Solo añadir el UL si tiene LIs (evita ULs vacíos)
-        if (ul.hasChildNodes()) {
+    }
+
+    async function fetchListing(path, cursor) {
+        const params = new URLSearchParams({ path, limit: LIST_PAGE_SIZE });
+        if (cursor) params.set('cursor', cursor);
+        const response = await fetch(`/api/v1/documents/list?${params}`, { headers: authHeaders });
+        if (!response.ok) {
+            if (response.status === 401) {
+                window.location.href = '/login';
+                return null; // Evitar más procesamiento si se redirige
+            }
+            const errorData = await response.json().catch(() => ({ detail: "Error desconocido al listar el directorio." }));
+            throw new Error(`HTTP error! status: ${response.status} - ${errorData.detail || "No se pudo listar el directorio."}`);
+        }
+        return response.json();
+    }
+
+    // Añade una página de entradas del directorio `path` dentro de `container`
+    // (el LI de la carpeta, o el panel del árbol para la raíz).
+    async function loadDirectory(path, container, cursor = null) {
+        const data = await fetchListing(path, cursor);
+        if (!data) return;
+        let ul = container.querySelector(':scope > ul');
+        if (!ul) {
+            ul = document.createElement('ul');
             container.appendChild(ul);
         }
+        container.querySelector(':scope > .load-more')?.remove();
+        renderEntries(data.items, ul);
+        if (data.next_cursor) {
+            const more = document.createElement('span');
+            more.className = 'load-more';
+            more.textContent = 'Mostrar más…';
+            more.dataset.path = path;
+            more.dataset.cursor = data.next_cursor;
+            container.appendChild(more);
+        }
+        // Restaurar las subcarpetas que estaban abiertas antes de recargar
+        for (const dir of ul.querySelectorAll(':scope > li > .directory')) {
+            if (expandedDirs.has(dir.dataset.path) && !dir.parentElement.querySelector(':scope > ul')) {
+                await loadDirectory(dir.dataset.path, dir.parentElement);
+            }
+        }
+    }
+
+    async function toggleDirectory(dirEl) {
+        const path = dirEl.dataset.path;
+        const li = dirEl.parentElement;
+        if (expandedDirs.has(path)) {
+            expandedDirs.delete(path);
+            li.querySelectorAll(':scope > ul, :scope > .load-more').forEach(el => el.remove());
+            return;
+        }
+        expandedDirs.add(path);
+        try {
+            await loadDirectory(path, li);
+        } catch (error) {
+            expandedDirs.delete(path);
+            console.error(`Error loading directory "${path}":`, error);
+            statusEl.textContent = `Error al abrir la carpeta: ${error.message}`;
+        }
     }
 
     async function loadFileTree() {
         fileTreeEl.innerHTML = '<p style="color: var(--text-muted); padding: 1rem;">Cargando estructura de /docs...</p>';
         try {
-            const response = await fetch('/api/v1/project-docs/tree', { headers: authHeaders });
-            if (!response.ok) {
-                if (response.status === 401) {
-                    window.location.href = '/login';
-                    return; // Evitar más procesamiento si se redirige
-                }
-                const errorData = await response.json().catch(() => ({ detail: "Error desconocido al obtener el árbol de archivos." }));
-                throw new Error(`HTTP error! status: ${response.status} - ${errorData.detail || "No se pudo obtener el árbol de archivos."}`);
-            }
-            const treeData = await response.json();
+            const root = document.createElement('div');
+            await loadDirectory('', root);
             fileTreeEl.innerHTML = '';
-            if (treeData.length === 0) {
+            if (!root.querySelector('li')) {
                 fileTreeEl.innerHTML = '<p style="color: var(--text-muted); padding: 1rem;">No se encontraron documentos Markdown en la carpeta /docs.</p>';
             } else {
-                renderTree(treeData, fileTreeEl);
+                fileTreeEl.append(...root.childNodes);
+                const active = currentFilePath && fileTreeEl.querySelector(`.file[data-path="${CSS.escape(currentFilePath)}"]`);
+                if (active) active.classList.add('active');
             }
         } catch (error) {
             console.error("Error loading project file tree:", error);
@@ -174,6 +223,18 @@ document.addEventListener('DOMContentLoaded', () => {
     });
 
     fileTreeEl.addEventListener('click', (e) => {
+        const targetDir = e.target.closest('.directory');
+        if (targetDir) {
+            toggleDirectory(targetDir);
+            return;
+        }
+        const loadMore = e.target.closest('.load-more');
+        if (loadMore) {
+            loadDirectory(loadMore.dataset.path, loadMore.parentElement, loadMore.dataset.cursor).catch(error => {
+                statusEl.textContent = `Error al cargar más elementos: ${error.message}`;
+            });
+            return;
+        }
         const targetFile = e.target.closest('.file'); // Manejar clic en el span o su hijo
         if (targetFile && targetFile.dataset.path) {
             document.querySelectorAll('.file.active').forEach(el => el.classList.remove('active'));
@@ -242,6 +303,45 @@ document.addEventListener('DOMContentLoaded', () => {
         console.error("No se pudo encontrar EasyMDEContainer para el MutationObserver.");
     }
 
+    // ==========================================================================
+    // 4. Cambios en tiempo real (Server-Sent Events)
+    // ==========================================================================
+    // El servidor avisa de guardados, bloqueos y publicaciones: el árbol solo se
+    // recarga cuando aparece o desaparece un documento, sin sondeos periódicos.
+    // EventSource no envía cabeceras: en la URL va un ticket de un solo uso (nunca
+    // el token de acceso), así que cada reconexión pide un ticket nuevo.
+    async function connectEvents(reconnecting = false) {
+        let events;
+        try {
+            const response = await fetch('/api/v1/events/ticket', { method: 'POST', headers: authHeaders });
+            if (!response.ok) throw new Error(`HTTP ${response.status}`);
+            const { ticket } = await response.json();
+            events = new EventSource(`/api/v1/events/?ticket=${encodeURIComponent(ticket)}`);
+        } catch (error) {
+            console.error("No se pudo abrir el flujo de eventos:", error);
+            setTimeout(() => connectEvents(true), 3000);
+            return;
+        }
+        // Los eventos emitidos mientras no había conexión se han perdido.
+        if (reconnecting) loadFileTree();
+        events.addEventListener('document.created', () => loadFileTree());
+        events.addEventListener('document.deleted', () => loadFileTree());
+        events.addEventListener('documents.imported', () => loadFileTree());
+        events.addEventListener('document.saved', (e) => {
+            const data = JSON.parse(e.data);
+            if (data.path === currentFilePath && data.author !== localStorage.getItem('docuhub_username')) {
+                statusEl.textContent = `'${data.path}' fue modificado por ${data.author}. Recárguelo para ver los cambios.`;
+            }
+        });
+        events.addEventListener('resync', () => loadFileTree());
+        // El ticket ya se usó: la reconexión automática del navegador fallaría.
+        events.onerror = () => {
+            events.close();
+            setTimeout(() => connectEvents(true), 3000);
+        };
+    }
+    connectEvents();
+
     // Carga inicial del árbol de archivos del proyecto
     loadFileTree();
 